@@ -9,8 +9,22 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_todo_project.settings')
 
+# Async requests run their queries on threads that come and go, so a
+# connection kept open for reuse (CONN_MAX_AGE) would be left behind by each
+# one. Close them at the end of every request instead.
+for database in settings.DATABASES.values():
+    database['CONN_MAX_AGE'] = 0
+
 application = get_asgi_application()
+
+# Compile URLs and templates now rather than on the first request (see
+# todo_app/warmup.py). Here rather than in AppConfig.ready(), which every
+# management command runs too.
+if settings.TODO_WARMUP:
+    from todo_app.warmup import warm_up
+    warm_up()
@@ -41,6 +41,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Static files from STATIC_ROOT in production, ahead of everything else (see todo_app/assets.py)
+    'todo_app.middleware.StaticAssetMiddleware',
+    # Its timings cover every other middleware (see todo_app/metrics.py)
+    'todo_app.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,14 +52,20 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so it only sees the queries made by views and templates (see todo_app/nplusone.py)
+    'todo_app.middleware.NPlusOneMiddleware',
 ]
 
 ROOT_URLCONF = 'student_todo_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the request metrics
+        'BACKEND': 'todo_app.metrics.TimedDjangoTemplates',
         'DIRS': [],
+        # With no 'loaders' option Django wraps these loaders in the cached
+        # loader, so each template is compiled once per process (and
+        # reloaded on change under runserver); TODO_WARMUP fills that cache
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -77,9 +87,119 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse each worker's connection for up to a minute instead of reconnecting
+        # (and re-running the PRAGMAs) on every request. asgi.py sets it to 0, as
+        # async requests run their queries on a new thread each.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock at BEGIN, so concurrent writers wait on busy_timeout
+            # instead of failing with "database is locked" when a read lock can't be upgraded
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Per-view request metrics (see todo_app/metrics.py). The detailed breakdown
+# (queries, DB and template time, Server-Timing headers) is only collected
+# in development; wall time and response size are always recorded.
+TODO_REQUEST_METRICS = True
+TODO_REQUEST_METRICS_DETAILED = DEBUG
+# Number of recent requests each histogram summarizes
+TODO_REQUEST_METRICS_WINDOW = 1000
+
+# N+1 query detection (see todo_app/nplusone.py): 'log' warns with the call
+# site, 'raise' fails the request (the test runner below switches to it), None is off
+TODO_NPLUSONE = 'log' if DEBUG else None
+# A query shape may repeat this many times per request before it is flagged
+TODO_NPLUSONE_THRESHOLD = 4
+
+TEST_RUNNER = 'todo_app.test_runner.TestRunner'
+
+# Soft delete (see todo_app/trash.py): seconds during which a delete can be
+# undone, and days trashed rows are kept before purge_deleted removes them
+TODO_UNDO_WINDOW = 600
+TODO_TRASH_RETENTION_DAYS = 30
+
+# Seconds a change waits before the sync API sends it, so writes still in
+# flight (up to the SQLite busy_timeout) commit first (see todo_app/sync.py)
+TODO_SYNC_SETTLE = 5
+
+# Compile URLs and templates when wsgi.py/asgi.py load (see todo_app/warmup.py)
+# rather than on the first request. Management commands don't warm up.
+TODO_WARMUP = not DEBUG
+
+# Background jobs (see todo_app/jobs.py; run them with the run_jobs command).
+# Failed jobs are retried up to TODO_JOB_MAX_ATTEMPTS times, waiting
+# TODO_JOB_RETRY_DELAY seconds (doubled per retry); a running job whose
+# worker has been silent for TODO_JOB_STALE_AFTER seconds is requeued.
+TODO_JOB_MAX_ATTEMPTS = 3
+TODO_JOB_RETRY_DELAY = 30
+TODO_JOB_STALE_AFTER = 600
+
+# Overrides for the PRAGMAs applied to every new SQLite connection; the
+# defaults are DEFAULT_SQLITE_PRAGMAS in todo_app/database.py. None turns
+# one off, e.g. {'mmap_size': None}.
+TODO_SQLITE_PRAGMAS = {}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered task/note list fragments (see todo_app/caching.py).
+    # LocMemCache evicts least-recently-used entries once MAX_ENTRIES is reached;
+    # point this at Redis/Memcached to share fragments between worker processes.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todo-fragments',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    # Sessions for the cached_db session engine, when enabled (see SESSION_ENGINE
+    # below), kept apart so culling fragments never evicts a session
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todo-sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Cache alias and lifetime (seconds) used for the list fragments
+TODO_FRAGMENT_CACHE = 'fragments'
+TODO_FRAGMENT_CACHE_TIMEOUT = 3600
+
+
+# Sessions and authentication (see todo_app/auth.py)
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/#configuring-the-session-engine
+
+# Sessions are read from the database: one primary key lookup per request,
+# and a logout in any worker process ends the session in all of them.
+# 'django.contrib.sessions.backends.cached_db' skips that lookup by reading
+# the 'sessions' cache first, but a logout only clears the cache of the
+# process that handled it. Use it with a single process (runserver), or
+# after pointing CACHES['sessions'] at a shared Redis/Memcached. Or
+# 'django.contrib.sessions.backends.signed_cookies' keeps the (signed, not
+# encrypted) session in the cookie and needs no storage at all.
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# ModelBackend plus a per-process cache of the logged-in users, so
+# AuthenticationMiddleware doesn't query the user table on every request
+AUTHENTICATION_BACKENDS = ['todo_app.auth.CachedModelBackend']
+# Seconds a worker reuses a loaded user (0 turns the cache off). Saving a
+# user clears it in the saving process at once; others within this time.
+TODO_USER_CACHE_TTL = 60
+TODO_USER_CACHE_SIZE = 10000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -117,6 +237,31 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# collectstatic output, served by todo_app.middleware.StaticAssetMiddleware
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Production: hashed file names plus gzip/brotli copies (see todo_app/assets.py).
+    # Development serves the unhashed files straight from the app directories.
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'todo_app.assets.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Uploaded files (imports waiting for their background job)
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Serve STATIC_ROOT from the app itself (runserver does it in development)
+TODO_SERVE_STATIC = not DEBUG
+# Tailwind standalone CLI used by the build_assets command
+TODO_TAILWIND_CLI = 'tailwindcss'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_todo_project.settings')
 
 application = get_wsgi_application()
+
+# Compile URLs and templates now rather than on the first request (see
+# todo_app/warmup.py). Here rather than in AppConfig.ready(), which every
+# management command runs too.
+if settings.TODO_WARMUP:
+    from todo_app.warmup import warm_up
+    warm_up()
@@ -1,7 +1,167 @@
-from django.contrib import admin
+"""
+Admin for tasks and notes, built for tables with millions of rows.
 
-from .models import Task, Note
+The stock changelist counts every row (twice when filtered), loads each
+row's user with its own query, sorts on unindexed columns, searches with
+LIKE '%term%' and deletes a selection by loading it and deleting row by row.
+Here the changelist reads one page in primary key order with the users
+joined in, counts with EstimatedCountPaginator, offers only filters that
+keep that scan short, searches the FTS5 index (see search.py) and runs its
+actions a batch of rows at a time through the same set-based queryset
+methods the app uses, so counters, list caches and the search index stay
+correct.
+"""
+from functools import partial
 
-admin.site.register(Task)
-admin.site.register(Note)
-    
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth import get_user_model
+from django.utils.html import format_html
+
+from . import database, search
+from .models import Note, Task
+from .pagination import EstimatedCountPaginator
+
+# Rows an admin action updates per step (each user's share in its own transaction)
+ACTION_BATCH_SIZE = 1000
+
+
+def in_batches(queryset, operation, batch_size=ACTION_BATCH_SIZE):
+    """
+    Apply a per-user queryset operation, called as operation(rows, user), to
+    an admin selection `batch_size` rows at a time in primary key order, so
+    selecting everything never loads the whole table or holds one long write
+    transaction. Returns the sum of what the operation returns.
+    """
+    done, last = 0, 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last).order_by('pk').values_list('pk', 'user_id')[:batch_size])
+        if not rows:
+            return done
+        last = rows[-1][0]
+        by_user = {}
+        for pk, user_id in rows:
+            by_user.setdefault(user_id, []).append(pk)
+        users = get_user_model().objects.in_bulk(list(by_user))
+        for user_id, pks in by_user.items():
+            done += operation(queryset.model.objects.filter(pk__in=pks), users[user_id])
+
+
+class OwnerFilter(admin.SimpleListFilter):
+    """
+    Filter by user without listing every user in the sidebar: it is set by
+    clicking a row's user and only shown while it is active.
+    """
+    title = 'user'
+    parameter_name = 'user'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not value.isdigit():
+            return []
+        user = get_user_model().objects.filter(pk=value).first()
+        return [(value, user.get_username() if user else f'#{value}')]
+
+    def has_output(self):
+        return self.value() is not None
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        return queryset.filter(user_id=value) if value.isdigit() else queryset.none()
+
+
+class LeanChangeList(ChangeList):
+    """ChangeList that leaves out the long text columns no list column shows."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.defer(*self.model_admin.changelist_defer)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Shared changelist settings for the per-user Task and Note tables."""
+    list_select_related = ('user',)
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    # The filtered count is what the page shows; skip the second, unfiltered one
+    show_full_result_count = False
+    # Newest first by primary key: a rowid scan, or the user's FK index when
+    # filtered by user, which stops after one page. No column sorts, since
+    # most would need a full sort of the table.
+    ordering = ('-pk',)
+    sortable_by = ()
+    # Only used where the FTS5 index is unavailable (see get_search_results)
+    search_fields = ('title',)
+    search_help_text = 'Matches whole words or word prefixes in the title and body.'
+    # Partial index on live rows whose statistics give the unfiltered row count
+    count_index = None
+    changelist_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return LeanChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        estimate = None
+        # Unfiltered: the WHERE clause is just the default manager's
+        if self.count_index and queryset.query.where == self.get_queryset(request).query.where:
+            estimate = partial(database.estimated_count, self.count_index)
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page, estimate=estimate)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search.is_available() or not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        matches = search.filter_queryset(queryset, search_term)
+        return (queryset.none() if matches is None else matches), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Loads and deletes the selection row by row, bypassing the trash
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_model(self, request, obj):
+        """Deleting from the change page moves the row to the trash, as in the app."""
+        type(obj).objects.filter(pk=obj.pk).soft_delete(obj.user)
+
+    @admin.display(description='User')
+    def owner(self, obj):
+        return format_html('<a href="?{}={}">{}</a>', OwnerFilter.parameter_name, obj.user_id, obj.user)
+
+    @admin.action(description='Move selected %(verbose_name_plural)s to the trash', permissions=['delete'])
+    def move_to_trash(self, request, queryset):
+        trashed = in_batches(queryset, lambda rows, user: rows.soft_delete(user))
+        self.message_user(request, f'Moved {trashed} row(s) to the trash.', messages.SUCCESS)
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    list_display = ('title', 'owner', 'completed', 'priority', 'due_date', 'created_at')
+    # With a user selected, the page is a range of the user_id index. completed
+    # on its own has no index: the page scans rows newest first and stops once
+    # it is full (quick, since both values are common), and the count stops at
+    # EstimatedCountPaginator.count_limit
+    list_filter = ('completed', OwnerFilter)
+    count_index = 'task_user_status_created_idx'
+    changelist_defer = ('description',)
+    actions = ['mark_completed', 'mark_open', 'move_to_trash']
+
+    @admin.action(description='Mark selected tasks as completed', permissions=['change'])
+    def mark_completed(self, request, queryset):
+        changed = in_batches(queryset, lambda rows, user: rows.set_completed(user, True))
+        self.message_user(request, f'Marked {changed} task(s) as completed.', messages.SUCCESS)
+
+    @admin.action(description='Mark selected tasks as not completed', permissions=['change'])
+    def mark_open(self, request, queryset):
+        changed = in_batches(queryset, lambda rows, user: rows.set_completed(user, False))
+        self.message_user(request, f'Reopened {changed} task(s).', messages.SUCCESS)
+
+
+@admin.register(Note)
+class NoteAdmin(LargeTableAdmin):
+    list_display = ('title', 'owner', 'word_count', 'updated_at', 'created_at')
+    list_filter = (OwnerFilter,)
+    count_index = 'note_user_updated_idx'
+    changelist_defer = ('content',)
+    actions = ['move_to_trash']
@@ -0,0 +1,289 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import transaction
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views import View
+
+from . import sync
+from .forms import NoteForm, TaskForm
+from .models import Note, Task
+from .nplusone import ignore_repeats
+from .pagination import KeysetPaginationMixin
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_OPERATIONS = 500
+
+
+@dataclass(frozen=True)
+class Resource:
+    """How one model is exposed through the API."""
+    model: type
+    form_class: type
+    fields: tuple
+    # Same ordering as the matching HTML list view, so the same index serves both
+    keyset_fields: tuple
+
+
+RESOURCES = {
+    'tasks': Resource(
+        model=Task,
+        form_class=TaskForm,
+        fields=('id', 'title', 'description', 'completed', 'due_date', 'priority', 'created_at', 'updated_at'),
+        keyset_fields=('completed', '-created_at', '-id'),
+    ),
+    'notes': Resource(
+        model=Note,
+        form_class=NoteForm,
+        fields=('id', 'title', 'content', 'excerpt', 'word_count', 'created_at', 'updated_at'),
+        keyset_fields=('-updated_at', '-id'),
+    ),
+}
+
+
+class ApiError(Exception):
+    """Raised by API helpers; turned into a JSON error response by ApiView."""
+
+    def __init__(self, status, payload):
+        super().__init__(payload)
+        self.status = status
+        self.payload = payload
+
+
+# --- Helpers ---
+
+def serialize(obj, fields):
+    """Plain dict of the requested fields, with ISO 8601 dates and timestamps."""
+    data = {}
+    for name in fields:
+        value = getattr(obj, name)
+        data[name] = value.isoformat() if isinstance(value, date) else value
+    return data
+
+
+def parse_fields(resource, value):
+    """
+    Turn ?fields=id,title into a field tuple, keeping the resource's order.
+    An empty value means every field.
+    """
+    if not value:
+        return resource.fields
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(resource.fields)
+    if unknown:
+        raise ApiError(400, {'detail': f'Unknown field(s): {", ".join(sorted(unknown))}.'})
+    return tuple(name for name in resource.fields if name in requested | {'id'})
+
+
+def get_owned(resource, user, pk):
+    try:
+        return resource.model.objects.get(pk=pk, user=user)
+    except (resource.model.DoesNotExist, ValueError, TypeError):
+        raise ApiError(404, {'detail': 'Not found.'})
+
+
+def trash_owned(resource, user, pk):
+    """Soft-delete the user's object (see trash.py) without loading it first."""
+    try:
+        deleted = resource.model.objects.filter(pk=pk).soft_delete(user)
+    except (ValueError, TypeError):
+        deleted = 0
+    if not deleted:
+        raise ApiError(404, {'detail': 'Not found.'})
+
+
+def save_object(resource, user, data, instance=None, partial=False):
+    """
+    Validate `data` with the resource's ModelForm and save it. For partial
+    updates the missing fields keep their current values.
+    """
+    if not isinstance(data, dict):
+        raise ApiError(400, {'detail': 'Expected a JSON object.'})
+    form_fields = resource.form_class._meta.fields
+    if instance is not None and partial:
+        merged = model_to_dict(instance, fields=form_fields)
+        merged.update({name: value for name, value in data.items() if name in form_fields})
+        data = merged
+    form = resource.form_class(data=data, instance=instance)
+    if not form.is_valid():
+        raise ApiError(400, {'errors': form.errors.get_json_data()})
+    obj = form.save(commit=False)
+    if instance is None:
+        obj.user = user
+    obj.save()
+    return obj
+
+
+def read_json(request):
+    try:
+        return json.loads(request.body or b'null')
+    except ValueError:
+        raise ApiError(400, {'detail': 'Request body is not valid JSON.'})
+
+
+# --- Views ---
+
+class ApiView(View):
+    """
+    Base class for the JSON endpoints. Uses the normal session login (and
+    CSRF protection for writes) and reports errors as JSON.
+    """
+    resource_name = None
+
+    @property
+    def resource(self):
+        return RESOURCES[self.resource_name]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication required.'}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse(error.payload, status=error.status)
+        except Http404:
+            # e.g. a bad ?after=/?before= cursor from KeysetPaginationMixin
+            return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+class CollectionView(KeysetPaginationMixin, ApiView):
+    """
+    GET lists the user's objects one cursor page at a time (?fields=, ?limit=,
+    ?after=/?before=); POST creates an object.
+    """
+
+    @property
+    def model(self):
+        return self.resource.model
+
+    @property
+    def keyset_fields(self):
+        return self.resource.keyset_fields
+
+    def get(self, request):
+        fields = parse_fields(self.resource, request.GET.get('fields'))
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise ApiError(400, {'detail': 'limit must be a number.'})
+
+        # Only the requested columns (plus those the cursor needs) are read
+        columns = set(fields) | {name.lstrip('-') for name in self.keyset_fields}
+        queryset = self.model.objects.filter(user=request.user).only(*columns)
+        _paginator, page, rows, _is_paginated = self.paginate_queryset(queryset, limit)
+        return JsonResponse({
+            'results': [serialize(obj, fields) for obj in rows],
+            'next': page.next_token,
+            'previous': page.previous_token,
+        })
+
+    def post(self, request):
+        obj = save_object(self.resource, request.user, read_json(request))
+        return JsonResponse(serialize(obj, self.resource.fields), status=201)
+
+
+class ItemView(ApiView):
+    """GET, PATCH/PUT or DELETE one of the user's objects."""
+
+    def get(self, request, pk):
+        fields = parse_fields(self.resource, request.GET.get('fields'))
+        return JsonResponse(serialize(get_owned(self.resource, request.user, pk), fields))
+
+    def patch(self, request, pk):
+        obj = get_owned(self.resource, request.user, pk)
+        obj = save_object(self.resource, request.user, read_json(request), instance=obj, partial=True)
+        return JsonResponse(serialize(obj, self.resource.fields))
+
+    def put(self, request, pk):
+        obj = get_owned(self.resource, request.user, pk)
+        obj = save_object(self.resource, request.user, read_json(request), instance=obj)
+        return JsonResponse(serialize(obj, self.resource.fields))
+
+    def delete(self, request, pk):
+        trash_owned(self.resource, request.user, pk)
+        return HttpResponse(status=204)
+
+
+class BatchView(ApiView):
+    """
+    Runs many create/update/delete operations in one request and one
+    transaction. Body: {"operations": [{"op": "create", "resource": "tasks",
+    "data": {...}}, {"op": "update", "resource": "notes", "id": 3, "data": {...}},
+    {"op": "delete", "resource": "tasks", "id": 7}, ...]}.
+    If any operation fails nothing is saved and the error names its index.
+    """
+
+    def post(self, request):
+        body = read_json(request)
+        operations = body.get('operations') if isinstance(body, dict) else None
+        if not isinstance(operations, list):
+            raise ApiError(400, {'detail': 'Expected {"operations": [...]}.'})
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ApiError(400, {'detail': f'At most {MAX_BATCH_OPERATIONS} operations per batch.'})
+
+        results = []
+        # Every operation is a separate save on purpose, so repeated queries are expected
+        with transaction.atomic(), ignore_repeats():
+            for index, operation in enumerate(operations):
+                try:
+                    results.append(self.run(request.user, operation))
+                except ApiError as error:
+                    raise ApiError(error.status, {'index': index, **error.payload})
+        return JsonResponse({'results': results})
+
+    def run(self, user, operation):
+        if not isinstance(operation, dict) or operation.get('resource') not in RESOURCES:
+            raise ApiError(400, {'detail': 'Each operation needs a known "resource".'})
+        resource = RESOURCES[operation['resource']]
+        op = operation.get('op')
+
+        if op == 'create':
+            obj = save_object(resource, user, operation.get('data'))
+        elif op == 'update':
+            obj = get_owned(resource, user, operation.get('id'))
+            obj = save_object(resource, user, operation.get('data'), instance=obj, partial=True)
+        elif op == 'delete':
+            trash_owned(resource, user, operation.get('id'))
+            return {'op': op, 'id': operation.get('id')}
+        else:
+            raise ApiError(400, {'detail': 'op must be "create", "update" or "delete".'})
+        return {'op': op, 'object': serialize(obj, resource.fields)}
+
+
+class SyncView(ApiView):
+    """
+    GET returns the user's tasks and notes changed since ?since=<watermark>
+    (everything, on the first call), at most ?limit= per resource:
+    {"tasks": {"changed": [...], "deleted": [ids]}, "notes": {...},
+    "watermark": "...", "more": false}. Pass the watermark to the next call;
+    while "more" is true, call again straight away. See sync.py.
+    """
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit', sync.DEFAULT_LIMIT)), 1), sync.MAX_LIMIT)
+        except ValueError:
+            raise ApiError(400, {'detail': 'limit must be a number.'})
+        since = request.GET.get('since')
+        try:
+            positions = sync.decode_watermark(since, RESOURCES) if since else {}
+        except sync.WatermarkError as error:
+            # 410: the client must discard its copy and sync from scratch
+            raise ApiError(410, {'detail': f'{error} Sync again without "since".'})
+
+        until = timezone.now() - sync.settle_time()
+        data, reached, more = {}, {}, False
+        for name, resource in RESOURCES.items():
+            rows, reached[name], has_more = sync.changes_since(
+                resource.model, request.user, positions.get(name), until, limit,
+            )
+            more = more or has_more
+            data[name] = {
+                'changed': [serialize(obj, resource.fields) for obj in rows if obj.deleted_at is None],
+                'deleted': [obj.pk for obj in rows if obj.deleted_at is not None],
+            }
+        return JsonResponse({**data, 'watermark': sync.encode_watermark(reached), 'more': more})
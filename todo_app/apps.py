@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TodoAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'todo_app'
+
+    def ready(self):
+        # Connect the signal handlers that keep the per-user dashboard counters,
+        # list versions and search index in sync, and tune new DB connections
+        from . import signals  # noqa: F401
@@ -0,0 +1,254 @@
+"""
+Static asset pipeline.
+
+`build_assets` compiles todo_app/frontend/app.css with the Tailwind CLI,
+which keeps only the utility classes found in the templates (and the form
+widgets' classes in forms.py), and collects
+the Lucide icons named by {% icon %} tags into one SVG sprite, so no page
+downloads a CSS framework or an icon library at runtime. Both files are
+written to static/todo_app/build/.
+
+`collectstatic` then stores every static file under a content-hashed name,
+next to gzip (and, with the optional `brotli` package, brotli) copies; see
+CompressedManifestStaticFilesStorage. StaticAssetMiddleware serves them from
+STATIC_ROOT: hashed names are cached by browsers for a year without
+revalidation, and each client gets the smallest encoding it accepts.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import re
+import subprocess
+from pathlib import Path
+from xml.etree import ElementTree
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponse
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip copies are written
+    brotli = None
+
+APP_DIR = Path(__file__).resolve().parent
+FRONTEND_DIR = APP_DIR / 'frontend'
+TEMPLATE_DIR = APP_DIR / 'templates'
+BUILD_DIR = APP_DIR / 'static' / 'todo_app' / 'build'
+
+# Static names of the build outputs, as passed to {% static %}
+STYLESHEET = 'todo_app/build/app.css'
+ICON_SPRITE = 'todo_app/build/icons.svg'
+
+# Text formats worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.svg', '.json', '.map', '.txt', '.html', '.xml'}
+# Below this size the compressed copy saves less than a packet
+MIN_COMPRESS_SIZE = 256
+
+# Content-hashed files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed names (e.g. links from old pages) are only cached briefly
+SHORT_CACHE_CONTROL = 'public, max-age=60'
+# Files up to this size are kept in memory after the first request
+MAX_MEMORY_SIZE = 1024 * 1024
+
+# Preferred order when a client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+ICON_TAG_RE = re.compile(r'''{%\s*icon\s+["']([\w-]+)["']''')
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+# Attributes of a Lucide <svg> that the <symbol> must keep for <use> to draw it the same way
+SYMBOL_ATTRIBUTES = ('viewBox', 'fill', 'stroke', 'stroke-width', 'stroke-linecap', 'stroke-linejoin')
+
+
+# --- Build ---
+
+def used_icons(template_dir=TEMPLATE_DIR):
+    """Sorted names of every icon referenced by an {% icon %} tag in the templates."""
+    names = set()
+    for path in Path(template_dir).rglob('*.html'):
+        names.update(ICON_TAG_RE.findall(path.read_text(encoding='utf-8')))
+    return sorted(names)
+
+
+def build_stylesheet(cli, output=BUILD_DIR / 'app.css'):
+    """
+    Run the Tailwind CLI over the templates and forms (see frontend/tailwind.config.js)
+    and write the minified CSS to `output`. Raises OSError if the CLI cannot
+    be started and CalledProcessError if it fails.
+    """
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [
+            cli,
+            '--config', str(FRONTEND_DIR / 'tailwind.config.js'),
+            '--input', str(FRONTEND_DIR / 'app.css'),
+            '--output', str(output),
+            '--minify',
+        ],
+        # The content globs in the config are relative to the project root
+        cwd=APP_DIR.parent,
+        check=True,
+    )
+    return Path(output)
+
+
+def lucide_icons():
+    """
+    Return a function mapping an icon name to its SVG source, read from the
+    icon set bundled with the `lucide` package (a build-time dependency).
+    """
+    from importlib.resources import files
+    from zipfile import ZipFile
+
+    archive = ZipFile(files('lucide') / 'lucide.zip')
+
+    def load(name):
+        try:
+            return archive.read(f'{name}.svg').decode()
+        except KeyError:
+            raise LookupError(f'Unknown icon: {name}')
+    return load
+
+
+def build_icon_sprite(names, load_svg, output=BUILD_DIR / 'icons.svg'):
+    """
+    Write one SVG containing a <symbol id="name"> per icon, for {% icon %}
+    to reference with <use>. `load_svg` maps an icon name to its SVG source.
+    """
+    ElementTree.register_namespace('', SVG_NS)
+    sprite = ElementTree.Element(f'{{{SVG_NS}}}svg')
+    for name in names:
+        svg = ElementTree.fromstring(load_svg(name))
+        symbol = ElementTree.SubElement(sprite, f'{{{SVG_NS}}}symbol', id=name)
+        for attribute in SYMBOL_ATTRIBUTES:
+            if attribute in svg.attrib:
+                symbol.set(attribute, svg.attrib[attribute])
+        symbol.extend(list(svg))
+    for element in sprite.iter():
+        # Lucide's pretty-printing whitespace is not needed in the sprite
+        element.text = element.tail = None
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    Path(output).write_bytes(ElementTree.tostring(sprite))
+    return Path(output)
+
+
+# --- Storage ---
+
+def compress_file(path):
+    """
+    Write gzip and brotli copies (path.gz, path.br) of a text file, keeping
+    only the ones that are actually smaller. Returns the suffixes written.
+    """
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+
+    # mtime=0 keeps the output identical between builds
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    written = []
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+            written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage (content-hashed copies of every file plus
+    staticfiles.json) that also precompresses each stored text file, so
+    nothing is compressed per request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        stored = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                stored.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(stored):
+                compress_file(self.path(name))
+
+
+# --- Serving ---
+
+class StaticAsset:
+    """One servable file: its encoded variants on disk and how long it may be cached."""
+    __slots__ = ('content_type', 'cache_control', 'variants', 'cached')
+
+    def __init__(self, path, immutable):
+        content_type, _encoding = mimetypes.guess_type(path)
+        if content_type and content_type.startswith('text/'):
+            content_type += '; charset=utf-8'
+        self.content_type = content_type or 'application/octet-stream'
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if immutable else SHORT_CACHE_CONTROL
+        # encoding ('' for none) -> path on disk
+        self.variants = {'': path}
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                self.variants[encoding] = path + suffix
+        # encoding -> file contents, filled on first request
+        self.cached = {}
+
+    def choose_encoding(self, accept_encoding):
+        accepted = set()
+        for part in accept_encoding.split(','):
+            token, _sep, params = part.strip().partition(';')
+            if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(token.strip().lower())
+        for encoding, _suffix in ENCODINGS:
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return ''
+
+    def response(self, request):
+        encoding = self.choose_encoding(request.headers.get('Accept-Encoding', ''))
+        path = self.variants[encoding]
+        content = self.cached.get(encoding)
+        if content is None and os.path.getsize(path) <= MAX_MEMORY_SIZE:
+            with open(path, 'rb') as file:
+                content = self.cached[encoding] = file.read()
+
+        if content is None:
+            response = FileResponse(open(path, 'rb'), content_type=self.content_type)
+        else:
+            response = HttpResponse(content, content_type=self.content_type)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if len(self.variants) > 1:
+            response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = self.cache_control
+        return response
+
+
+def build_index(root, url_prefix):
+    """
+    Map every URL path under `url_prefix` to a StaticAsset for the files in
+    `root` (a collectstatic output directory). Names listed as hashed in its
+    staticfiles.json are the ones that get far-future cache headers.
+    """
+    try:
+        with open(os.path.join(root, ManifestStaticFilesStorage.manifest_name), encoding='utf-8') as file:
+            hashed = set(json.load(file).get('paths', {}).values())
+    except (OSError, ValueError):
+        hashed = set()
+
+    index = {}
+    for directory, _dirs, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            index[url_prefix + name] = StaticAsset(path, immutable=name in hashed)
+    return index
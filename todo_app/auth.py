@@ -0,0 +1,109 @@
+"""
+Authentication fast path.
+
+Out of the box every logged-in request runs two queries before a view
+starts: SessionMiddleware loads the session row and AuthenticationMiddleware
+loads the user it names. CachedModelBackend takes the user off the
+database: each worker process keeps the users it has loaded for
+TODO_USER_CACHE_TTL seconds. The session stays in the database unless the
+settings choose a session engine that can skip it (see SESSION_ENGINE).
+
+Only the user row is cached; group and per-user permissions are still
+loaded per request, and only when something checks them. A signal handler
+in signals.py drops a user from the cache whenever the row is saved or
+deleted, so a password change (which also changes the session auth hash),
+deactivation or a new staff/superuser flag takes effect at once in the
+process that made it. Other processes catch up within the TTL, which bounds
+how stale a cached user can ever be.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+DEFAULT_USER_CACHE_TTL = 60
+DEFAULT_USER_CACHE_SIZE = 10000
+
+
+def user_cache_ttl():
+    """Seconds a loaded user is reused for; 0 turns the cache off."""
+    return getattr(settings, 'TODO_USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
+
+
+class UserCache:
+    """
+    Thread-safe map of user id -> (expiry, user). Callers always get a copy,
+    so per-request state set on a user (e.g. the permission caches) is never
+    shared between requests.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.copy(entry[1])
+
+    def set(self, user_id, user):
+        ttl = user_cache_ttl()
+        if ttl <= 0:
+            return
+        limit = getattr(settings, 'TODO_USER_CACHE_SIZE', DEFAULT_USER_CACHE_SIZE)
+        now = time.monotonic()
+        with self.lock:
+            if len(self.entries) >= limit:
+                # Expired entries go first; if all are live, start over rather than track recency
+                self.entries = {key: entry for key, entry in self.entries.items() if entry[0] >= now}
+                if len(self.entries) >= limit:
+                    self.entries.clear()
+            self.entries[user_id] = (now + ttl, copy.copy(user))
+
+    def invalidate(self, *user_ids):
+        with self.lock:
+            for user_id in user_ids:
+                self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+user_cache = UserCache()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user() (called by AuthenticationMiddleware on
+    every request) serves users from the per-process cache above. Logging
+    in still checks the password against the database.
+    """
+
+    def get_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(user_id, user)
+        return user
+
+    async def aget_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                user_cache.set(user_id, user)
+        return user
@@ -0,0 +1,161 @@
+import hashlib
+import inspect
+
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+
+from .models import UserStats
+
+# Stand-in for the CSRF token while a fragment is rendered for the cache;
+# the requesting user's real token is swapped in on every response.
+CSRF_PLACEHOLDER = '__TODO_CSRF_TOKEN__'
+
+
+async def aget_user_stats(request):
+    """
+    The logged-in user's UserStats row, fetched at most once per request
+    (the conditional-GET check and the view both need it).
+    """
+    if not hasattr(request, '_todo_user_stats'):
+        request._todo_user_stats = await UserStats.afor_user(request.user)
+    return request._todo_user_stats
+
+
+def get_fragment_cache():
+    """The cache configured for rendered list fragments (settings.TODO_FRAGMENT_CACHE)."""
+    return caches[getattr(settings, 'TODO_FRAGMENT_CACHE', 'default')]
+
+
+class CachedListMixin:
+    """
+    ListView mixin that caches the rendered rows of a user's list.
+
+    The cache key contains the user's list version from UserStats, which the
+    Task/Note signals and bulk operations bump on every change, so entries
+    never need to be deleted: a change simply makes the next request miss.
+    On a hit neither the queryset nor the row template is evaluated; the page
+    template only has to drop in `list_fragment`.
+
+    The handlers are async: rows are fetched with the async ORM and the page
+    template is rendered by Django after the view returns.
+    """
+    fragment_template_name = None
+    # Name of the UserStats version field for this list, e.g. 'task_list_version'
+    version_field = None
+    # Rows that depend on today's date (e.g. overdue badges) must also expire at midnight
+    date_sensitive = False
+
+    def get_version_stamp(self, version):
+        """The list version, plus today's date for date-sensitive lists."""
+        return f'{version}@{timezone.localdate().isoformat()}' if self.date_sensitive else version
+
+    async def get_validators(self):
+        # Same inputs as the fragment key, so a 304 is sent exactly when the rows are unchanged
+        version = self.get_version_stamp(getattr(await aget_user_stats(self.request), self.version_field))
+        return make_etag(self.request, self.version_field, version, self.request.GET.urlencode()), None
+
+    def get_fragment_key(self, version):
+        # The cursor parameters select the page, so they are part of the key
+        cursor = self.request.GET.urlencode()
+        digest = hashlib.md5(cursor.encode(), usedforsecurity=False).hexdigest()
+        return f'todo:{self.version_field}:{self.request.user.pk}:{self.get_version_stamp(version)}:{digest}'
+
+    async def render_fragment(self):
+        """Fetch one keyset page and render the rows template, as ListView.get() would."""
+        queryset = self.get_queryset()
+        _paginator, page, rows, is_paginated = await self.apaginate_queryset(
+            queryset, self.get_paginate_by(queryset)
+        )
+        # The rows are already in memory, so rendering never touches the database
+        context = {
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': rows,
+            self.get_context_object_name(rows): rows,
+            'csrf_token': CSRF_PLACEHOLDER,
+        }
+        return render_to_string(self.fragment_template_name, context)
+
+    async def get(self, request, *args, **kwargs):
+        stats = await aget_user_stats(request)
+        key = self.get_fragment_key(getattr(stats, self.version_field))
+        cache = get_fragment_cache()
+
+        fragment = await cache.aget(key)
+        if fragment is None:
+            fragment = await self.render_fragment()
+            await cache.aset(key, fragment, getattr(settings, 'TODO_FRAGMENT_CACHE_TIMEOUT', 3600))
+
+        # ListView's template lookup expects object_list; the lazy queryset is never run
+        self.object_list = self.get_queryset()
+
+        fragment = fragment.replace(CSRF_PLACEHOLDER, get_token(request))
+        return self.render_to_response({'view': self, 'list_fragment': mark_safe(fragment)})
+
+
+# --- Conditional GET ---
+
+def make_etag(request, *parts):
+    """
+    Build a weak ETag from the given validator parts plus everything else
+    that changes the page for this browser: the user, the CSRF secret
+    embedded in its forms, and any pending flash messages.
+    """
+    # get_token() makes sure the CSRF secret exists before the page is rendered
+    get_token(request)
+    parts = (
+        request.user.pk,
+        request.META['CSRF_COOKIE'],
+        request.COOKIES.get('messages', ''),
+    ) + parts
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/{quote_etag(digest)}'
+
+
+async def conditional_response(request, render, etag=None, last_modified=None):
+    """
+    Answer If-None-Match / If-Modified-Since with a 304 before the async
+    `render` is awaited; otherwise await it and attach the validators to its
+    response. This is django.views.decorators.http.condition() for
+    validators that the view has already computed.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = await render()
+        if 200 <= response.status_code < 300:
+            if etag:
+                response.headers.setdefault('ETag', etag)
+            if timestamp:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+    # Let the browser keep a copy, but make it ask us before reusing it
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    View mixin that computes cheap validators and returns a 304 without
+    running the rest of the view when they match.
+
+    Views (or a mixin later in the MRO, such as CachedListMixin) provide an
+    async get_validators(), returning (etag, last_modified); either may be None.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        etag, last_modified = await self.get_validators()
+
+        async def render():
+            response = super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+            # The next get() may be async (CachedListMixin) or sync (DetailView)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+
+        return await conditional_response(request, render, etag=etag, last_modified=last_modified)
@@ -0,0 +1,69 @@
+"""
+Per-connection SQLite tuning.
+
+Every new SQLite connection gets DEFAULT_SQLITE_PRAGMAS, with any overrides
+from settings.TODO_SQLITE_PRAGMAS applied on top, set by the connection_created
+handler in signals.py. WAL lets readers carry on while one writer commits,
+and busy_timeout makes writers wait for the lock instead of failing with
+"database is locked".
+
+It also reads the planner statistics, for row counts that would be too slow
+to take with COUNT(*) (see estimated_count()).
+"""
+from django.conf import settings
+from django.db import connection as default_connection
+
+# Applied in this order; busy_timeout goes first so switching the journal
+# mode waits for other connections instead of failing immediately
+DEFAULT_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,           # milliseconds to wait for a lock
+    'journal_mode': 'WAL',          # persistent: stored in the database file
+    'synchronous': 'NORMAL',        # safe with WAL; fsync at checkpoints only
+    'cache_size': -20000,           # negative = KiB, so ~20 MB per connection
+    'mmap_size': 128 * 1024 * 1024, # read pages straight from the OS page cache
+    'temp_store': 'MEMORY',
+}
+
+
+def get_sqlite_pragmas():
+    """
+    DEFAULT_SQLITE_PRAGMAS updated with settings.TODO_SQLITE_PRAGMAS; an
+    override of None leaves that PRAGMA at SQLite's own default.
+    """
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **getattr(settings, 'TODO_SQLITE_PRAGMAS', {})}
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def configure_connection(connection):
+    """Apply the configured PRAGMAs to a freshly opened SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    # Use the raw DB-API connection so the PRAGMAs are not logged as queries
+    for name, value in get_sqlite_pragmas().items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+# --- Planner Statistics ---
+
+def estimated_count(index_name, connection=default_connection):
+    """
+    Number of rows in an index according to the planner statistics: SQLite's
+    sqlite_stat1 (written by ANALYZE) or PostgreSQL's pg_class.reltuples. For
+    a partial index that is the number of matching rows. Instant at any table
+    size, but only as fresh as the last ANALYZE; None if there is none.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE idx = %s', [index_name])
+            row = cursor.fetchone()
+            # "<rows> <rows per distinct prefix>...", one column at a time
+            return int(row[0].split()[0]) if row else None
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [index_name])
+            row = cursor.fetchone()
+            # -1 until the first ANALYZE
+            return int(row[0]) if row and row[0] >= 0 else None
+    return None
@@ -41,8 +41,8 @@ class TaskForm(forms.ModelForm):
     """
     class Meta:
         model = Task
-        # We allow users to set the title, description, and completion status.
-        fields = ['title', 'description', 'completed']
+        # We allow users to set the title, description, due date, priority and completion status.
+        fields = ['title', 'description', 'due_date', 'priority', 'completed']
 
         widgets = {
             'title': forms.TextInput(attrs={
@@ -54,6 +54,8 @@ class TaskForm(forms.ModelForm):
                 'placeholder': 'Add optional details about the task...',
                 'rows': 3
             }),
+            'due_date': forms.DateInput(attrs={'class': INPUT_CLASSES, 'type': 'date'}),
+            'priority': forms.Select(attrs={'class': INPUT_CLASSES}),
             'completed': forms.CheckboxInput(attrs={
                 # Tailwind classes for the checkbox itself
                 'class': 'h-5 w-5 text-primary border-gray-300 rounded focus:ring-primary'
@@ -63,5 +65,31 @@ class TaskForm(forms.ModelForm):
         labels = {
             'title': 'Task Title',
             'description': 'Task Description',
+            'due_date': 'Due Date',
+            'priority': 'Priority',
             'completed': 'Mark as Completed',
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Imports and API clients may leave it out; they get the model default
+        self.fields['priority'].required = False
+
+    def clean_priority(self):
+        priority = self.cleaned_data.get('priority')
+        return Task.Priority.NORMAL if priority in (None, '') else priority
+
+class ImportForm(forms.Form):
+    """
+    Upload form for bulk-importing notes or tasks from a CSV or NDJSON file.
+    """
+    file = forms.FileField(
+        label='File',
+        widget=forms.ClearableFileInput(attrs={'class': INPUT_CLASSES}),
+    )
+
+    format = forms.ChoiceField(
+        label='Format',
+        choices=[('csv', 'CSV (with a header row)'), ('ndjson', 'NDJSON (one JSON object per line)')],
+        widget=forms.Select(attrs={'class': INPUT_CLASSES}),
+    )
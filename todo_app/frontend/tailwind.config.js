@@ -0,0 +1,25 @@
+// Tailwind configuration for `build_assets` (see todo_app/assets.py).
+// Only the classes found in the files below end up in the built CSS: the
+// templates, and the Python modules that set classes on the HTML they
+// render (form widgets in forms.py, template tags).
+module.exports = {
+  content: [
+    './todo_app/templates/**/*.html',
+    './todo_app/templatetags/*.py',
+    './todo_app/forms.py',
+  ],
+  theme: {
+    extend: {
+      colors: {
+        primary: '#4f46e5',
+        secondary: '#10b981',
+        accent: '#f59e0b',
+        'background-light': '#f7f9fb',
+      },
+      boxShadow: {
+        '3xl': '0 35px 60px -15px rgba(0, 0, 0, 0.3)',
+      },
+    },
+  },
+  plugins: [],
+};
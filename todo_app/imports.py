@@ -0,0 +1,152 @@
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django import forms
+from django.db import transaction
+
+from . import search
+from .forms import NoteForm, TaskForm
+from .models import Note, Task, UserStats
+from .nplusone import ignore_repeats
+
+# Form used to validate each row of an import kind; extra columns are ignored
+IMPORT_FORMS = {
+    'notes': NoteForm,
+    'tasks': TaskForm,
+}
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+DEFAULT_BATCH_SIZE = 500
+
+# Accepted spellings of a boolean cell (case and surrounding spaces are ignored);
+# CheckboxInput alone would read any other non-empty text, "0" and "no" included, as True
+BOOLEAN_VALUES = {
+    '1': True, 'true': True, 'yes': True,
+    '0': False, 'false': False, 'no': False, '': False,
+}
+
+# Only the first errors are kept in the report; the total is always counted
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import: rows written, rows rejected and why."""
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, messages):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, messages))
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line number, row dict) from a binary file object without reading it
+    all into memory. CSV needs a header row; NDJSON needs one object per line.
+    Rows that cannot be parsed are yielded as (line number, None).
+    """
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f'Unknown import format: {fmt}')
+
+
+def _write_batch(model, user, batch, report):
+    """Insert one batch and apply what the per-row save signals would have done."""
+    # Large files repeat these same few queries once per batch, by design
+    with transaction.atomic(), ignore_repeats():
+        created = model.objects.bulk_create(batch)
+        search.index_objects(created)
+        if model is Task:
+            UserStats.adjust(
+                user.pk,
+                total_tasks=len(created),
+                completed_tasks=sum(1 for task in created if task.completed),
+                task_list_version=1,
+            )
+        else:
+            UserStats.adjust(user.pk, total_notes=len(created), note_list_version=1)
+    report.created += len(created)
+
+
+def clean_row(form_class, row):
+    """
+    Pick the form's fields out of a row, converting boolean columns
+    explicitly. Returns (data, errors); a boolean cell that is not one of
+    BOOLEAN_VALUES is an error instead of being guessed at.
+    """
+    data, errors = {}, []
+    for name in form_class._meta.fields:
+        if name not in row:
+            continue
+        value = row[name]
+        if isinstance(form_class.base_fields[name], forms.BooleanField) and not isinstance(value, bool):
+            key = str(value if value is not None else '').strip().lower()
+            if key not in BOOLEAN_VALUES:
+                errors.append(f'{name}: Enter one of 1/0, true/false or yes/no, not "{value}".')
+                continue
+            value = BOOLEAN_VALUES[key]
+        data[name] = value
+    return data, errors
+
+
+def import_rows(kind, user, rows, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Validate each (line, row) with the kind's form and write the valid ones
+    for `user` with bulk_create, `batch_size` rows per transaction.
+    Returns an ImportReport; invalid rows are skipped, not fatal.
+    `progress`, if given, is called with the number of rows handled so far
+    after each batch.
+    """
+    form_class = IMPORT_FORMS[kind]
+    model = form_class._meta.model
+    report = ImportReport()
+    batch = []
+
+    for line, row in rows:
+        if row is None:
+            report.add_error(line, ['Row could not be parsed.'])
+            continue
+        data, errors = clean_row(form_class, row)
+        if errors:
+            report.add_error(line, errors)
+            continue
+        form = form_class(data=data)
+        if not form.is_valid():
+            report.add_error(line, [
+                f'{name}: {message}' for name, messages in form.errors.items() for message in messages
+            ])
+            continue
+        obj = form.save(commit=False)
+        obj.user = user
+        if model is Note:
+            # bulk_create() skips Note.save(), which normally fills these in
+            obj.refresh_summary()
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            _write_batch(model, user, batch, report)
+            batch = []
+            if progress:
+                progress(report.created + report.failed)
+
+    if batch:
+        _write_batch(model, user, batch, report)
+    return report
@@ -0,0 +1,228 @@
+"""
+Background jobs.
+
+Work that doesn't belong in a request (imports, purging a deleted account,
+counter rebuilds) is queued with enqueue(), which inserts a Job row and
+returns, and is run by the `run_jobs` worker command. The database is the
+queue, so no broker is needed.
+
+claim() hands a worker a batch of due jobs in one short write transaction:
+SQLite's IMMEDIATE transactions (see settings) serialize the claims, and on
+PostgreSQL select_for_update(skip_locked=True) lets workers claim side by
+side without waiting on each other's rows. Handlers work in batches of
+their own and report progress on the Job row as they go.
+
+A handler that raises is retried up to its max_attempts, waiting
+TODO_JOB_RETRY_DELAY seconds, doubled on each further attempt. Work that
+commits as it goes and can't safely run twice (imports) is registered with
+max_attempts=1. A job whose worker died stays 'running' until its lock is
+older than TODO_JOB_STALE_AFTER seconds; requeue_stale() then treats that
+as a failed attempt.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import imports, trash
+from .models import Job, UserStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 30
+DEFAULT_STALE_AFTER = 600
+
+# kind -> handler function; see handler()
+HANDLERS = {}
+
+
+def retry_delay():
+    """Wait (a timedelta) before a failed job's first retry; doubled for each later one."""
+    return timedelta(seconds=getattr(settings, 'TODO_JOB_RETRY_DELAY', DEFAULT_RETRY_DELAY))
+
+
+def stale_after():
+    """How long (a timedelta) a running job may go without a heartbeat before it is requeued."""
+    return timedelta(seconds=getattr(settings, 'TODO_JOB_STALE_AFTER', DEFAULT_STALE_AFTER))
+
+
+def worker_name():
+    """Identifies this worker process in Job.locked_by."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def handler(kind, max_attempts=None):
+    """
+    Register a function as the handler for jobs of `kind`. It is called as
+    function(job, **job.payload) and its (JSON-serializable) return value is
+    stored as the job's result. max_attempts defaults to TODO_JOB_MAX_ATTEMPTS.
+    """
+    def register(function):
+        function.max_attempts = max_attempts
+        HANDLERS[kind] = function
+        return function
+    return register
+
+
+# --- Queue ---
+
+def enqueue(kind, /, user=None, **payload):
+    """Queue a job for the worker and return it; the payload must be JSON-serializable."""
+    if kind not in HANDLERS:
+        raise LookupError(f'Unknown job kind: {kind}')
+    max_attempts = HANDLERS[kind].max_attempts or getattr(settings, 'TODO_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    return Job.objects.create(kind=kind, user=user, payload=payload, max_attempts=max_attempts)
+
+
+def claim(worker, limit):
+    """
+    Mark up to `limit` due jobs as running for `worker`, oldest first, and
+    return their ids. Each attempt is counted when it is claimed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pks = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if pks:
+            Job.objects.filter(pk__in=pks).update(
+                status=Job.Status.RUNNING,
+                locked_by=worker,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+    return pks
+
+
+def heartbeat(pks):
+    """Refresh the locks of jobs a live worker is still running."""
+    Job.objects.filter(pk__in=pks, status=Job.Status.RUNNING).update(locked_at=timezone.now())
+
+
+def requeue_stale():
+    """
+    Give up on running jobs whose worker stopped reporting in: put them back
+    in the queue, or fail them if that was their last attempt. Returns the
+    number of jobs requeued.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - stale_after())
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED, finished_at=now, locked_by='', error='The worker stopped responding.',
+    )
+    return stale.update(status=Job.Status.QUEUED, run_after=now, locked_by='', locked_at=None)
+
+
+def delete_finished(older_than):
+    """Delete succeeded and failed jobs that finished more than `older_than` (a timedelta) ago."""
+    cutoff = timezone.now() - older_than
+    deleted, _per_model = Job.objects.filter(
+        status__in=[Job.Status.SUCCEEDED, Job.Status.FAILED], finished_at__lt=cutoff,
+    ).delete()
+    return deleted
+
+
+# --- Running ---
+
+def run(job):
+    """
+    Run one claimed job and record the outcome: its result, or the error and
+    either a later retry or, after the last attempt, failure.
+    """
+    function = HANDLERS.get(job.kind)
+    try:
+        if function is None:
+            raise LookupError(f'No handler for job kind: {job.kind}')
+        result = function(job, **job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        job.locked_by, job.locked_at = '', None
+        if function is not None and job.attempts < job.max_attempts:
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + retry_delay() * 2 ** (job.attempts - 1)
+            logger.warning('Job %s failed (attempt %d of %d); retrying at %s', job, job.attempts, job.max_attempts, job.run_after)
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+            logger.error('Job %s failed after %d attempt(s)', job, job.attempts, exc_info=True)
+        job.save(update_fields=['status', 'error', 'run_after', 'finished_at', 'locked_by', 'locked_at'])
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job
+
+
+def execute(pk):
+    """
+    Load and run a claimed job by id; the worker pool's entry point. Stale
+    database connections are closed around each job, as around a request.
+    """
+    close_old_connections()
+    try:
+        return run(Job.objects.get(pk=pk)).status
+    finally:
+        close_old_connections()
+
+
+def run_pending(worker=None, limit=None):
+    """
+    Run due jobs one at a time in this thread until the queue is empty (or
+    `limit` jobs have run). Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while limit is None or count < limit:
+        pks = claim(worker, 1)
+        if not pks:
+            break
+        run(Job.objects.get(pk=pks[0]))
+        count += 1
+    return count
+
+
+# --- Handlers ---
+
+@handler('import_rows', max_attempts=1)
+def import_upload(job, kind, fmt, path):
+    """
+    Import an uploaded file saved by the import view, then delete it. Each
+    batch commits as it is written, so a failed import is not retried.
+    """
+    try:
+        with default_storage.open(path, 'rb') as file:
+            report = imports.import_rows(kind, job.user, imports.read_rows(file, fmt), progress=job.report_progress)
+    finally:
+        default_storage.delete(path)
+    job.report_progress(report.created + report.failed)
+    return {'created': report.created, 'failed': report.failed, 'errors': report.errors}
+
+
+@handler('purge_account')
+def purge_account(job, user_id, batch_size=trash.DEFAULT_BATCH_SIZE):
+    """Remove a deleted account's rows and then the user (see trash.purge_account)."""
+    return {'deleted': trash.purge_account(user_id, batch_size)}
+
+
+@handler('rebuild_user_stats')
+def rebuild_user_stats(job, user_ids, batch_size=500):
+    """Recount the dashboard counters of the given users, `batch_size` users at a time."""
+    rebuilt = 0
+    job.report_progress(0, len(user_ids))
+    for start in range(0, len(user_ids), batch_size):
+        rebuilt += UserStats.rebuild(user_ids[start:start + batch_size], batch_size)
+        job.report_progress(rebuilt)
+    return {'rebuilt': rebuilt}
@@ -0,0 +1,137 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from todo_app.auth import user_cache
+from todo_app.metrics import percentile
+
+# name -> settings for the session and authentication layer; 'database' is
+# Django's default, 'user_cache' this project's (see settings.SESSION_ENGINE)
+CONFIGURATIONS = {
+    'database': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    },
+    'user_cache': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': ['todo_app.auth.CachedModelBackend'],
+    },
+    'cached_db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['todo_app.auth.CachedModelBackend'],
+    },
+    'signed_cookies': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'AUTHENTICATION_BACKENDS': ['todo_app.auth.CachedModelBackend'],
+    },
+}
+
+# The pages measured: the dashboard (index) and TaskListView
+URL_NAMES = ['note_app:index', 'note_app:task_list']
+
+# Tables whose queries are the per-request authentication cost
+AUTH_TABLES = ('"django_session"', '"auth_user"')
+
+
+class Command(BaseCommand):
+    """
+    Measures what the session and user caches (see todo_app/auth.py) save
+    on the dashboard and the task list: the same logged-in GET requests are
+    sent through Django's test client under Django's default database
+    sessions with ModelBackend, then under each faster configuration
+    (cached_db is only safe with one process or a shared cache). For every page
+    and configuration it reports the queries per request (and how many of
+    them are session/user lookups) and p50/p95 latency, with the change
+    against the database baseline. Run it against a database seeded with
+    realistic data.
+    """
+    help = 'Compare per-request auth queries and latency of the dashboard and task list across session/auth setups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='seed', help='Log in as users named <prefix>-N (default: seed).')
+        parser.add_argument('--users', type=int, default=20, help='How many of those users to rotate through (default: 20).')
+        parser.add_argument('--iterations', type=int, default=200, help='Timed requests per page (default: 200).')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per page first (default: 20).')
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send; must be allowed by ALLOWED_HOSTS (default: localhost).',
+        )
+
+    def handle(self, *args, **options):
+        users = list(
+            get_user_model().objects.filter(username__startswith=f'{options["prefix"]}-')
+            .order_by('pk')[:options['users']]
+        )
+        if not users:
+            raise CommandError(f'No users named "{options["prefix"]}-..."; run seed_data first.')
+
+        results = {}
+        for name, overrides in CONFIGURATIONS.items():
+            with override_settings(**overrides):
+                user_cache.clear()
+                # New clients, so the middleware is loaded with this session engine
+                clients = []
+                for user in users:
+                    client = Client(HTTP_HOST=options['host'])
+                    client.force_login(user)
+                    clients.append(client)
+                for url_name in URL_NAMES:
+                    results[name, url_name] = self.measure(clients, reverse(url_name), options)
+
+        baseline = 'database'
+        for url_name in URL_NAMES:
+            self.stdout.write(f'{url_name}:')
+            before = results[baseline, url_name]
+            for name in CONFIGURATIONS:
+                result = results[name, url_name]
+                line = (
+                    f'  {name:>14}: {result["queries"]:2d} queries ({result["auth_queries"]} auth)  '
+                    f'p50 {result["p50_ms"]:7.2f} ms  p95 {result["p95_ms"]:7.2f} ms'
+                )
+                if name != baseline:
+                    line += (
+                        f'  saves {before["queries"] - result["queries"]} queries, '
+                        f'p50 {100 * (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"]:+.1f}%'
+                    )
+                self.stdout.write(line)
+        stats = user_cache.stats()
+        self.stdout.write(f'User cache in the last run: {stats["hits"]} hits, {stats["misses"]} misses.')
+
+    def measure(self, clients, url, options):
+        for number in range(options['warmup']):
+            self.get(clients[number % len(clients)], url)
+
+        # Counted separately, as capturing queries slows the timed requests down
+        with CaptureQueriesContext(connection) as queries:
+            self.get(clients[0], url)
+        # Read now: the next request_started clears the connection's query log
+        captured = queries.captured_queries
+        auth_queries = sum(any(table in query['sql'] for table in AUTH_TABLES) for query in captured)
+
+        latencies = []
+        for number in range(options['iterations']):
+            started = time.perf_counter()
+            self.get(clients[number % len(clients)], url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return {
+            'queries': len(captured),
+            'auth_queries': auth_queries,
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+        }
+
+    def get(self, client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(
+                f'GET {url} returned {response.status_code} with {settings.SESSION_ENGINE}; '
+                'is --host in ALLOWED_HOSTS?'
+            )
+        return response
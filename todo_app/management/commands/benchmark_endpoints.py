@@ -0,0 +1,171 @@
+import json
+import platform
+import random
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from todo_app.metrics import percentile
+from todo_app.models import Note, Task
+
+# name -> (method, URL name, kind of object id the URL takes (if any), expected status)
+ENDPOINTS = {
+    'dashboard': ('get', 'note_app:index', None, 200),
+    'note_list': ('get', 'note_app:note_list', None, 200),
+    'note_detail': ('get', 'note_app:note_detail', 'note', 200),
+    'note_create': ('post', 'note_app:note_create', None, 302),
+    'note_update': ('post', 'note_app:note_update', 'note', 302),
+    'task_list': ('get', 'note_app:task_list', None, 200),
+    'task_create': ('post', 'note_app:task_create', None, 302),
+    'task_update': ('post', 'note_app:task_update', 'task', 302),
+    'task_toggle': ('post', 'note_app:task_toggle_complete', 'task', 302),
+}
+
+# Objects per user that detail/update/toggle requests pick from
+SAMPLE_OBJECTS = 50
+
+
+class Command(BaseCommand):
+    """
+    Repeatable benchmark of the main flows, driven through Django's test
+    client as users created by `seed_data`. Each endpoint is requested
+    --iterations times (after --warmup untimed requests), rotating through
+    the users. The command reports throughput and p50/p95/p99 latency per
+    endpoint and can save the results as JSON, or compare them with a
+    previous run. The create/update/toggle flows write to the database, so
+    run it against a scratch copy.
+    """
+    help = 'Benchmark dashboard, list, detail, create, update and toggle flows; report and save latency percentiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='seed', help='Log in as users named <prefix>-N (default: seed).')
+        parser.add_argument('--users', type=int, default=20, help='How many of those users to rotate through (default: 20).')
+        parser.add_argument('--iterations', type=int, default=200, help='Timed requests per endpoint (default: 200).')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per endpoint first (default: 20).')
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints', choices=sorted(ENDPOINTS),
+            help='Only run this endpoint (can be repeated; default: all).',
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send; must be allowed by ALLOWED_HOSTS (default: localhost).',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for picking objects (default: 0).')
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with the results in this JSON file.')
+
+    def handle(self, *args, **options):
+        users = list(
+            get_user_model().objects.filter(username__startswith=f'{options["prefix"]}-')
+            .order_by('pk')[:options['users']]
+        )
+        if not users:
+            raise CommandError(f'No users named "{options["prefix"]}-..."; run seed_data first.')
+
+        rng = random.Random(options['seed'])
+        sessions = []
+        for user in users:
+            client = Client(raise_request_exception=False, HTTP_HOST=options['host'])
+            client.force_login(user)
+            objects = {
+                'task': list(Task.objects.filter(user=user).values_list('pk', flat=True)[:SAMPLE_OBJECTS]),
+                'note': list(Note.objects.filter(user=user).values_list('pk', flat=True)[:SAMPLE_OBJECTS]),
+            }
+            sessions.append((client, objects))
+
+        results = {}
+        for name in options['endpoints'] or ENDPOINTS:
+            results[name] = self.run_endpoint(name, sessions, rng, options['warmup'], options['iterations'])
+            self.report(name, results[name])
+
+        output = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'debug': settings.DEBUG,
+                'users': len(users),
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+            },
+            'endpoints': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(output, file, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}.')
+        if options['baseline']:
+            self.compare(results, options['baseline'])
+
+    def run_endpoint(self, name, sessions, rng, warmup, iterations):
+        method, url_name, target, expected = ENDPOINTS[name]
+        latencies, errors = [], 0
+
+        for number in range(warmup + iterations):
+            client, objects = sessions[number % len(sessions)]
+            if target and not objects[target]:
+                continue
+            url = reverse(url_name, args=[rng.choice(objects[target])] if target else [])
+            data = {'title': f'Benchmark {number}', 'content': 'Written by the benchmark.'} if method == 'post' else None
+
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            elapsed = time.perf_counter() - started
+
+            if number < warmup:
+                continue
+            if response.status_code != expected:
+                errors += 1
+            latencies.append(elapsed * 1000)
+
+        latencies.sort()
+        if not latencies:
+            return {'requests': 0, 'errors': errors}
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': round(len(latencies) / (sum(latencies) / 1000), 1),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'max_ms': round(latencies[-1], 3),
+        }
+
+    def report(self, name, result):
+        if not result['requests']:
+            self.stdout.write(f'{name:>12}: skipped (the users have no rows to request)')
+            return
+        self.stdout.write(
+            f'{name:>12}: {result["throughput"]:8.1f} req/s  '
+            f'p50 {result["p50_ms"]:7.2f} ms  p95 {result["p95_ms"]:7.2f} ms  p99 {result["p99_ms"]:7.2f} ms'
+            + (self.style.ERROR(f'  {result["errors"]} unexpected responses') if result['errors'] else '')
+        )
+
+    def compare(self, results, path):
+        """Print the percentage change of each percentile against a saved run (negative is faster)."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                baseline = json.load(file)['endpoints']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Could not read baseline {path}: {error}')
+
+        self.stdout.write(f'Change against {path}:')
+        for name, result in results.items():
+            before = baseline.get(name)
+            if not before or not before.get('requests') or not result['requests']:
+                continue
+            changes = '  '.join(
+                f'{key[:-3]} {100 * (result[key] - before[key]) / before[key]:+6.1f}%'
+                for key in ('p50_ms', 'p95_ms', 'p99_ms')
+                if before[key]
+            )
+            self.stdout.write(f'{name:>12}: {changes}')
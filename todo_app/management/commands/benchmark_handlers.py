@@ -0,0 +1,142 @@
+import asyncio
+import io
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+DEFAULT_PATHS = ['/', '/notes/', '/tasks/']
+
+
+class Command(BaseCommand):
+    """
+    Compares WSGI and ASGI throughput for the read paths by sending the same
+    logged-in GET requests through Django's WSGIHandler (on a thread pool)
+    and ASGIHandler (as concurrent asyncio tasks), in this process.
+
+    No web server is involved, so the numbers isolate what the handler and
+    the views cost: for ASGI that is the async views without the
+    sync-to-async thread hop, for WSGI the same views driven synchronously.
+    Run it against a database seeded with realistic data.
+    """
+    help = 'Measure requests/second for the dashboard and list pages under WSGI and ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to log in as (their rows are what the pages show).')
+        parser.add_argument(
+            'paths', nargs='*', default=DEFAULT_PATHS,
+            help=f'Paths to request, in turn (default: {" ".join(DEFAULT_PATHS)}).',
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Requests per handler (default: 500).')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once (default: 10).')
+        parser.add_argument(
+            '--handler', choices=['wsgi', 'asgi', 'both'], default='both',
+            help='Which handler(s) to measure (default: both).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user named "{options["username"]}".')
+
+        # A real session row, exactly what a browser would present
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+        paths = options['paths']
+        requests = [paths[i % len(paths)] for i in range(options['requests'])]
+        runners = {'wsgi': self.run_wsgi, 'asgi': self.run_asgi}
+        names = list(runners) if options['handler'] == 'both' else [options['handler']]
+
+        for name in names:
+            elapsed, statuses = runners[name](requests, cookie, options['concurrency'])
+            self.stdout.write(
+                f'{name.upper()}: {len(requests)} requests in {elapsed:.2f}s = '
+                f'{len(requests) / elapsed:.1f} req/s '
+                f'(concurrency {options["concurrency"]}, statuses {dict(statuses)})'
+            )
+
+    # --- Handlers ---
+
+    def run_wsgi(self, requests, cookie, concurrency):
+        handler = WSGIHandler()
+
+        def call(path):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost',
+                'HTTP_COOKIE': cookie,
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+            }
+            status = []
+            body = handler(environ, lambda code, headers, exc_info=None: status.append(code))
+            # Drain the body as a server would, which also closes the response
+            b''.join(body)
+            if hasattr(body, 'close'):
+                body.close()
+            return int(status[0].split()[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = Counter(pool.map(call, requests))
+        return time.perf_counter() - started, statuses
+
+    def run_asgi(self, requests, cookie, concurrency):
+        handler = ASGIHandler()
+
+        async def call(path, limit):
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+                'server': ('localhost', 80),
+                'client': ('127.0.0.1', 0),
+            }
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # The client never disconnects; Django cancels this wait when it is done
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            async with limit:
+                await handler(scope, receive, send)
+            return status[0]
+
+        async def run_all():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(call(path, limit) for path in requests))
+
+        started = time.perf_counter()
+        statuses = Counter(asyncio.run(run_all()))
+        return time.perf_counter() - started, statuses
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import time
+from copy import deepcopy
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from todo_app.database import DEFAULT_SQLITE_PRAGMAS, get_sqlite_pragmas
+
+ALIAS = 'write_benchmark'
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class Command(BaseCommand):
+    """
+    Shows what the SQLite tuning (todo_app/database.py and the DATABASES
+    options) does for concurrent writers. Several threads run short write
+    transactions shaped like the app's own (read a counter, insert a row,
+    update the counter) against a scratch database file, once with Django's
+    stock SQLite setup and once with the configured one, and the command
+    reports the "database is locked" error rate and latency percentiles.
+    """
+    help = 'Compare concurrent-write error rate and latency with and without the SQLite tuning.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers (default: 8).')
+        parser.add_argument('--writes', type=int, default=200, help='Transactions per writer (default: 200).')
+
+    def handle(self, *args, **options):
+        base = connections.settings[DEFAULT_DB_ALIAS]
+        if base['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('This benchmark only applies to the SQLite backend.')
+
+        # Django's defaults: deferred transactions, rollback journal, a new connection per request
+        stock = dict(deepcopy(base), CONN_MAX_AGE=0, OPTIONS={})
+        modes = [
+            ('stock', stock, dict.fromkeys(DEFAULT_SQLITE_PRAGMAS)),
+            ('tuned', deepcopy(base), get_sqlite_pragmas()),
+        ]
+        for name, settings_dict, pragmas in modes:
+            with tempfile.TemporaryDirectory() as directory:
+                settings_dict['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+                with override_settings(TODO_SQLITE_PRAGMAS=pragmas):
+                    self.report(name, self.run(settings_dict, options['threads'], options['writes']))
+
+    def report(self, name, result):
+        latencies, errors, elapsed = result
+        total = len(latencies) + errors
+        latencies.sort()
+        self.stdout.write(
+            f'{name:>6}: {total} transactions in {elapsed:.2f}s, '
+            f'{errors} locked ({100 * errors / total:.1f}%), '
+            f'p50 {percentile(latencies, 0.50) * 1000:.1f} ms, '
+            f'p99 {percentile(latencies, 0.99) * 1000:.1f} ms'
+        )
+
+    def run(self, settings_dict, threads, writes):
+        # A copy of the already-configured default entry, so every setting is filled in
+        connections.settings[ALIAS] = settings_dict
+        try:
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT)')
+                cursor.execute('CREATE TABLE stats (user_id INTEGER PRIMARY KEY, total INTEGER)')
+                cursor.executemany('INSERT INTO stats VALUES (%s, 0)', [(user,) for user in range(threads)])
+            connections[ALIAS].close()
+
+            latencies, errors = [], []
+            lock = threading.Lock()
+
+            def writer(user):
+                own_latencies, own_errors = [], 0
+                for number in range(writes):
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                            cursor.execute('SELECT total FROM stats WHERE user_id = %s', [user])
+                            cursor.fetchone()
+                            cursor.execute('INSERT INTO item (user_id, title) VALUES (%s, %s)', [user, f'Task {number}'])
+                            cursor.execute('UPDATE stats SET total = total + 1 WHERE user_id = %s', [user])
+                        own_latencies.append(time.perf_counter() - started)
+                    except OperationalError:
+                        own_errors += 1
+                    # What request_finished does at the end of every request
+                    connections[ALIAS].close_if_unusable_or_obsolete()
+                connections[ALIAS].close()
+                with lock:
+                    latencies.extend(own_latencies)
+                    errors.append(own_errors)
+
+            workers = [threading.Thread(target=writer, args=(user,)) for user in range(threads)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            return latencies, sum(errors), time.perf_counter() - started
+        finally:
+            connections[ALIAS].close()
+            # Forget this thread's wrapper too, so the next run connects to its own file
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
@@ -0,0 +1,53 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app import assets
+
+
+class Command(BaseCommand):
+    """
+    Builds the app's CSS and icon sprite into todo_app/static/todo_app/build/
+    (see todo_app/assets.py). Run it before `collectstatic`, which then
+    stores both under hashed names with precompressed copies.
+
+    Needs the Tailwind standalone CLI (e.g. `pip install pytailwindcss`, or
+    set TODO_TAILWIND_CLI) and the `lucide` package for the icon sources;
+    neither is needed at runtime.
+    """
+    help = 'Compile the used Tailwind classes and the used Lucide icons into static build files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tailwind', default=getattr(settings, 'TODO_TAILWIND_CLI', 'tailwindcss'),
+            help='Tailwind CLI executable (default: TODO_TAILWIND_CLI, or "tailwindcss" on PATH).',
+        )
+        parser.add_argument('--skip-css', action='store_true', help='Only rebuild the icon sprite.')
+        parser.add_argument('--skip-icons', action='store_true', help='Only rebuild the stylesheet.')
+
+    def handle(self, *args, **options):
+        if not options['skip_css']:
+            try:
+                css = assets.build_stylesheet(options['tailwind'])
+            except OSError as error:
+                raise CommandError(f'Could not run the Tailwind CLI "{options["tailwind"]}": {error}')
+            except subprocess.CalledProcessError as error:
+                raise CommandError(f'The Tailwind CLI failed with exit status {error.returncode}.')
+            self.stdout.write(f'{css.relative_to(assets.APP_DIR.parent)}: {css.stat().st_size:,} bytes')
+
+        if not options['skip_icons']:
+            try:
+                load_svg = assets.lucide_icons()
+            except ModuleNotFoundError:
+                raise CommandError('Building the icon sprite needs the "lucide" package (pip install lucide).')
+            names = assets.used_icons()
+            try:
+                sprite = assets.build_icon_sprite(names, load_svg)
+            except LookupError as error:
+                raise CommandError(str(error))
+            self.stdout.write(
+                f'{sprite.relative_to(assets.APP_DIR.parent)}: {len(names)} icons, {sprite.stat().st_size:,} bytes'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Assets built; run collectstatic to hash and compress them.'))
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app.imports import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, IMPORT_FORMS, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Loads notes or tasks for one user from a CSV or NDJSON file.
+    The file is streamed and written in batches, so large files use
+    little memory; invalid rows are reported and skipped.
+    """
+    help = 'Bulk-import notes or tasks for a user from a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORT_FORMS), help='What to import.')
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--user', dest='username', required=True, help='Owner of the imported rows.')
+        parser.add_argument(
+            '--format', dest='fmt', choices=IMPORT_FORMATS,
+            help='File format (default: guessed from the file extension).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Number of rows inserted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user named "{options["username"]}".')
+
+        fmt = options['fmt'] or ('ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'csv')
+        with open(options['path'], 'rb') as stream:
+            report = import_rows(options['kind'], user, read_rows(stream, fmt), batch_size=options['batch_size'])
+
+        for line, messages in report.errors:
+            self.stderr.write(f'Line {line}: {"; ".join(messages)}')
+        if report.failed > len(report.errors):
+            self.stderr.write(f'... and {report.failed - len(report.errors)} more error(s).')
+        self.stdout.write(self.style.SUCCESS(f'Imported {report.created} row(s), skipped {report.failed}.'))
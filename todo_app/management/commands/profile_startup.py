@@ -0,0 +1,195 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+# Run in a fresh interpreter: load the WSGI module as a server does, then time
+# two GET requests through the WSGI handler. Prints its timings as JSON.
+CHILD_SCRIPT = '''
+import io, json, sys, time
+options = json.loads(sys.argv[1])
+started = time.perf_counter()
+
+from django.conf import settings
+settings.TODO_WARMUP = options['warmup']
+from django.utils.module_loading import import_string
+application = import_string(settings.WSGI_APPLICATION)
+setup = time.perf_counter() - started
+
+def get():
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': options['path'], 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': options['host'], 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': options['host'], 'HTTP_COOKIE': options['cookie'],
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    started = time.perf_counter()
+    body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    b''.join(body)
+    body.close()
+    return int(status[0].split()[0]), time.perf_counter() - started
+
+first_status, first = get()
+first_done = time.time()
+second_status, second = get()
+print(json.dumps({
+    'setup': setup, 'first': first, 'second': second, 'first_done': first_done,
+    'statuses': [first_status, second_status],
+}))
+'''
+
+# (label, TODO_WARMUP) for each configuration measured
+CONFIGURATIONS = [('no warm-up', False), ('warm-up', True)]
+
+
+def parse_importtime(output):
+    """
+    Turn `python -X importtime` output into (name, depth, self µs,
+    cumulative µs) tuples, in the order printed: each module after the
+    modules it imported.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # the header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def time_per_app(modules, app_names):
+    """
+    Cumulative import time (µs) per app: each import of one of its modules
+    that was not already inside another app's import. Counting an import
+    once, for the first app that pulled it in, keeps the totals from overlapping.
+    """
+    def app_of(name):
+        for app_name in app_names:
+            if name == app_name or name.startswith(app_name + '.'):
+                return app_name
+        return None
+
+    totals = dict.fromkeys(app_names, 0)
+    # Reversed, the output lists every module before the modules it imported
+    stack = []  # (depth, app that owns this subtree, or None)
+    for name, depth, _self_us, cumulative_us in reversed(modules):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        owner = stack[-1][1] if stack else None
+        if owner is None:
+            owner = app_of(name)
+            if owner is not None:
+                totals[owner] += cumulative_us
+        stack.append((depth, owner))
+    return totals
+
+
+class Command(BaseCommand):
+    """
+    Measures what a freshly started worker costs, for deployments that
+    recycle workers often.
+
+    First it starts one Python process with -X importtime and reports the
+    import time of each INSTALLED_APPS entry (everything imported while
+    loading that app and its models, the first time anything imported it)
+    and of the slowest single modules. Then it starts --runs fresh processes
+    with TODO_WARMUP off and --runs with it on (see todo_app/warmup.py). Each
+    process imports WSGI_APPLICATION as a server does and sends two logged-in GET
+    requests through the WSGI handler. The report gives the median startup
+    time, the first and second request, and the time from spawning the
+    process to the first response.
+    """
+    help = 'Profile startup imports per app and module, and time-to-first-response with and without warm-up.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to log in as for the timed requests.')
+        parser.add_argument('--path', default='/', help='Path to request (default: /, the dashboard).')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per configuration (default: 5).')
+        parser.add_argument('--top', type=int, default=15, help='Slowest modules to list (default: 15).')
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send; must be allowed by ALLOWED_HOSTS (default: localhost).',
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1.')
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user named "{options["username"]}".')
+
+        # A real session row; the child processes start with empty caches and load it
+        client = Client()
+        client.force_login(user)
+        child_options = {
+            'path': options['path'],
+            'host': options['host'],
+            'cookie': f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}',
+        }
+
+        self.report_imports(child_options, options['top'])
+        self.report_first_response(child_options, options['runs'])
+
+    def spawn(self, child_options, warmup, importtime=False):
+        """Run the child script once; returns (timings, stderr, seconds from spawn to first response)."""
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', CHILD_SCRIPT, json.dumps(dict(child_options, warmup=warmup))]
+        # The child must find the same modules and settings as this process
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        spawned = time.time()
+        result = subprocess.run(command, capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise CommandError(f'The profiled process failed:\n{result.stderr}')
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        if timings['statuses'][0] >= 400:
+            raise CommandError(f'GET {child_options["path"]} returned {timings["statuses"][0]}; is --host allowed?')
+        return timings, result.stderr, timings['first_done'] - spawned
+
+    # --- Reports ---
+
+    def report_imports(self, child_options, top):
+        _timings, stderr, _first_response = self.spawn(child_options, warmup=False, importtime=True)
+        modules = parse_importtime(stderr)
+        total_us = sum(cumulative_us for _name, depth, _self_us, cumulative_us in modules if depth == 0)
+        app_names = [app_config.name for app_config in apps.get_app_configs()]
+        per_app = time_per_app(modules, app_names)
+
+        self.stdout.write(f'Imports: {len(modules)} modules, {total_us / 1000:.1f} ms in total (-X importtime).')
+        self.stdout.write('  Per INSTALLED_APPS entry:')
+        for entry, app_name in zip(settings.INSTALLED_APPS, app_names):
+            self.stdout.write(f'    {entry:<40} {per_app[app_name] / 1000:8.1f} ms')
+        rest_us = total_us - sum(per_app.values())
+        self.stdout.write(f'    {"(Python, Django, settings and the rest)":<40} {rest_us / 1000:8.1f} ms')
+        self.stdout.write('  Slowest modules (own time, without their imports):')
+        for name, _depth, self_us, _cumulative_us in sorted(modules, key=lambda module: -module[2])[:top]:
+            self.stdout.write(f'    {name:<60} {self_us / 1000:8.1f} ms')
+
+    def report_first_response(self, child_options, runs):
+        self.stdout.write(f'Fresh processes, GET {child_options["path"]} (median of {runs}):')
+        self.stdout.write(f'  {"":<12} {"startup":>10} {"1st request":>12} {"2nd request":>12} {"to 1st response":>16}')
+        for label, warmup in CONFIGURATIONS:
+            samples = [self.spawn(child_options, warmup) for _run in range(runs)]
+            median = {
+                key: statistics.median(timings[key] for timings, _stderr, _first_response in samples) * 1000
+                for key in ('setup', 'first', 'second')
+            }
+            first_response = statistics.median(first_response for _timings, _stderr, first_response in samples) * 1000
+            self.stdout.write(
+                f'  {label:<12} {median["setup"]:7.1f} ms {median["first"]:9.1f} ms '
+                f'{median["second"]:9.1f} ms {first_response:13.1f} ms'
+            )
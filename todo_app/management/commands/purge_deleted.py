@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app import jobs, trash
+
+
+class Command(BaseCommand):
+    """
+    Hard-deletes trashed tasks and notes once they are past the retention
+    period, and empties accounts whose deletion was requested (see
+    todo_app/trash.py). Rows are deleted a batch per transaction, so the
+    command can run from cron alongside live traffic. Finished background
+    jobs older than the retention period are removed too.
+    """
+    help = 'Permanently remove soft-deleted tasks and notes, and finish pending account deletions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=float,
+            help=f'Keep trashed rows younger than this (default: TODO_TRASH_RETENTION_DAYS, {trash.DEFAULT_RETENTION_DAYS}).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=trash.DEFAULT_BATCH_SIZE,
+            help=f'Rows deleted per transaction (default: {trash.DEFAULT_BATCH_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        older_than = options['older_than_days']
+        if older_than is not None:
+            older_than = timedelta(days=older_than)
+
+        accounts = trash.purge_accounts(batch_size=options['batch_size'])
+        purged = trash.purge_expired(older_than, batch_size=options['batch_size'])
+        finished = jobs.delete_finished(older_than if older_than is not None else trash.retention())
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged["task"]} task(s) and {purged["note"]} note(s); deleted {accounts} account(s) '
+            f'and {finished} finished job(s).'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app import search
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the FTS5 search tables from the Note and Task tables.
+    Useful after restoring a backup or loading data with raw SQL.
+    """
+    help = 'Rebuild the full-text search index for notes and tasks from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows read and inserted per batch.',
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('Full-text search requires the SQLite database backend.')
+        indexed = search.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} note(s) and task(s).'))
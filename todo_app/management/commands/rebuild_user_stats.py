@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from todo_app import jobs
+from todo_app.models import UserStats
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds (or repairs) the precomputed dashboard counters.
+    Counts are gathered with one grouped query per table and written back
+    with batched upserts, so this stays cheap even for many users.
+    With --background the rebuild is queued for the `run_jobs` worker instead.
+    """
+    help = 'Recompute the per-user dashboard counters from the Task and Note tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help='Only rebuild the counters for this username (can be repeated).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of stats rows written per INSERT statement.',
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue the rebuild as a background job and return at once.',
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        user_ids = list(users.values_list('pk', flat=True))
+
+        if options['background']:
+            job = jobs.enqueue('rebuild_user_stats', user_ids=user_ids, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Queued job #{job.pk} for {len(user_ids)} user(s).'))
+            return
+
+        rebuilt = UserStats.rebuild(user_ids, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {rebuilt} user(s).'))
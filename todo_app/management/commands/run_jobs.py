@@ -0,0 +1,115 @@
+import multiprocessing
+import signal
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from todo_app import jobs
+
+# Seconds between refreshing the locks of the jobs in flight (well under
+# TODO_JOB_STALE_AFTER) and looking for jobs abandoned by dead workers
+HEARTBEAT_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    """
+    Background job worker (see todo_app/jobs.py). Claims due jobs from the
+    database whenever a pool slot is free and runs them on a thread pool
+    (the default; the handlers mostly wait on the database) or a process
+    pool (for CPU-bound work). Several workers, on one machine or many, can
+    share the queue.
+
+    Runs until SIGTERM or Ctrl-C, after which it finishes the jobs in flight;
+    with --once it exits as soon as the queue is empty instead.
+    """
+    help = 'Run queued background jobs (imports, account purges, counter rebuilds) on a thread or process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Jobs run at the same time (default: 4).')
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default='thread',
+            help='Run jobs on threads or on separate processes (default: thread).',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait before looking again when the queue is empty (default: 1).',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit when no jobs are left instead of polling.')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+
+        if options['pool'] == 'process':
+            # Fresh interpreters rather than forks, so no process inherits an open
+            # database connection; each loads the settings and apps before its first job
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        else:
+            executor = ThreadPoolExecutor(options['workers'], thread_name_prefix='job')
+
+        stop = threading.Event()
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, lambda signum, frame: stop.set())
+
+        worker = jobs.worker_name()
+        self.stdout.write(f'Worker {worker}: {options["workers"]} {options["pool"]}(s).')
+        try:
+            with executor:
+                outcomes = self.work(worker, executor, stop, options)
+        finally:
+            for signum, previous in previous_handlers.items():
+                signal.signal(signum, previous)
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(outcomes.items())) or 'no jobs'
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped: {summary}.'))
+
+    def work(self, worker, executor, stop, options):
+        """Keep the pool busy until told to stop; returns a Counter of job outcomes."""
+        outcomes = Counter()
+        running = {}  # future -> job id
+        last_heartbeat = None
+
+        while True:
+            if last_heartbeat is None or time.monotonic() - last_heartbeat > HEARTBEAT_INTERVAL:
+                jobs.heartbeat(list(running.values()))
+                jobs.requeue_stale()
+                last_heartbeat = time.monotonic()
+
+            free = options['workers'] - len(running)
+            if free and not stop.is_set():
+                for pk in jobs.claim(worker, free):
+                    try:
+                        running[executor.submit(jobs.execute, pk)] = pk
+                    except BrokenExecutor as error:
+                        # Claimed jobs that never started are requeued once their lock goes stale
+                        raise CommandError(f'The worker pool stopped working: {error}')
+            if not running:
+                if stop.is_set() or options['once']:
+                    return outcomes
+                stop.wait(options['poll_interval'])
+                continue
+
+            done, _pending = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+            for future in done:
+                pk = running.pop(future)
+                try:
+                    status = future.result()
+                except Exception as error:
+                    # The job itself records its errors; this is the pool or the database failing
+                    self.stderr.write(f'Job #{pk}: {error!r}')
+                    status = 'error'
+                outcomes[status] += 1
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'Job #{pk}: {status}')
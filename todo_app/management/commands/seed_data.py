@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app.seeding import DEFAULT_BATCH_SIZE, SEED_PASSWORD, SeedProfile, seed_users
+
+
+class Command(BaseCommand):
+    """
+    Fills the database with realistic users, tasks and notes for benchmarks
+    (see todo_app/seeding.py). Rows are bulk-inserted in batches, and the
+    search index and dashboard counters are kept in sync as they are written.
+    """
+    help = 'Create N users with log-normally distributed tasks and notes.'
+
+    def add_arguments(self, parser):
+        defaults = SeedProfile()
+        parser.add_argument('--users', type=int, default=100, help='Number of users to create (default: 100).')
+        parser.add_argument('--prefix', default='seed', help='Usernames are <prefix>-1, <prefix>-2, ... (default: seed).')
+        parser.add_argument(
+            '--tasks', type=int, default=defaults.tasks,
+            help=f'Median tasks per user (default: {defaults.tasks}).',
+        )
+        parser.add_argument(
+            '--notes', type=int, default=defaults.notes,
+            help=f'Median notes per user (default: {defaults.notes}).',
+        )
+        parser.add_argument(
+            '--spread', type=float, default=defaults.count_spread,
+            help=f'Log-normal sigma of the per-user counts; 0 gives every user the median (default: {defaults.count_spread}).',
+        )
+        parser.add_argument(
+            '--completed', type=float, default=defaults.completed_ratio,
+            help=f'Share of tasks that are completed (default: {defaults.completed_ratio}).',
+        )
+        parser.add_argument(
+            '--note-words', type=int, default=defaults.note_words,
+            help=f'Median words per note (default: {defaults.note_words}).',
+        )
+        parser.add_argument(
+            '--max-note-words', type=int, default=defaults.max_note_words,
+            help=f'Longest generated note, in words (default: {defaults.max_note_words}).',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed, for repeatable data.')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows per INSERT (default: {DEFAULT_BATCH_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if get_user_model().objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Users named "{prefix}-..." already exist; pick another --prefix.')
+
+        profile = SeedProfile(
+            tasks=options['tasks'],
+            notes=options['notes'],
+            count_spread=options['spread'],
+            completed_ratio=options['completed'],
+            note_words=options['note_words'],
+            max_note_words=options['max_note_words'],
+        )
+        started = time.perf_counter()
+        users, tasks, notes = seed_users(
+            options['users'], prefix=prefix, profile=profile, seed=options['seed'], batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users, {tasks} tasks and {notes} notes in {elapsed:.1f}s '
+            f'({(tasks + notes) / elapsed:.0f} rows/s). Password for every user: "{SEED_PASSWORD}".'
+        ))
@@ -0,0 +1,160 @@
+"""
+In-process request metrics.
+
+RequestMetricsMiddleware (middleware.py) records every request under its
+URL name (e.g. "note_app:task_list") into rolling histograms kept here, which
+the staff-only `metrics` view returns as JSON.
+
+Wall time and response size are always recorded. With
+settings.TODO_REQUEST_METRICS_DETAILED (on when DEBUG is) the middleware also
+opens a RequestMetrics for the request, which the database hook and the
+template backend below add to, and the breakdown is sent as a Server-Timing
+header. Each process keeps its own numbers.
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+DEFAULT_WINDOW = 1000
+
+# The RequestMetrics of the request being handled, if detailed metrics are on.
+# Context variables follow the request into sync_to_async() worker threads.
+current_metrics = ContextVar('todo_request_metrics', default=None)
+
+
+def metrics_enabled():
+    return getattr(settings, 'TODO_REQUEST_METRICS', True)
+
+
+def detailed_metrics_enabled():
+    return getattr(settings, 'TODO_REQUEST_METRICS_DETAILED', settings.DEBUG)
+
+
+class RequestMetrics:
+    """Time spent in the database and in templates while handling one request."""
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+# --- Histograms ---
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class RollingHistogram:
+    """Keeps the last `size` samples of one measurement and summarizes them on demand."""
+    __slots__ = ('samples', 'count')
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        values = sorted(self.samples)
+        if not values:
+            return {'count': self.count}
+        return {
+            'count': self.count,
+            'window': len(values),
+            'mean': round(sum(values) / len(values), 3),
+            'p50': round(percentile(values, 0.50), 3),
+            'p95': round(percentile(values, 0.95), 3),
+            'p99': round(percentile(values, 0.99), 3),
+            'max': round(values[-1], 3),
+        }
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def record(view_name, **values):
+    """Add one request's measurements (e.g. wall_ms=12.5) to the view's histograms."""
+    with _lock:
+        histograms = _histograms.get(view_name)
+        if histograms is None:
+            histograms = _histograms[view_name] = {}
+        for name, value in values.items():
+            histogram = histograms.get(name)
+            if histogram is None:
+                window = getattr(settings, 'TODO_REQUEST_METRICS_WINDOW', DEFAULT_WINDOW)
+                histogram = histograms[name] = RollingHistogram(window)
+            histogram.add(value)
+
+
+def snapshot():
+    """Summaries of every histogram, as {view name: {measurement: summary}}."""
+    with _lock:
+        return {
+            view_name: {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+            for view_name, histograms in sorted(_histograms.items())
+        }
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# --- Collection Hooks ---
+
+def time_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper (see signals.py) that adds each query's duration
+    to the current request's metrics, if there is one.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+class TimedTemplate(Template):
+    """Template whose top-level render() time is added to the current request's metrics."""
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The standard Django template backend, returning TimedTemplates. Included
+    templates are rendered inside their parent, so each page or fragment is
+    timed exactly once.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,180 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import assets, metrics, nplusone
+
+# Recorded for requests that did not match any URL pattern
+UNRESOLVED = '<unresolved>'
+
+
+class StaticAssetMiddleware:
+    """
+    Serves the collectstatic output (STATIC_ROOT) in production, with the
+    precompressed variants and far-future cache headers described in
+    assets.py. The directory is indexed once when the process starts, so a
+    static request costs one dict lookup and, after the first hit, no disk
+    access; everything else passes straight through.
+
+    Put it first in MIDDLEWARE so asset requests skip sessions, auth and the
+    request metrics. It removes itself unless TODO_SERVE_STATIC is on (the
+    default when DEBUG is off; in development runserver serves static files).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TODO_SERVE_STATIC', not settings.DEBUG) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Django applies the script prefix to a relative STATIC_URL, giving e.g. '/static/'
+        self.index = assets.build_index(settings.STATIC_ROOT, settings.STATIC_URL)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        asset = self.find(request)
+        return asset.response(request) if asset else self.get_response(request)
+
+    async def __acall__(self, request):
+        asset = self.find(request)
+        return asset.response(request) if asset else await self.get_response(request)
+
+    def find(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return self.index.get(request.path_info)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time and response size for every request under its URL
+    name, plus DB queries, DB time and template time when detailed metrics
+    are on (the default with DEBUG). Detailed requests also get a
+    Server-Timing header, which browser dev tools show per request.
+
+    Put it first in MIDDLEWARE so the wall time covers the whole stack.
+    With detailed metrics off the per-request cost is two perf_counter()
+    calls and one histogram update; with TODO_REQUEST_METRICS = False the
+    middleware removes itself entirely.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.detailed = metrics.detailed_metrics_enabled()
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request_metrics, token = self.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                metrics.current_metrics.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics, token = self.start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                metrics.current_metrics.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, request_metrics)
+
+    def start(self):
+        if not self.detailed:
+            return None, None
+        request_metrics = metrics.RequestMetrics()
+        return request_metrics, metrics.current_metrics.set(request_metrics)
+
+    def finish(self, request, response, elapsed, request_metrics):
+        match = request.resolver_match
+        view_name = match.view_name if match else UNRESOLVED
+        size = len(response.content) if not response.streaming else 0
+
+        if request_metrics is None:
+            metrics.record(view_name, wall_ms=elapsed * 1000, bytes=size)
+            return response
+
+        metrics.record(
+            view_name,
+            wall_ms=elapsed * 1000,
+            bytes=size,
+            queries=request_metrics.queries,
+            db_ms=request_metrics.db_time * 1000,
+            template_ms=request_metrics.template_time * 1000,
+        )
+        response.headers['Server-Timing'] = (
+            f'total;dur={elapsed * 1000:.2f}, '
+            f'db;dur={request_metrics.db_time * 1000:.2f};desc="{request_metrics.queries} queries", '
+            f'tpl;dur={request_metrics.template_time * 1000:.2f}'
+        )
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Flags requests that run the same query shape more than
+    TODO_NPLUSONE_THRESHOLD times (see nplusone.py): raises NPlusOneDetected
+    when TODO_NPLUSONE is 'raise', logs a warning with the call sites when
+    it is 'log', and removes itself when it is None.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.mode = nplusone.detection_mode()
+        if self.mode not in ('raise', 'log'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = nplusone.get_threshold()
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        tracker = nplusone.QueryTracker(self.threshold)
+        token = nplusone.current_tracker.set(tracker)
+        try:
+            response = self.get_response(request)
+        finally:
+            nplusone.current_tracker.reset(token)
+        self.check(request, tracker)
+        return response
+
+    async def __acall__(self, request):
+        tracker = nplusone.QueryTracker(self.threshold)
+        token = nplusone.current_tracker.set(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            nplusone.current_tracker.reset(token)
+        self.check(request, tracker)
+        return response
+
+    def check(self, request, tracker):
+        if not tracker.sites:
+            return
+        match = request.resolver_match
+        report = tracker.report(f'{request.method} {request.path} ({match.view_name if match else UNRESOLVED})')
+        if self.mode == 'raise':
+            raise nplusone.NPlusOneDetected(report)
+        nplusone.logger.warning(report)
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def check_no_ownerless_rows(apps, schema_editor):
+    """
+    Refuse to run while tasks or notes have no user (allowed by 0002), since
+    `user` becomes NOT NULL below. They are never shown to anyone, but they
+    are still data: assign them to a user or delete them first.
+    """
+    ownerless = {
+        model_name: apps.get_model('todo_app', model_name).objects.filter(user__isnull=True).count()
+        for model_name in ('Task', 'Note')
+    }
+    if any(ownerless.values()):
+        raise RuntimeError(
+            f'{ownerless["Task"]} task(s) and {ownerless["Note"]} note(s) have no user, and this '
+            'migration makes the user required. Assign them to a user or delete them '
+            '(e.g. Task.objects.filter(user=None).update(user=...)), then run migrate again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0002_alter_task_options_alter_note_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='note',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Study Note', 'verbose_name_plural': 'Study Notes'},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['completed', '-created_at'], 'verbose_name': 'To-Do Task', 'verbose_name_plural': 'To-Do Tasks'},
+        ),
+        # Task.due_date is left alone, with its data; 0012 updates its definition.
+        # Stop before `user` becomes NOT NULL at the end if any row has none
+        migrations.RunPython(check_no_ownerless_rows, migrations.RunPython.noop),
+        migrations.RenameField(
+            model_name='task',
+            old_name='is_completed',
+            new_name='completed',
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Last Updated'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='completed',
+            field=models.BooleanField(default=False, verbose_name='Completed'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='content',
+            field=models.TextField(blank=True, verbose_name='Content'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Created At'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='title',
+            field=models.CharField(max_length=200, verbose_name='Title'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notes', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Created At'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='description',
+            field=models.TextField(blank=True, verbose_name='Description (Optional)'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='title',
+            field=models.CharField(max_length=255, verbose_name='Task Title'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+    ]
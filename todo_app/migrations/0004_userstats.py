@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('todo_app', '0003_sync_note_and_task_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('total_tasks', models.IntegerField(default=0, verbose_name='Total Tasks')),
+                ('completed_tasks', models.IntegerField(default=0, verbose_name='Completed Tasks')),
+                ('total_notes', models.IntegerField(default=0, verbose_name='Total Notes')),
+            ],
+            options={
+                'verbose_name': 'User Stats',
+                'verbose_name_plural': 'User Stats',
+            },
+        ),
+    ]
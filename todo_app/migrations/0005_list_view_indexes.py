@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0004_userstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', '-updated_at'], name='note_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'completed', '-created_at'], name='task_user_status_created_idx'),
+        ),
+    ]
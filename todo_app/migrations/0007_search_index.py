@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.utils.html import strip_tags
+
+SEARCH_TABLES = {
+    'Note': ('todo_app_note_fts', 'title', 'content'),
+    'Task': ('todo_app_task_fts', 'title', 'description'),
+}
+
+
+def create_search_tables(apps, schema_editor):
+    """Create and populate the FTS5 tables (SQLite only; see todo_app/search.py)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for model_name, (table, title_field, body_field) in SEARCH_TABLES.items():
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                f"USING fts5(owner, title, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+            model = apps.get_model('todo_app', model_name)
+            rows = [
+                (obj.pk, f'u{obj.user_id}', getattr(obj, title_field), strip_tags(getattr(obj, body_field)))
+                for obj in model.objects.order_by().iterator(chunk_size=1000)
+            ]
+            cursor.executemany(
+                f'INSERT INTO {table} (rowid, owner, title, body) VALUES (%s, %s, %s, %s)', rows
+            )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, _title, _body in SEARCH_TABLES.values():
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0006_keyset_index_tiebreaker'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
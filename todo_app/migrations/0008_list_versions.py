@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='note_list_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Note List Version'),
+        ),
+        migrations.AddField(
+            model_name='userstats',
+            name='task_list_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Task List Version'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0008_list_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=150, verbose_name='Excerpt'),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Word Count'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Frozen copy of todo_app.models.summarize_content at the time of this migration
+EXCERPT_LENGTH = 150
+BATCH_SIZE = 500
+
+
+def summarize_content(content):
+    words = strip_tags(content or '').split()
+    return Truncator(' '.join(words)).chars(EXCERPT_LENGTH), len(words)
+
+
+def backfill_excerpts(apps, schema_editor):
+    """Fill excerpt/word_count for existing notes, BATCH_SIZE rows per UPDATE batch."""
+    Note = apps.get_model('todo_app', 'Note')
+    batch = []
+    for note in Note.objects.order_by().only('pk', 'content').iterator(chunk_size=BATCH_SIZE):
+        note.excerpt, note.word_count = summarize_content(note.content)
+        batch.append(note)
+        if len(batch) >= BATCH_SIZE:
+            Note.objects.bulk_update(batch, ['excerpt', 'word_count'])
+            batch = []
+    if batch:
+        Note.objects.bulk_update(batch, ['excerpt', 'word_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0009_note_excerpt'),
+    ]
+
+    operations = [
+        # Nothing to undo: 0009's reverse drops the columns
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
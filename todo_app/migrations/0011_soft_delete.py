@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('todo_app', '0010_backfill_note_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='deletion', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('requested_at', models.DateTimeField(auto_now_add=True, verbose_name='Requested At')),
+            ],
+            options={
+                'verbose_name': 'Account Deletion',
+                'verbose_name_plural': 'Account Deletions',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='note',
+            name='note_user_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_user_status_created_idx',
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted At'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted At'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['user', '-updated_at', '-id'], name='note_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), _negated=True), fields=['deleted_at'], name='note_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['user', 'completed', '-created_at', '-id'], name='task_user_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), _negated=True), fields=['deleted_at'], name='task_deleted_idx'),
+        ),
+    ]
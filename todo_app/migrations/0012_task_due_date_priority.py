@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0011_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The column was never dropped (see 0003); only its verbose name changes
+        migrations.AlterField(
+            model_name='task',
+            name='due_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Due Date'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Low'), (2, 'Normal'), (3, 'High')], default=2, verbose_name='Priority'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['user', 'completed', 'due_date'], name='task_user_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0012_task_due_date_priority'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='Kind')),
+                ('payload', models.JSONField(default=dict, verbose_name='Payload')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=1, verbose_name='Max Attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run After')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Locked By')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Locked At')),
+                ('progress_done', models.PositiveIntegerField(default=0, verbose_name='Progress Done')),
+                ('progress_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Progress Total')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Result')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Background Job',
+                'verbose_name_plural': 'Background Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx'), models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing tasks were last changed, as far as we know, when they were created."""
+    Task = apps.get_model('todo_app', 'Task')
+    Task._base_manager.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0013_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Last Updated'),
+            preserve_default=False,
+        ),
+        # Nothing to undo: reversing the AddField drops the column
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='note_user_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='task_user_sync_idx'),
+        ),
+    ]
@@ -1,12 +1,88 @@
 
 
 
-from django.db import models
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 
 # Get the custom or default User model for Foreign Keys
 User = get_user_model()
 
+# Length of the stored plain-text preview shown in note lists
+EXCERPT_LENGTH = 150
+
+
+def summarize_content(content):
+    """
+    Return (excerpt, word count) for a note body: the first EXCERPT_LENGTH
+    characters of its plain text, and the number of words in it.
+    """
+    words = strip_tags(content or '').split()
+    return Truncator(' '.join(words)).chars(EXCERPT_LENGTH), len(words)
+
+
+# --- Soft Delete ---
+
+# Matches live rows only; the list indexes are partial on this condition
+LIVE = models.Q(deleted_at__isnull=True)
+
+
+class LiveManager(models.Manager):
+    """
+    Default manager that hides soft-deleted rows (see trash.py). Use the
+    model's `all_objects` manager to reach rows in the trash.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class NoteQuerySet(models.QuerySet):
+    """
+    Set-based note operations; like TaskQuerySet, they bypass the signals and
+    keep updated_at, the counters, list versions and search index current themselves.
+    """
+
+    def soft_delete(self, user, when=None):
+        """
+        Move the user's live notes in this queryset to the trash with one
+        UPDATE. Returns the number of notes deleted.
+        """
+        from .search import remove_queryset
+
+        notes = self.filter(user=user, deleted_at__isnull=True)
+        with transaction.atomic():
+            remove_queryset(notes)
+            when = when or timezone.now()
+            # The sync API reports the note as deleted from this moment
+            deleted = notes.update(deleted_at=when, updated_at=when)
+            if deleted:
+                UserStats.adjust(user.pk, total_notes=-deleted, note_list_version=1)
+        return deleted
+
+    def restore(self, user):
+        """Bring the user's trashed notes in this queryset back. Returns the number restored."""
+        from .search import index_objects
+
+        notes = self.filter(user=user, deleted_at__isnull=False)
+        with transaction.atomic():
+            # Loaded (rarely more than one delete's worth) to rebuild their search rows
+            restored = list(notes)
+            if restored:
+                self.model.all_objects.filter(pk__in=[note.pk for note in restored]).update(
+                    deleted_at=None, updated_at=timezone.now(),
+                )
+                index_objects(restored)
+                UserStats.adjust(user.pk, total_notes=len(restored), note_list_version=1)
+        return len(restored)
+
+
 class Note(models.Model):
     """
     Represents a study note or general memo.
@@ -40,21 +116,186 @@ class Note(models.Model):
         verbose_name='Last Updated'
     )
 
+    # Derived from content on save, so list pages never have to load the body
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Excerpt'
+    )
+
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Word Count'
+    )
+
+    # Set when the note is moved to the trash; purge_deleted removes it for good later
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Deleted At'
+    )
+
+    # The first manager is the default: live notes only
+    objects = LiveManager.from_queryset(NoteQuerySet)()
+    all_objects = NoteQuerySet.as_manager()
+
     class Meta:
         # Order notes by date created (newest first)
         ordering = ['-created_at']
         verbose_name = 'Study Note'
         verbose_name_plural = 'Study Notes'
+        indexes = [
+            # Matches NoteListView: filter by user, newest edits first. Partial,
+            # so trashed rows neither bloat it nor slow down live-row scans.
+            models.Index(fields=['user', '-updated_at', '-id'], name='note_user_updated_idx', condition=LIVE),
+            # Lets purge_deleted find expired rows without scanning the live ones
+            models.Index(fields=['deleted_at'], name='note_deleted_idx', condition=~LIVE),
+            # The sync API: the user's rows changed since a watermark, trashed ones included
+            models.Index(fields=['user', 'updated_at', 'id'], name='note_user_sync_idx'),
+        ]
 
     def __str__(self):
         """Return a string representation of the note (its title)."""
         return self.title
 
+    def refresh_summary(self):
+        """Recompute excerpt and word_count from content (bulk_create does not call save())."""
+        self.excerpt, self.word_count = summarize_content(self.content)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_summary()
+        elif 'content' in update_fields:
+            self.refresh_summary()
+            kwargs['update_fields'] = set(update_fields) | {'excerpt', 'word_count'}
+        super().save(*args, **kwargs)
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Set-based task operations. Each one runs a single UPDATE/DELETE against
+    the user's selected rows and adjusts the dashboard counters in the same
+    transaction, instead of loading and saving tasks one at a time.
+
+    These bypass the per-instance save/delete signals (and auto_now), so
+    anything those maintain (updated_at, counters, list versions, search
+    index) must be updated here as well.
+    """
+
+    def toggle_completed(self, user):
+        """
+        Flip `completed` on the user's tasks in this queryset with one
+        `UPDATE ... SET completed = NOT completed`. Returns the number of rows changed.
+        """
+        tasks = self.filter(user=user)
+        with transaction.atomic():
+            toggled = tasks.update(completed=~F('completed'), updated_at=timezone.now())
+            if toggled:
+                # +1 for every task that is now completed, -1 for every task that was reopened
+                delta = tasks.order_by().values('user').annotate(
+                    delta=models.Sum(models.Case(
+                        models.When(completed=True, then=1),
+                        default=-1,
+                    ))
+                ).values('delta')
+                UserStats.objects.filter(user=user).update(
+                    completed_tasks=F('completed_tasks') + models.Subquery(delta),
+                    task_list_version=F('task_list_version') + 1,
+                )
+        return toggled
+
+    def set_completed(self, user, completed=True):
+        """Mark the user's tasks in this queryset as completed (or reopen them)."""
+        with transaction.atomic():
+            changed = self.filter(user=user, completed=not completed).update(
+                completed=completed, updated_at=timezone.now(),
+            )
+            if changed:
+                UserStats.adjust(
+                    user.pk,
+                    completed_tasks=changed if completed else -changed,
+                    task_list_version=1,
+                )
+        return changed
+
+    def due(self, user):
+        """
+        The user's open tasks that have a due date, soonest first. Every
+        filter and the ORDER BY match task_user_status_due_idx, so slicing
+        this is an index range scan that stops after the slice, however many
+        tasks the user has.
+        """
+        # completed__in=[False], not completed=False: the latter compiles to
+        # `NOT completed`, which SQLite cannot match to the index's completed
+        # column, so it would fall back to the user_id index and a sort
+        return self.filter(user=user, completed__in=[False], due_date__isnull=False).order_by('due_date', 'id')
+
+    def overdue(self, user, today):
+        """Open tasks whose due date is before `today`, most overdue first."""
+        return self.due(user).filter(due_date__lt=today)
+
+    def upcoming(self, user, today, days):
+        """Open tasks due from `today` through the next `days` days, soonest first."""
+        return self.due(user).filter(due_date__gte=today, due_date__lt=today + timedelta(days=days))
+
+    def soft_delete(self, user, when=None):
+        """
+        Move the user's live tasks in this queryset to the trash without
+        fetching them first. Every row gets the same `deleted_at`, so one
+        undo brings the whole batch back.
+        """
+        from .search import remove_queryset
+
+        when = when or timezone.now()
+        tasks = self.filter(user=user, deleted_at__isnull=True)
+        with transaction.atomic():
+            remove_queryset(tasks)
+            # Updating the two states separately tells us how to adjust each counter
+            completed = tasks.filter(completed=True).update(deleted_at=when, updated_at=when)
+            pending = tasks.filter(completed=False).update(deleted_at=when, updated_at=when)
+            if completed or pending:
+                UserStats.adjust(
+                    user.pk,
+                    total_tasks=-(completed + pending),
+                    completed_tasks=-completed,
+                    task_list_version=1,
+                )
+        return completed + pending
+
+    def restore(self, user):
+        """Bring the user's trashed tasks in this queryset back. Returns the number restored."""
+        from .search import index_objects
+
+        tasks = self.filter(user=user, deleted_at__isnull=False)
+        with transaction.atomic():
+            restored = list(tasks)
+            if restored:
+                self.model.all_objects.filter(pk__in=[task.pk for task in restored]).update(
+                    deleted_at=None, updated_at=timezone.now(),
+                )
+                index_objects(restored)
+                UserStats.adjust(
+                    user.pk,
+                    total_tasks=len(restored),
+                    completed_tasks=sum(task.completed for task in restored),
+                    task_list_version=1,
+                )
+        return len(restored)
+
+
 class Task(models.Model):
     """
     Represents a to-do list task.
     Each task belongs to a specific user.
     """
+    class Priority(models.IntegerChoices):
+        LOW = 1, 'Low'
+        NORMAL = 2, 'Normal'
+        HIGH = 3, 'High'
+
     # Foreign Key to the User model
     user = models.ForeignKey(
         User,
@@ -77,19 +318,404 @@ class Task(models.Model):
         default=False, 
         verbose_name='Completed'
     )
+
+    due_date = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Due Date'
+    )
+
+    priority = models.PositiveSmallIntegerField(
+        choices=Priority.choices,
+        default=Priority.NORMAL,
+        verbose_name='Priority'
+    )
     
     created_at = models.DateTimeField(
         auto_now_add=True, 
         verbose_name='Created At'
     )
 
+    # Bumped by every change, including the set-based ones below and moving to
+    # or from the trash; the sync API's watermark (see sync.py) is built on it
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Last Updated'
+    )
+
+    # Set when the task is moved to the trash; purge_deleted removes it for good later
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Deleted At'
+    )
+
+    # The first manager is the default: live tasks only
+    objects = LiveManager.from_queryset(TaskQuerySet)()
+    all_objects = TaskQuerySet.as_manager()
+
     class Meta:
         # Order tasks by completion status (incomplete first) and then by creation date
         ordering = ['completed', '-created_at']
         verbose_name = 'To-Do Task'
         verbose_name_plural = 'To-Do Tasks'
+        indexes = [
+            # Matches TaskListView: filter by user, incomplete first, then newest first.
+            # Partial on live rows, like the note index.
+            models.Index(
+                fields=['user', 'completed', '-created_at', '-id'],
+                name='task_user_status_created_idx',
+                condition=LIVE,
+            ),
+            # Matches TaskQuerySet.due(): the dashboard card and the upcoming/overdue page
+            models.Index(fields=['user', 'completed', 'due_date'], name='task_user_status_due_idx', condition=LIVE),
+            models.Index(fields=['deleted_at'], name='task_deleted_idx', condition=~LIVE),
+            # The sync API: the user's rows changed since a watermark, trashed ones included
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_sync_idx'),
+        ]
     
     def __str__(self):
         """Return a string representation of the task (its title and completion status)."""
         status = "[DONE]" if self.completed else "[TODO]"
-        return f"{status} {self.title}"
\ No newline at end of file
+        return f"{status} {self.title}"
+
+    @property
+    def is_overdue(self):
+        """True for an open task whose due date has passed (in the current time zone)."""
+        return not self.completed and self.due_date is not None and self.due_date < timezone.localdate()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the completion status the row was loaded with, so the stats
+        signals can tell whether a save flipped it.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_completed = instance.__dict__.get('completed')
+        return instance
+
+
+class UserStats(models.Model):
+    """
+    Precomputed per-user counters shown on the dashboard, plus the version
+    stamps of the user's cached task/note list fragments (see caching.py).
+    Kept up to date incrementally by the Task/Note signals (see signals.py),
+    so the dashboard never has to COUNT(*) a user's rows.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='User'
+    )
+
+    total_tasks = models.IntegerField(
+        default=0,
+        verbose_name='Total Tasks'
+    )
+
+    completed_tasks = models.IntegerField(
+        default=0,
+        verbose_name='Completed Tasks'
+    )
+
+    total_notes = models.IntegerField(
+        default=0,
+        verbose_name='Total Notes'
+    )
+
+    # Bumped on every change to the user's tasks/notes; keys the cached list fragments
+    task_list_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Task List Version'
+    )
+
+    note_list_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Note List Version'
+    )
+
+    class Meta:
+        verbose_name = 'User Stats'
+        verbose_name_plural = 'User Stats'
+
+    def __str__(self):
+        """Return a short summary of the counters."""
+        return f"{self.user_id}: {self.total_tasks} tasks, {self.total_notes} notes"
+
+    @property
+    def pending_tasks(self):
+        """Number of tasks that are not yet completed."""
+        return self.total_tasks - self.completed_tasks
+
+    @classmethod
+    def compute_for_user(cls, user_id):
+        """Count a user's rows from scratch (used on first access and by the rebuild command)."""
+        task_counts = Task.objects.filter(user_id=user_id).aggregate(
+            total=models.Count('pk'),
+            completed=models.Count('pk', filter=models.Q(completed=True)),
+        )
+        return cls(
+            user_id=user_id,
+            total_tasks=task_counts['total'],
+            completed_tasks=task_counts['completed'],
+            total_notes=Note.objects.filter(user_id=user_id).count(),
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Return the stats row for a user, creating it from a one-off count
+        the first time it is needed.
+        """
+        try:
+            return cls.objects.get(user=user)
+        except cls.DoesNotExist:
+            stats = cls.compute_for_user(user.pk)
+            try:
+                with transaction.atomic():
+                    stats.save(force_insert=True)
+            except IntegrityError:
+                # Another request created the row first
+                return cls.objects.get(user=user)
+            return stats
+
+    @classmethod
+    async def afor_user(cls, user):
+        """Async version of for_user(); the rare first-time insert runs in a worker thread."""
+        try:
+            return await cls.objects.aget(user=user)
+        except cls.DoesNotExist:
+            return await sync_to_async(cls.for_user)(user)
+
+    @classmethod
+    def rebuild(cls, user_ids, batch_size=500):
+        """
+        Recount the counters of the given users from the Task and Note tables
+        (one grouped query per table) and write them back with batched
+        upserts. Returns the number of stats rows written.
+        """
+        task_counts = {
+            row['user_id']: row
+            for row in Task.objects.filter(user_id__in=user_ids)
+            .values('user_id')
+            .annotate(total=models.Count('pk'), completed=models.Count('pk', filter=models.Q(completed=True)))
+        }
+        note_counts = dict(
+            Note.objects.filter(user_id__in=user_ids)
+            .values('user_id')
+            .annotate(total=models.Count('pk'))
+            .values_list('user_id', 'total')
+        )
+
+        stats = []
+        for user_id in user_ids:
+            tasks = task_counts.get(user_id, {'total': 0, 'completed': 0})
+            stats.append(cls(
+                user_id=user_id,
+                total_tasks=tasks['total'],
+                completed_tasks=tasks['completed'],
+                total_notes=note_counts.get(user_id, 0),
+            ))
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                stats,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['total_tasks', 'completed_tasks', 'total_notes'],
+            )
+        return len(stats)
+
+    @classmethod
+    def adjust(cls, user_id, **deltas):
+        """
+        Apply counter deltas (e.g. total_tasks=1) in a single UPDATE.
+        Users without a stats row are skipped; their row is computed on first access.
+        """
+        changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if changes:
+            cls.objects.filter(user_id=user_id).update(**changes)
+
+class AccountDeletion(models.Model):
+    """
+    A deleted account waiting for purge_deleted. Deleting the User row
+    directly would make the ORM collect and delete every task and note in
+    one request; instead the account is deactivated and its rows trashed
+    with two UPDATEs, and the purge removes them in batches before finally
+    deleting the (by then empty) user.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion',
+        verbose_name='User'
+    )
+
+    requested_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Requested At'
+    )
+
+    class Meta:
+        verbose_name = 'Account Deletion'
+        verbose_name_plural = 'Account Deletions'
+
+    def __str__(self):
+        """Return the user and when the deletion was requested."""
+        return f"{self.user_id} (requested {self.requested_at:%Y-%m-%d %H:%M})"
+
+
+class Job(models.Model):
+    """
+    A unit of background work (see jobs.py): which handler to run and its
+    arguments, plus its state, retries and progress. The `run_jobs` worker
+    claims queued jobs in batches; views only insert a row and return.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    # Registered handler name, e.g. 'import_rows'
+    kind = models.CharField(
+        max_length=50,
+        verbose_name='Kind'
+    )
+
+    # The user the job works for (and who may view it); None for system jobs
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='User'
+    )
+
+    # Keyword arguments for the handler
+    payload = models.JSONField(
+        default=dict,
+        verbose_name='Payload'
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name='Status'
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Attempts'
+    )
+
+    max_attempts = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name='Max Attempts'
+    )
+
+    # Not claimed before this time; pushed back after each failed attempt
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Run After'
+    )
+
+    # Worker holding the job and when it last reported in; a running job
+    # whose worker went quiet for too long is put back in the queue
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Locked By'
+    )
+
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Locked At'
+    )
+
+    progress_done = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Progress Done'
+    )
+
+    # None while the total is unknown (e.g. rows in an uploaded file)
+    progress_total = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Progress Total'
+    )
+
+    # The handler's return value on success
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='Result'
+    )
+
+    # Traceback of the last failed attempt
+    error = models.TextField(
+        blank=True,
+        verbose_name='Error'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created At'
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Finished At'
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+        indexes = [
+            # The worker's claim query: due queued jobs, oldest first. Finished jobs
+            # (most of the table) sort under their own status, so the scan skips them.
+            models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx'),
+            # Stale-lock recovery: running jobs whose worker stopped reporting in
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        """Return the job's kind, id and status."""
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def is_pending(self):
+        """True until the job has succeeded or run out of attempts."""
+        return self.status in (self.Status.QUEUED, self.Status.RUNNING)
+
+    @property
+    def progress_percent(self):
+        """Progress as a whole percentage, or None while the total is unknown."""
+        if not self.progress_total:
+            return None
+        return min(100, 100 * self.progress_done // self.progress_total)
+
+    def report_progress(self, done, total=None):
+        """
+        Record how far the handler has got (one UPDATE). Also refreshes the
+        lock, which tells the worker's stale-job check that it is still alive.
+        """
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        self.locked_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress_done=self.progress_done,
+            progress_total=self.progress_total,
+            locked_at=self.locked_at,
+        )
@@ -0,0 +1,139 @@
+"""
+N+1 query detection.
+
+NPlusOneMiddleware (middleware.py) opens a QueryTracker for every request.
+The database hook below fingerprints each query, i.e. its SQL with the
+literals and IN-lists collapsed, so queries that differ only in their
+parameters count as the same shape. If one shape runs more than
+settings.TODO_NPLUSONE_THRESHOLD times in a request, that is almost always a
+lazy load inside a loop, such as `{{ task.user }}` in a template or a related
+object read per row in a view.
+
+settings.TODO_NPLUSONE picks the reaction: 'raise' (set by the test runner,
+so the offending test fails), 'log' (development: a warning with the call
+site) or None (off).
+"""
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 4
+
+# The QueryTracker of the request being handled, if detection is on
+current_tracker = ContextVar('todo_query_tracker', default=None)
+
+# Transaction bookkeeping, not queries a view asked for
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT', 'ROLLBACK')
+
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+SPACE_RE = re.compile(r'\s+')
+
+# Frames from these files are never reported as the call site
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+SKIPPED_FILES = {
+    os.path.join(_THIS_DIR, 'nplusone.py'),
+    os.path.join(_THIS_DIR, 'metrics.py'),
+    os.path.join(_THIS_DIR, 'middleware.py'),
+}
+
+
+class NPlusOneDetected(Exception):
+    """Raised in 'raise' mode when a request repeats a query shape too often."""
+
+
+def detection_mode():
+    return getattr(settings, 'TODO_NPLUSONE', None)
+
+
+def get_threshold():
+    return getattr(settings, 'TODO_NPLUSONE_THRESHOLD', DEFAULT_THRESHOLD)
+
+
+def fingerprint(sql):
+    """Reduce SQL to its shape: parameters, literals and IN-list lengths removed."""
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def call_site():
+    """
+    Where the current query came from: the innermost template tag or
+    variable being rendered, otherwise the innermost frame of project code.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin, token = getattr(node, 'origin', None), getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name or origin.name}, line {token.lineno}'
+        filename = code.co_filename
+        if filename.startswith(base_dir) and 'site-packages' not in filename and filename not in SKIPPED_FILES:
+            return f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {code.co_name}()'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryTracker:
+    """Counts the query shapes run during one request and where repeats came from."""
+    __slots__ = ('threshold', 'counts', 'sites')
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        # Call site of the first query over the threshold, per shape
+        self.sites = {}
+
+    def add(self, sql):
+        if sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+            return
+        shape = fingerprint(sql)
+        self.counts[shape] += 1
+        # The stack is only walked once per offending shape
+        if self.counts[shape] == self.threshold + 1:
+            self.sites[shape] = call_site()
+
+    def problems(self):
+        """(shape, count, call site) for every shape repeated more than the threshold."""
+        return [(shape, self.counts[shape], site) for shape, site in self.sites.items()]
+
+    def report(self, label):
+        lines = [f'Possible N+1 queries in {label}:']
+        for shape, count, site in self.problems():
+            lines.append(f'  {count}x at {site}: {shape}')
+        return '\n'.join(lines)
+
+
+def track_query(execute, sql, params, many, context):
+    """Database execute wrapper (see signals.py) feeding the current request's tracker."""
+    tracker = current_tracker.get()
+    if tracker is not None:
+        tracker.add(sql)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def ignore_repeats():
+    """
+    Stop tracking for a block whose repeated queries are intentional, such as
+    a batch endpoint doing the same per-object save for every item.
+    """
+    token = current_tracker.set(None)
+    try:
+        yield
+    finally:
+        current_tracker.reset(token)
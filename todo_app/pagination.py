@@ -0,0 +1,221 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class KeysetPage:
+    """
+    A single page of results produced by keyset (cursor) pagination.
+    Exposes the same has_next/has_previous flags as Django's Page, plus the
+    opaque cursor tokens used to request the neighbouring pages.
+    """
+
+    def __init__(self, object_list, next_token=None, previous_token=None):
+        self.object_list = object_list
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_token is not None
+
+    def has_previous(self):
+        return self.previous_token is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that pages through a queryset with a WHERE clause on the
+    ordering columns instead of OFFSET, so every page costs the same no
+    matter how deep the user scrolls.
+
+    `keyset_fields` must be the full ordering of the queryset and end with a
+    unique column (normally '-id' or 'id') so the cursor position is unambiguous.
+    The next/previous cursors are passed as ?after=<token> / ?before=<token>.
+    """
+    paginate_by = 50
+    keyset_fields = ('-id',)
+    after_kwarg = 'after'
+    before_kwarg = 'before'
+
+    # --- Token Encoding ---
+
+    def _field(self, name):
+        return self.model._meta.get_field(name.lstrip('-'))
+
+    def encode_cursor(self, obj):
+        """Serialize the ordering values of a row into an opaque, URL-safe token."""
+        values = []
+        for name in self.keyset_fields:
+            field = self._field(name)
+            values.append(field.value_to_string(obj))
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        """Turn a token back into typed ordering values; raises Http404 on a bad token."""
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.keyset_fields):
+                raise ValueError
+            return [
+                self._field(name).to_python(value)
+                for name, value in zip(self.keyset_fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise Http404('Invalid page cursor.')
+
+    # --- Query Building ---
+
+    def _compare(self, index, value, forward, strict=True):
+        """Condition for "keyset field `index` is past `value`" in the paging direction."""
+        name = self.keyset_fields[index]
+        descending = name.startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        if not strict:
+            lookup += 'e'
+        return Q(**{f'{name.lstrip("-")}__{lookup}': value})
+
+    def _equal(self, values, count):
+        """Condition pinning the first `count` keyset fields to the cursor's values."""
+        condition = Q()
+        for name, value in zip(self.keyset_fields[:count], values[:count]):
+            column = name.lstrip('-')
+            if isinstance(value, bool):
+                # `completed=False` compiles to `NOT completed`, which SQLite cannot
+                # match against an index column; `IN (0)` is an indexable equality.
+                condition &= Q(**{f'{column}__in': [value]})
+            else:
+                condition &= Q(**{column: value})
+        return condition
+
+    def keyset_filters(self, values, forward=True):
+        """
+        Split "rows past this cursor" into conditions that are each a single
+        contiguous index range, in the order their rows appear in the listing.
+
+        For ('completed', '-created_at', '-id') that gives:
+          1. completed = c AND created_at <= t AND (created_at < t OR (created_at = t AND id < i))
+          2. completed > c
+        so SQLite can seek straight to the cursor instead of scanning every row
+        before it, which a single OR-ed condition would force.
+        """
+        count = len(self.keyset_fields)
+        if count == 1:
+            return [self._compare(0, values[0], forward)]
+
+        # The last two fields (e.g. created_at and the id tiebreaker) form one range
+        deepest = count - 2
+        filters = [
+            self._equal(values, deepest)
+            & self._compare(deepest, values[deepest], forward, strict=False)
+            & (
+                self._compare(deepest, values[deepest], forward)
+                | (self._equal(values, deepest + 1) & self._compare(count - 1, values[-1], forward))
+            )
+        ]
+        for index in range(deepest - 1, -1, -1):
+            filters.append(self._equal(values, index) & self._compare(index, values[index], forward))
+        return filters
+
+    def _keyset_plan(self, queryset):
+        """
+        Read the cursor from the request and return (ordered queryset, range
+        conditions in listing order, forward?, after token).
+        """
+        after = self.request.GET.get(self.after_kwarg)
+        before = self.request.GET.get(self.before_kwarg)
+        forward = not before
+
+        if forward:
+            queryset = queryset.order_by(*self.keyset_fields)
+            filters = self.keyset_filters(self.decode_cursor(after)) if after else [Q()]
+        else:
+            queryset = queryset.order_by(*[
+                name[1:] if name.startswith('-') else f'-{name}' for name in self.keyset_fields
+            ])
+            filters = self.keyset_filters(self.decode_cursor(before), forward=False)
+        return queryset, filters, forward, after
+
+    def _keyset_page(self, rows, page_size, forward, after):
+        """Build the 4-tuple ListView expects from up to page_size + 1 fetched rows."""
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        next_token = previous_token = None
+        if rows:
+            if has_more or not forward:
+                next_token = self.encode_cursor(rows[-1])
+            if (forward and after) or (not forward and has_more):
+                previous_token = self.encode_cursor(rows[0])
+
+        page = KeysetPage(rows, next_token=next_token, previous_token=previous_token)
+        return (None, page, rows, page.has_other_pages())
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Replaces ListView's OFFSET pagination. Returns the same 4-tuple
+        (paginator, page, object_list, is_paginated) that ListView expects.
+        """
+        queryset, filters, forward, after = self._keyset_plan(queryset)
+
+        # Fetch one extra row to find out whether there is another page,
+        # moving on to the next index range only while the page is not full
+        rows = []
+        for condition in filters:
+            rows.extend(queryset.filter(condition)[:page_size + 1 - len(rows)])
+            if len(rows) > page_size:
+                break
+        return self._keyset_page(rows, page_size, forward, after)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """Async version of paginate_queryset() for async views, using the async ORM."""
+        queryset, filters, forward, after = self._keyset_plan(queryset)
+
+        rows = []
+        for condition in filters:
+            rows.extend([obj async for obj in queryset.filter(condition)[:page_size + 1 - len(rows)]])
+            if len(rows) > page_size:
+                break
+        return self._keyset_page(rows, page_size, forward, after)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for the admin changelists of very large tables, where an exact
+    COUNT(*) means reading every row. Counting stops at `count_limit`; past
+    that, `estimate` (a callable, e.g. one reading the planner statistics)
+    supplies the total if it can, and otherwise the list is shown as
+    `count_limit` rows long. Pages beyond that are not reachable, so large
+    filtered lists should be narrowed rather than paged through.
+    """
+    count_limit = 10000
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, estimate=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        # COUNT(*) over a LIMITed subquery: reads at most count_limit + 1 rows
+        counted = self.object_list.order_by()[:self.count_limit + 1].count()
+        if counted <= self.count_limit:
+            return counted
+        estimated = self.estimate() if self.estimate is not None else None
+        return max(estimated or 0, self.count_limit)
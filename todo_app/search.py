@@ -0,0 +1,206 @@
+"""
+Full-text search over notes and tasks, backed by SQLite FTS5.
+
+Each model has its own FTS5 table whose rowid is the object's primary key.
+The owner is stored as an indexed token ("u<user id>") so a user's search is
+narrowed by the full-text index itself instead of filtering every match.
+The tables are kept in sync by the signal handlers in signals.py and can be
+rebuilt with the `rebuild_search_index` management command.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+from .models import Note, Task
+
+# FTS5 table and the (title, body) model fields for each indexed model
+SEARCH_TABLES = {
+    Note: ('todo_app_note_fts', 'title', 'content'),
+    Task: ('todo_app_task_fts', 'title', 'description'),
+}
+
+# Weights for bm25(): owner token, title, body
+RANK_WEIGHTS = (0.0, 10.0, 1.0)
+
+# Control characters used as highlight markers, swapped for <mark> after escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@dataclass
+class SearchResult:
+    """A single ranked hit, with HTML-safe highlighted title and snippet."""
+    kind: str
+    pk: int
+    title: str
+    snippet: str
+    # bm25 score against the other results of the same kind; lower is better
+    rank: float
+
+
+def is_available():
+    """FTS5 tables only exist on SQLite (see migration 0007)."""
+    return connection.vendor == 'sqlite'
+
+
+def _owner_token(user_id):
+    return f'u{user_id}'
+
+
+def _highlight(text):
+    """Escape FTS5 output and turn the marker characters into <mark> tags."""
+    return mark_safe(escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def build_match_query(query, user_id=None):
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word becomes a
+    quoted prefix term (so FTS5 operators typed by users are just words),
+    all terms must match, and only the given user's rows are considered
+    (every user's, if user_id is None). Returns None if the query has no
+    searchable words.
+    """
+    terms = TOKEN_RE.findall(query)
+    if not terms:
+        return None
+    phrases = ' '.join(f'"{term}"*' for term in terms)
+    if user_id is None:
+        return f'{{title body}}: ({phrases})'
+    return f'owner:"{_owner_token(user_id)}" AND {{title body}}: ({phrases})'
+
+
+# --- Index Maintenance ---
+
+def _row(model, obj):
+    table, title_field, body_field = SEARCH_TABLES[model]
+    return (obj.pk, _owner_token(obj.user_id), getattr(obj, title_field), strip_tags(getattr(obj, body_field)))
+
+
+def index_object(obj):
+    """Insert or refresh the search row for a Note or Task."""
+    if not is_available():
+        return
+    table = SEARCH_TABLES[type(obj)][0]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {table} (rowid, owner, title, body) VALUES (%s, %s, %s, %s)',
+            _row(type(obj), obj),
+        )
+
+
+def index_objects(objs):
+    """
+    Add search rows for many objects of one model in one executemany(), e.g.
+    after a bulk_create(). Objects without a primary key are skipped; run
+    `rebuild_search_index` if the database cannot return ids from bulk inserts.
+    """
+    objs = [obj for obj in objs if obj.pk is not None]
+    if not objs or not is_available():
+        return
+    model = type(objs[0])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLES[model][0]} (rowid, owner, title, body) VALUES (%s, %s, %s, %s)',
+            [_row(model, obj) for obj in objs],
+        )
+
+
+def remove_object(model, pk):
+    """Drop the search row for a deleted Note or Task."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLES[model][0]} WHERE rowid = %s', [pk])
+
+
+def remove_queryset(queryset):
+    """Drop the search rows for every object in a queryset, in one statement."""
+    if not is_available():
+        return
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLES[queryset.model][0]} WHERE rowid IN ({sql})', params)
+
+
+def rebuild(batch_size=1000):
+    """Empty and repopulate both search tables. Returns the number of rows indexed."""
+    if not is_available():
+        return 0
+    indexed = 0
+    with connection.cursor() as cursor:
+        for model, (table, title_field, body_field) in SEARCH_TABLES.items():
+            cursor.execute(f'DELETE FROM {table}')
+            rows = model.objects.order_by().only('pk', 'user_id', title_field, body_field)
+            batch = []
+            for obj in rows.iterator(chunk_size=batch_size):
+                batch.append(_row(model, obj))
+                if len(batch) >= batch_size:
+                    cursor.executemany(
+                        f'INSERT INTO {table} (rowid, owner, title, body) VALUES (%s, %s, %s, %s)', batch
+                    )
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(
+                    f'INSERT INTO {table} (rowid, owner, title, body) VALUES (%s, %s, %s, %s)', batch
+                )
+                indexed += len(batch)
+            cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    return indexed
+
+
+# --- Querying ---
+
+def search(user, query, limit=20):
+    """
+    Return SearchResults for the user's matching notes, then for their
+    matching tasks: up to `limit` of each, best matches first. bm25 scores
+    depend on each table's row count and average lengths, so a note's score
+    says nothing about a task's and the two kinds are ranked separately.
+    """
+    match = build_match_query(query, user.pk)
+    if match is None or not is_available():
+        return []
+
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    results = []
+    with connection.cursor() as cursor:
+        for model, (table, _title, _body) in SEARCH_TABLES.items():
+            cursor.execute(
+                f'SELECT rowid, '
+                f"highlight({table}, 1, char(2), char(3)), "
+                f"snippet({table}, 2, char(2), char(3), '…', 16), "
+                f'bm25({table}, {weights}) AS score '
+                f'FROM {table} WHERE {table} MATCH %s ORDER BY score LIMIT %s',
+                [match, limit],
+            )
+            results.extend(
+                SearchResult(
+                    kind=model._meta.model_name,
+                    pk=pk,
+                    title=_highlight(title),
+                    snippet=_highlight(snippet),
+                    rank=rank,
+                )
+                for pk, title, snippet, rank in cursor.fetchall()
+            )
+    return results
+
+
+def filter_queryset(queryset, query):
+    """
+    Narrow a Note or Task queryset to the rows matching `query`, for all
+    users (the admin's search box): the matching ids come from the FTS5
+    table instead of a LIKE scan of every row. Returns None if the query has
+    no searchable words.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return None
+    table = SEARCH_TABLES[queryset.model][0]
+    return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match]))
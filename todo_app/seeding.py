@@ -0,0 +1,159 @@
+"""
+Realistic test data for benchmarks and tests.
+
+Per-user row counts and note lengths follow log-normal distributions, so a
+few users own far more rows and a few notes are far longer (pasted lecture
+transcripts) than the median, as in real data. Rows are written with
+bulk_create in batches. The search index and the UserStats counters are
+updated per batch, as the import code does.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import search
+from .models import Note, Task, UserStats
+
+# Password of every seeded user, so they can also log in by hand
+SEED_PASSWORD = 'password'
+
+DEFAULT_BATCH_SIZE = 1000
+
+WORDS = (
+    'lecture notes chapter exam revision essay draft reading summary lab report '
+    'assignment deadline tutorial seminar group project research sources citation '
+    'theorem proof equation derivative integral matrix vector probability sample '
+    'history economics biology chemistry physics literature philosophy statistics '
+    'review practice questions answers outline introduction conclusion argument '
+    'evidence analysis method results discussion figure table appendix slides'
+).split()
+
+
+@dataclass
+class SeedProfile:
+    """Shape of the generated data. Medians are per user; spreads are log-normal sigmas."""
+    tasks: int = 200
+    notes: int = 50
+    count_spread: float = 0.8
+    completed_ratio: float = 0.4
+    note_words: int = 120
+    note_word_spread: float = 1.2
+    max_note_words: int = 20000
+    # Share of tasks that have a description at all
+    described_ratio: float = 0.3
+    # Share of tasks with a due date, spread over due_window days either side of today
+    due_ratio: float = 0.6
+    due_window: int = 30
+    # Relative weights of the low, normal and high priorities
+    priority_weights: tuple = (2, 5, 3)
+
+
+def lognormal_count(rng, median, spread, cap):
+    """A log-normal integer around `median`, clamped to [0, cap]."""
+    if median <= 0:
+        return 0
+    return min(cap, int(rng.lognormvariate(0, spread) * median))
+
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+
+
+def make_tasks(user, count, rng, profile):
+    today = date.today()
+    return [
+        Task(
+            user=user,
+            title=sentence(rng, 3, 8),
+            description=sentence(rng, 5, 40) if rng.random() < profile.described_ratio else '',
+            completed=rng.random() < profile.completed_ratio,
+            due_date=(
+                today + timedelta(days=rng.randint(-profile.due_window, profile.due_window))
+                if rng.random() < profile.due_ratio else None
+            ),
+            priority=rng.choices(Task.Priority.values, weights=profile.priority_weights)[0],
+        )
+        for _ in range(count)
+    ]
+
+
+def make_notes(user, count, rng, profile):
+    notes = []
+    for _ in range(count):
+        words = max(1, lognormal_count(rng, profile.note_words, profile.note_word_spread, profile.max_note_words))
+        note = Note(user=user, title=sentence(rng, 2, 6), content=sentence(rng, words, words))
+        # bulk_create() skips Note.save(), which normally fills these in
+        note.refresh_summary()
+        notes.append(note)
+    return notes
+
+
+def insert_rows(model, objs, batch_size=DEFAULT_BATCH_SIZE):
+    """bulk_create `objs` in batches, indexing each batch for search and adjusting the owners' counters."""
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        with transaction.atomic():
+            created = model.objects.bulk_create(batch)
+            search.index_objects(created)
+            per_user = {}
+            for obj in created:
+                totals = per_user.setdefault(obj.user_id, [0, 0])
+                totals[0] += 1
+                totals[1] += int(getattr(obj, 'completed', False))
+            for user_id, (total, completed) in per_user.items():
+                if model is Task:
+                    UserStats.adjust(user_id, total_tasks=total, completed_tasks=completed, task_list_version=1)
+                else:
+                    UserStats.adjust(user_id, total_notes=total, note_list_version=1)
+
+
+def seed_user(user, task_count, note_count, rng=None, profile=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Give one existing user exactly `task_count` tasks and `note_count` notes."""
+    rng = rng or random.Random()
+    profile = profile or SeedProfile()
+    insert_rows(Task, make_tasks(user, task_count, rng, profile), batch_size)
+    insert_rows(Note, make_notes(user, note_count, rng, profile), batch_size)
+
+
+def seed_users(count, prefix='seed', profile=None, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Create `count` users named <prefix>-1, <prefix>-2, ... with rows drawn
+    from `profile`. Returns (users, tasks created, notes created). The same
+    `seed` always produces the same data.
+    """
+    rng = random.Random(seed)
+    profile = profile or SeedProfile()
+    User = get_user_model()
+
+    password = make_password(SEED_PASSWORD)
+    users = User.objects.bulk_create(
+        [User(username=f'{prefix}-{number}', password=password) for number in range(1, count + 1)],
+        batch_size=batch_size,
+    )
+    # Stats rows up front, so insert_rows() can keep them current with adjust()
+    UserStats.objects.bulk_create([UserStats(user=user) for user in users], batch_size=batch_size)
+
+    tasks, notes = [], []
+    task_total = note_total = 0
+    for user in users:
+        # Heavy users are capped at 20x the median
+        task_count = lognormal_count(rng, profile.tasks, profile.count_spread, profile.tasks * 20)
+        note_count = lognormal_count(rng, profile.notes, profile.count_spread, profile.notes * 20)
+        tasks.extend(make_tasks(user, task_count, rng, profile))
+        notes.extend(make_notes(user, note_count, rng, profile))
+        # Write in batches as we go, so memory stays bounded for large runs
+        if len(tasks) >= batch_size:
+            insert_rows(Task, tasks, batch_size)
+            task_total += len(tasks)
+            tasks = []
+        if len(notes) >= batch_size:
+            insert_rows(Note, notes, batch_size)
+            note_total += len(notes)
+            notes = []
+    insert_rows(Task, tasks, batch_size)
+    insert_rows(Note, notes, batch_size)
+    return users, task_total + len(tasks), note_total + len(notes)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import database, metrics, nplusone, search
+from .auth import user_cache
+from .models import Note, Task, UserStats
+
+
+# --- Task Counters ---
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Update the owner's task counters after a task is created or its status
+    changes, and bump the task list version so cached list fragments expire.
+    """
+    if raw:
+        return
+    completed = instance.__dict__.get('completed')
+    if created:
+        UserStats.adjust(
+            instance.user_id,
+            total_tasks=1,
+            completed_tasks=int(bool(completed)),
+            task_list_version=1,
+        )
+    else:
+        previous = getattr(instance, '_loaded_completed', None)
+        changed = previous is not None and completed is not None and previous != completed
+        UserStats.adjust(
+            instance.user_id,
+            completed_tasks=(1 if completed else -1) if changed else 0,
+            task_list_version=1,
+        )
+    instance._loaded_completed = completed
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """Remove a deleted task from the owner's counters (trashed tasks already were)."""
+    if instance.__dict__.get('deleted_at') is not None:
+        return
+    UserStats.adjust(
+        instance.user_id,
+        total_tasks=-1,
+        completed_tasks=-int(bool(instance.__dict__.get('completed'))),
+        task_list_version=1,
+    )
+
+
+# --- Note Counters ---
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, created, raw=False, **kwargs):
+    """Count a newly created note and expire the cached note list."""
+    if not raw:
+        UserStats.adjust(instance.user_id, total_notes=int(created), note_list_version=1)
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    """Remove a deleted note from the owner's counters (trashed notes already were)."""
+    if instance.__dict__.get('deleted_at') is not None:
+        return
+    UserStats.adjust(instance.user_id, total_notes=-1, note_list_version=1)
+
+
+# --- Search Index ---
+
+@receiver(post_save, sender=Note)
+@receiver(post_save, sender=Task)
+def refresh_search_row(sender, instance, raw=False, **kwargs):
+    """Re-index a note or task's title and body after every save (unless it is in the trash)."""
+    if not raw and instance.__dict__.get('deleted_at') is None:
+        search.index_object(instance)
+
+
+@receiver(post_delete, sender=Note)
+@receiver(post_delete, sender=Task)
+def remove_search_row(sender, instance, **kwargs):
+    """Drop a deleted note or task from the search index."""
+    search.remove_object(sender, instance.pk)
+
+
+# --- User Cache ---
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    """
+    Drop a saved or deleted user from this process's user cache (see
+    auth.py), so a new password, deactivation or staff/superuser flag
+    applies at once. Group and per-user permissions are not cached; they
+    are still loaded per request, when something checks them.
+    """
+    user_cache.invalidate(instance.pk)
+
+
+# --- Database Connections ---
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """
+    Tune every new database connection (SQLite PRAGMAs; see database.py) and
+    hook up the optional per-request query timing and N+1 detection.
+    """
+    database.configure_connection(connection)
+    if metrics.detailed_metrics_enabled():
+        connection.execute_wrappers.append(metrics.time_query)
+    if nplusone.detection_mode():
+        connection.execute_wrappers.append(nplusone.track_query)
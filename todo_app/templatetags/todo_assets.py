@@ -0,0 +1,56 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from todo_app.assets import ICON_SPRITE, STYLESHEET
+
+register = template.Library()
+
+# Lucide's browser build, which turns <i data-lucide="..."> into inline SVG
+LUCIDE_SCRIPT = 'https://unpkg.com/lucide@latest'
+
+
+def unbuilt(name):
+    """True in development until `build_assets` has written the static file `name`."""
+    return settings.DEBUG and not finders.find(name)
+
+
+@register.simple_tag
+def icon(name, css_class=''):
+    """
+    An inline <svg> drawing one icon from the sprite built by `build_assets`,
+    e.g. {% icon "list-todo" "w-5 h-5" %}. The sprite is fetched once and
+    cached, instead of a script building icons in every page. In
+    development, until the first build, {% icon_script %} draws them instead.
+    """
+    if unbuilt(ICON_SPRITE):
+        return format_html('<i data-lucide="{}" class="{}"></i>', name, css_class)
+    return format_html(
+        '<svg class="{}" aria-hidden="true"><use href="{}#{}"></use></svg>',
+        css_class, static(ICON_SPRITE), name,
+    )
+
+
+@register.simple_tag
+def stylesheet():
+    """
+    A <link> to the CSS compiled by `build_assets`. In development, until the
+    first build, the Tailwind Play CDN stands in so pages are still styled.
+    """
+    if unbuilt(STYLESHEET):
+        return format_html('<script src="https://cdn.tailwindcss.com"></script>')
+    return format_html('<link rel="stylesheet" href="{}">', static(STYLESHEET))
+
+
+@register.simple_tag
+def icon_script():
+    """
+    Nothing once the icon sprite is built. Before that (development only),
+    loads Lucide from its CDN to draw the <i data-lucide> placeholders
+    {% icon %} leaves; put it at the end of <body>.
+    """
+    if not unbuilt(ICON_SPRITE):
+        return ''
+    return format_html('<script src="{}"></script><script>lucide.createIcons();</script>', LUCIDE_SCRIPT)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """The standard runner, with N+1 query detection raising (see todo_app/nplusone.py)."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._old_nplusone = getattr(settings, 'TODO_NPLUSONE', None)
+        settings.TODO_NPLUSONE = 'raise'
+
+    def teardown_test_environment(self, **kwargs):
+        settings.TODO_NPLUSONE = self._old_nplusone
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,1564 @@
-from django.test import TestCase
+import base64
+import glob
+import gzip
+import importlib
+import json
+import os
+import random
+import re
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.http import Http404, HttpResponse
+from django.template import Context, Template, TemplateDoesNotExist, engines
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admin, assets, database, imports, jobs, metrics, nplusone, search, seeding, sync, trash, urls, views, warmup
+from .auth import user_cache
+from .caching import CSRF_PLACEHOLDER, get_fragment_cache
+from .management.commands.profile_startup import parse_importtime, time_per_app
+from .middleware import NPlusOneMiddleware, StaticAssetMiddleware
+from .pagination import EstimatedCountPaginator, KeysetPaginationMixin
+from .models import AccountDeletion, Job, Note, Task, UserStats
+from .views import NoteListView, TaskListView
+
+User = get_user_model()
+
+
+# --- Query Plan Checks ---
+
+class ListViewQueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on each list view's queryset and fails if SQLite
+    falls back to a full table scan or a temporary sort B-tree.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', password='secret')
+
+    def get_view_queryset(self, view_class):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
+
+    def assertUsesIndex(self, queryset):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan checks are written for SQLite.')
+        plan = queryset.explain()
+        self.assertNotIn('USE TEMP B-TREE', plan, plan)
+        for line in plan.splitlines():
+            if 'SCAN' in line:
+                self.assertIn('USING', line, plan)
+
+    def test_task_list_uses_index(self):
+        self.assertUsesIndex(self.get_view_queryset(TaskListView))
+
+    def test_note_list_uses_index(self):
+        self.assertUsesIndex(self.get_view_queryset(NoteListView))
+
+    def test_due_task_queries_use_index(self):
+        today = timezone.localdate()
+        for queryset in (
+            Task.objects.due(self.user)[:views.URGENT_TASK_LIMIT],
+            Task.objects.overdue(self.user, today)[:views.UPCOMING_TASK_LIMIT],
+            Task.objects.upcoming(self.user, today, views.UPCOMING_DAYS)[:views.UPCOMING_TASK_LIMIT],
+        ):
+            with self.subTest(query=str(queryset.query)):
+                self.assertUsesIndex(queryset)
+                self.assertIn('task_user_status_due_idx', queryset.explain())
+
+
+# --- Dashboard Counters ---
+
+class UserStatsTests(TestCase):
+    """The signal-maintained dashboard counters follow every change, and a rebuild repairs drift."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counted', password='secret')
+        UserStats.for_user(cls.user)
+
+    def counters(self):
+        stats = UserStats.objects.get(user=self.user)
+        return stats.total_tasks, stats.completed_tasks, stats.total_notes
+
+    def test_counters_follow_tasks_and_notes(self):
+        task = Task.objects.create(user=self.user, title='Task')
+        done = Task.objects.create(user=self.user, title='Done', completed=True)
+        note = Note.objects.create(user=self.user, title='Note')
+        self.assertEqual(self.counters(), (2, 1, 1))
+
+        task.completed = True
+        task.save()
+        self.assertEqual(self.counters(), (2, 2, 1))
+        Task.objects.filter(pk=done.pk).toggle_completed(self.user)
+        self.assertEqual(self.counters(), (2, 1, 1))
+
+        task.delete()
+        note.delete()
+        self.assertEqual(self.counters(), (1, 0, 0))
+
+    def test_rebuild_repairs_drift(self):
+        Task.objects.create(user=self.user, title='Task', completed=True)
+        Note.objects.create(user=self.user, title='Note')
+        UserStats.objects.filter(user=self.user).update(total_tasks=7, completed_tasks=0, total_notes=3)
+
+        call_command('rebuild_user_stats', user=['counted'], stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 1, 1))
+
+
+# --- Cursor Pagination ---
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the task list in order, both ways, and reject bad tokens."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('pager', password='secret')
+        for i in range(5):
+            Task.objects.create(user=cls.user, title=f'Task {i}', completed=i < 2)
+        cls.ordered = list(Task.objects.filter(user=cls.user).order_by('completed', '-created_at', '-id'))
+
+    def paginator(self, **params):
+        paginator = KeysetPaginationMixin()
+        paginator.model = Task
+        paginator.keyset_fields = ('completed', '-created_at', '-id')
+        paginator.request = RequestFactory().get('/', params)
+        return paginator
+
+    def page(self, **params):
+        _paginator, page, rows, _is_paginated = self.paginator(**params).paginate_queryset(
+            Task.objects.filter(user=self.user), 2,
+        )
+        return page, rows
+
+    def test_next_and_previous_tokens(self):
+        first, rows = self.page()
+        self.assertEqual(rows, self.ordered[:2])
+        self.assertIsNone(first.previous_token)
+
+        second, rows = self.page(after=first.next_token)
+        self.assertEqual(rows, self.ordered[2:4])
+        third, rows = self.page(after=second.next_token)
+        self.assertEqual(rows, self.ordered[4:])
+        self.assertIsNone(third.next_token)
+
+        # Going back returns the earlier page in listing order, not reversed
+        back, rows = self.page(before=third.previous_token)
+        self.assertEqual(rows, self.ordered[2:4])
+        back, rows = self.page(before=back.previous_token)
+        self.assertEqual(rows, self.ordered[:2])
+        self.assertIsNone(back.previous_token)
+        self.assertIsNotNone(back.next_token)
+
+    def test_empty_last_page(self):
+        token = self.paginator().encode_cursor(self.ordered[-1])
+        page, rows = self.page(after=token)
+        self.assertEqual(rows, [])
+        self.assertIsNone(page.next_token)
+        self.assertFalse(page.has_other_pages())
+
+    def test_bad_tokens_are_404(self):
+        def encode(values):
+            return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+        for token in ('garbage', encode(['False', 'x']), encode(['maybe', 'yesterday', 'one']), encode({'id': 1})):
+            for direction in ('after', 'before'):
+                with self.subTest(token=token, direction=direction), self.assertRaises(Http404):
+                    self.page(**{direction: token})
+
+
+# --- Database Tuning ---
+
+class SQLiteTuningTests(TestCase):
+    """Checks the connection_created hook applies the configured PRAGMAs."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        pragmas = database.get_sqlite_pragmas()
+        self.assertEqual(self.pragma('busy_timeout'), pragmas['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+        # 1 = NORMAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+    def test_settings_override_the_defaults(self):
+        with override_settings(TODO_SQLITE_PRAGMAS={'cache_size': -1000, 'mmap_size': None}):
+            pragmas = database.get_sqlite_pragmas()
+        self.assertEqual(pragmas['cache_size'], -1000)
+        self.assertNotIn('mmap_size', pragmas)
+        self.assertEqual(pragmas['busy_timeout'], database.DEFAULT_SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_asgi_closes_connections_after_each_request(self):
+        self.assertEqual(settings.DATABASES['default']['CONN_MAX_AGE'], 60)
+        with mock.patch.dict(settings.DATABASES['default']):
+            from student_todo_project import asgi
+
+            importlib.reload(asgi)
+            self.assertEqual(settings.DATABASES['default']['CONN_MAX_AGE'], 0)
+
+
+# --- Query Counts ---
+
+class ViewQueryCountTests(TestCase):
+    """
+    Pins the number of queries each view in todo_app/urls.py runs. With the
+    user in the per-process user cache (see auth.py), a logged-in request
+    runs one before the view, loading the session row, which assertQueries
+    adds to each count; inside TestCase each atomic block adds a
+    SAVEPOINT/RELEASE pair.
+    """
+    # SessionMiddleware reads the session row (SESSION_ENGINE is db)
+    SESSION_QUERIES = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.other = User.objects.create_user('intruder', password='secret')
+        cls.note = Note.objects.create(user=cls.user, title='Note', content='Body')
+        cls.task = Task.objects.create(user=cls.user, title='Task')
+        for i in range(5):
+            Note.objects.create(user=cls.user, title=f'Note {i}')
+            Task.objects.create(user=cls.user, title=f'Task {i}')
+        UserStats.for_user(cls.user)
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        self.client.force_login(self.user)
+        # Logging in saves last_login, which drops the user; start from the steady state
+        user_cache.set(self.user.pk, self.user)
+
+    def assertQueries(self, count, method, name, args=(), data=None, status=200):
+        url = reverse(f'note_app:{name}', args=args)
+        with self.assertNumQueries(self.SESSION_QUERIES + count):
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, status)
+
+    def test_index(self):
+        # stats row + urgent tasks + recent notes
+        self.assertQueries(3, 'get', 'index')
+
+    def test_note_list(self):
+        # stats row (list version) + notes page; a cache hit skips the notes query
+        self.assertQueries(2, 'get', 'note_list')
+        self.assertQueries(1, 'get', 'note_list')
+
+    def test_note_create(self):
+        self.assertQueries(0, 'get', 'note_create')
+        # insert + counter update + search row
+        self.assertQueries(3, 'post', 'note_create', data={'title': 'New', 'content': 'Text'}, status=302)
+
+    def test_note_detail(self):
+        # the note, content included, for both the validators and the page
+        self.assertQueries(1, 'get', 'note_detail', args=[self.note.pk])
+
+    def test_note_update(self):
+        self.assertQueries(1, 'get', 'note_update', args=[self.note.pk])
+        # fetch + update + list version + search row
+        self.assertQueries(4, 'post', 'note_update', args=[self.note.pk],
+                           data={'title': 'Edited', 'content': 'Text'}, status=302)
+
+    def test_note_delete(self):
+        self.assertQueries(1, 'get', 'note_delete', args=[self.note.pk])
+        # fetch + search row + trash UPDATE + counter update, in a savepoint
+        self.assertQueries(6, 'post', 'note_delete', args=[self.note.pk], status=302)
+
+    def test_task_list(self):
+        self.assertQueries(2, 'get', 'task_list')
+        self.assertQueries(1, 'get', 'task_list')
+
+    def test_task_create(self):
+        self.assertQueries(0, 'get', 'task_create')
+        self.assertQueries(3, 'post', 'task_create', data={'title': 'New'}, status=302)
+
+    def test_task_update(self):
+        self.assertQueries(1, 'get', 'task_update', args=[self.task.pk])
+        # fetch + update + completed counter update + search row
+        self.assertQueries(4, 'post', 'task_update', args=[self.task.pk],
+                           data={'title': 'Edited', 'completed': 'on'}, status=302)
+
+    def test_task_delete(self):
+        self.assertQueries(1, 'get', 'task_delete', args=[self.task.pk])
+        self.assertQueries(7, 'post', 'task_delete', args=[self.task.pk], status=302)
+
+    def test_task_toggle_complete(self):
+        # savepoint pair + one conditional UPDATE + counter update
+        self.assertQueries(4, 'post', 'task_toggle_complete', args=[self.task.pk], status=302)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.completed)
+        self.assertEqual(UserStats.objects.get(user=self.user).completed_tasks, 1)
+
+    def test_task_toggle_complete_needs_post(self):
+        self.assertQueries(0, 'get', 'task_toggle_complete', args=[self.task.pk], status=405)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.completed)
+
+    def test_task_bulk_action(self):
+        task_ids = list(Task.objects.filter(user=self.user).values_list('pk', flat=True))
+        self.assertQueries(4, 'post', 'task_bulk_action', data={'action': 'complete', 'task_ids': task_ids}, status=302)
+        # savepoint pair + search rows + two DELETEs (completed / pending) + counter update
+        self.assertQueries(6, 'post', 'task_bulk_action', data={'action': 'delete', 'task_ids': task_ids}, status=302)
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.total_tasks, stats.completed_tasks), (0, 0))
+
+    def test_other_users_objects_are_not_found(self):
+        self.client.force_login(self.other)
+        user_cache.set(self.other.pk, self.other)
+        self.assertQueries(1, 'get', 'note_detail', args=[self.note.pk], status=404)
+        self.assertQueries(1, 'get', 'task_update', args=[self.task.pk], status=404)
+        self.assertQueries(3, 'post', 'task_toggle_complete', args=[self.task.pk], status=404)
+
+
+# --- Async Views ---
+
+class AsyncViewTests(TestCase):
+    """Checks the read paths run natively under ASGI, without sync-only ORM access."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('async-user', password='secret')
+        cls.note = Note.objects.create(user=cls.user, title='Async note', content='Body text')
+        # The dashboard card lists tasks by due date
+        Task.objects.create(user=cls.user, title='Async task', due_date=timezone.localdate())
+
+    def test_read_views_are_async(self):
+        for view in (
+            views.index, views.task_upcoming, NoteListView.as_view(), views.NoteDetailView.as_view(), TaskListView.as_view(),
+        ):
+            self.assertTrue(iscoroutinefunction(view))
+
+    async def test_read_paths_under_asgi(self):
+        get_fragment_cache().clear()
+        await self.async_client.aforce_login(self.user)
+        pages = {
+            reverse('note_app:index'): 'Async task',
+            reverse('note_app:note_list'): 'Async note',
+            reverse('note_app:note_detail', args=[self.note.pk]): 'Body text',
+            reverse('note_app:task_list'): 'Async task',
+            reverse('note_app:task_upcoming'): 'Async task',
+        }
+        for url, text in pages.items():
+            response = await self.async_client.get(url)
+            self.assertContains(response, text)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse('note_app:task_list'))
+        self.assertEqual(response.status_code, 302)
+
+
+# --- Fragment Cache ---
+
+class ListFragmentCacheTests(TestCase):
+    """Checks that cached list rows are invalidated by every kind of change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cached', password='secret')
+        cls.task = Task.objects.create(user=cls.user, title='First task')
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        self.client.force_login(self.user)
+
+    def get_task_list(self):
+        return self.client.get(reverse('note_app:task_list'))
+
+    def test_changes_expire_the_cached_rows(self):
+        self.assertContains(self.get_task_list(), 'First task')
+
+        Task.objects.create(user=self.user, title='Second task')
+        self.assertContains(self.get_task_list(), 'Second task')
+
+        self.client.post(reverse('note_app:task_toggle_complete', args=[self.task.pk]))
+        self.assertContains(self.get_task_list(), 'line-through')
+
+        Task.objects.filter(pk=self.task.pk).soft_delete(self.user)
+        self.assertNotContains(self.get_task_list(), 'First task')
+
+    def test_cached_rows_carry_the_current_csrf_token(self):
+        self.get_task_list()
+        response = self.get_task_list()
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+
+# --- Note Excerpts ---
+
+class NoteExcerptTests(TestCase):
+    """Checks the stored excerpt/word count and that list pages never read note content."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('excerpts', password='secret')
+        cls.note = Note.objects.create(user=cls.user, title='Lecture', content='<p>One two</p>   three ' + 'word ' * 100)
+
+    def test_summary_is_maintained_on_save(self):
+        self.assertEqual(self.note.word_count, 103)
+        self.assertTrue(self.note.excerpt.startswith('One two three word'))
+        self.assertLessEqual(len(self.note.excerpt), 150)
+
+        self.note.content = 'Short'
+        self.note.save(update_fields=['content'])
+        self.note.refresh_from_db()
+        self.assertEqual((self.note.excerpt, self.note.word_count), ('Short', 1))
+
+    def test_list_pages_skip_content(self):
+        get_fragment_cache().clear()
+        self.client.force_login(self.user)
+        for url in (reverse('note_app:index'), reverse('note_app:note_list')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertContains(response, '103 words')
+            note_queries = [q['sql'] for q in queries.captured_queries if 'FROM "todo_app_note"' in q['sql']]
+            self.assertTrue(note_queries)
+            self.assertFalse(any('"content"' in sql for sql in note_queries))
+
+
+# --- Conditional GET ---
+
+class ConditionalGetTests(TestCase):
+    """Checks that read views answer revalidations with 304 until the data changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('refresher', password='secret')
+        cls.note = Note.objects.create(user=cls.user, title='Note', content='Body')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def revalidate(self, url):
+        etag = self.client.get(url).headers['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_are_not_modified(self):
+        urls = [
+            reverse('note_app:index'),
+            reverse('note_app:note_list'),
+            reverse('note_app:task_list'),
+            reverse('note_app:task_upcoming'),
+            reverse('note_app:note_detail', args=[self.note.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                _etag, response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_note_detail_304_skips_rendering(self):
+        url = reverse('note_app:note_detail', args=[self.note.pk])
+        etag = self.client.get(url).headers['ETag']
+        # the session row and the note; the user is cached
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_overdue_badges_expire_at_midnight(self):
+        for url in (reverse('note_app:index'), reverse('note_app:task_list'), reverse('note_app:task_upcoming')):
+            with self.subTest(url=url):
+                etag = self.client.get(url).headers['ETag']
+                with mock.patch('django.utils.timezone.localdate', return_value=date.today() + timedelta(days=1)):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_changes_produce_a_new_etag(self):
+        url = reverse('note_app:note_list')
+        etag, _response = self.revalidate(url)
+        Note.objects.create(user=self.user, title='Another note')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+
+# --- Search ---
+
+class SearchTests(TestCase):
+    """Checks that the FTS5 index follows saves and deletes and stays per-user."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='secret')
+        cls.other = User.objects.create_user('stranger', password='secret')
+
+    def test_results_follow_saves_and_deletes(self):
+        note = Note.objects.create(user=self.user, title='Photosynthesis', content='<p>Chlorophyll absorbs light</p>')
+        task = Task.objects.create(user=self.user, title='Revise chlorophyll', description='Chapter 3')
+        Note.objects.create(user=self.other, title='Chlorophyll', content='Not yours')
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('note_app:search'), {'q': 'chloro'})
+        results = [(result.kind, result.pk) for result in response.context['results']]
+        self.assertEqual(results, [('note', note.pk), ('task', task.pk)])
+        self.assertContains(response, '<mark>Chlorophyll</mark> absorbs')
+
+        note.delete()
+        Task.objects.filter(pk=task.pk).soft_delete(self.user)
+        response = self.client.get(reverse('note_app:search'), {'q': 'chloro'})
+        self.assertEqual(response.context['results'], [])
+
+    def test_notes_and_tasks_are_ranked_separately(self):
+        body_note = Note.objects.create(user=self.user, title='Biology', content='Osmosis and diffusion')
+        title_note = Note.objects.create(user=self.user, title='Osmosis', content='Water potential')
+        task = Task.objects.create(user=self.user, title='Osmosis lab report')
+        for number in range(5):
+            Task.objects.create(user=self.user, title=f'Task {number}', description='osmosis')
+
+        results = search.search(self.user, 'osmosis')
+        # Title matches rank above body matches, within each kind; the task's
+        # bm25 score is not compared with the notes' scores
+        self.assertEqual(
+            [(result.kind, result.pk) for result in results[:3]],
+            [('note', title_note.pk), ('note', body_note.pk), ('task', task.pk)],
+        )
+        self.assertEqual(len(results), 8)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('note_app:search'), {'q': 'osmosis'})
+        self.assertContains(response, '>Notes</h2>')
+        self.assertContains(response, '>Tasks</h2>')
+
+    def test_query_syntax_is_not_interpreted(self):
+        Note.objects.create(user=self.user, title='Operators', content='NEAR and OR "quotes"')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('note_app:search'), {'q': 'NEAR( " OR'})
+        self.assertEqual(len(response.context['results']), 1)
+
+
+# --- Export ---
+
+class ExportTests(TestCase):
+    """Checks the streamed exports only contain the requesting user's rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='secret')
+        cls.other = User.objects.create_user('bystander', password='secret')
+        Note.objects.create(user=cls.user, title='Mine, "quoted"', content='Line one\nLine two')
+        Note.objects.create(user=cls.other, title='Not mine')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, kind, fmt):
+        response = self.client.get(reverse('note_app:export', args=[kind, fmt]))
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        content = self.export('notes', 'csv')
+        self.assertTrue(content.startswith('id,title,content,created_at,updated_at'))
+        self.assertIn('"Mine, ""quoted"""', content)
+        self.assertNotIn('Not mine', content)
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.export('notes', 'ndjson').splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Mine, "quoted"'])
+        self.assertEqual(rows[0]['content'], 'Line one\nLine two')
+
+    def test_unknown_export_is_404(self):
+        self.assertEqual(self.client.get(reverse('note_app:export', args=['notes', 'xml'])).status_code, 404)
+
+
+# --- Import ---
+
+class ImportTests(TestCase):
+    """Checks that imports validate rows with the model forms and keep derived data in sync."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importer', password='secret')
+        UserStats.for_user(cls.user)
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_csv_import_reports_invalid_rows(self):
+        content = 'title,description,completed\nRead chapter,Pages 1-20,True\n,No title,False\nWrite essay,,False\n'
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('note_app:import', args=['tasks']), {
+            'format': 'csv',
+            'file': SimpleUploadedFile('tasks.csv', content.encode()),
+        })
+
+        # The view only queues the import
+        job = Job.objects.get(user=self.user)
+        self.assertRedirects(response, reverse('note_app:job_detail', args=[job.pk]))
+        self.assertFalse(Task.objects.filter(user=self.user).exists())
+        self.assertContains(self.client.get(response.url), 'Waiting to start')
+
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual((job.result['created'], job.result['failed'], job.progress_done), (2, 1, 3))
+        self.assertEqual(job.result['errors'][0][0], 3)
+        self.assertContains(self.client.get(response.url), 'Imported 2 rows, skipped 1.')
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'imports')), [])
+
+        self.assertEqual(Task.objects.filter(user=self.user, completed=True).count(), 1)
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.total_tasks, stats.completed_tasks), (2, 1))
+        self.assertEqual(len(search.search(self.user, 'essay')), 1)
+
+    def test_boolean_columns(self):
+        content = (
+            'title,completed\n'
+            'A,1\nB,0\nC,yes\nD,no\nE,TRUE\nF,False \nG,\nH,maybe\nI,2\n'
+        )
+        report = imports.import_rows('tasks', self.user, imports.read_rows(BytesIO(content.encode()), 'csv'))
+        self.assertEqual((report.created, report.failed), (7, 2))
+        self.assertEqual([line for line, _messages in report.errors], [9, 10])
+        completed = Task.objects.filter(user=self.user, completed=True).values_list('title', flat=True)
+        self.assertEqual(sorted(completed), ['A', 'C', 'E'])
+
+        rows = [(1, {'title': 'J', 'completed': True}), (2, {'title': 'K', 'completed': 0})]
+        self.assertEqual(imports.import_rows('tasks', self.user, rows).created, 2)
+        self.assertFalse(Task.objects.get(title='K').completed)
+
+    def test_jobs_are_private(self):
+        job = jobs.enqueue('rebuild_user_stats', user=self.user, user_ids=[self.user.pk])
+        self.client.force_login(User.objects.create_user('stranger', password='secret'))
+        self.assertEqual(self.client.get(reverse('note_app:job_detail', args=[job.pk])).status_code, 404)
+
+
+# --- JSON API ---
+
+class ApiTests(TestCase):
+    """Checks the JSON API's field selection, cursor pages, ownership and batches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('api-user', password='secret')
+        cls.other = User.objects.create_user('api-other', password='secret')
+        UserStats.for_user(cls.user)
+        for i in range(5):
+            Note.objects.create(user=cls.user, title=f'Note {i}', content='x' * 1000)
+        cls.foreign = Note.objects.create(user=cls.other, title='Foreign')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def send(self, method, url, payload):
+        return getattr(self.client, method)(url, json.dumps(payload), content_type='application/json')
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('note_app:api_note_list')).status_code, 401)
+
+    def test_sparse_fields_and_cursor_pages(self):
+        url = reverse('note_app:api_note_list')
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(url, {'fields': 'title', 'limit': 3}).json()
+        self.assertEqual(first['results'][0], {'id': first['results'][0]['id'], 'title': 'Note 4'})
+        self.assertNotIn('content', queries.captured_queries[-1]['sql'])
+
+        second = self.client.get(url, {'fields': 'title', 'limit': 3, 'after': first['next']}).json()
+        self.assertEqual([row['title'] for row in second['results']], ['Note 1', 'Note 0'])
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get(url, {'fields': 'secret'}).status_code, 400)
+
+    def test_other_users_objects_are_404(self):
+        url = reverse('note_app:api_note_detail', args=[self.foreign.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.send('patch', url, {'title': 'Mine now'}).status_code, 404)
+
+    def test_partial_update(self):
+        note = Note.objects.filter(user=self.user).first()
+        response = self.send('patch', reverse('note_app:api_note_detail', args=[note.pk]), {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        note.refresh_from_db()
+        self.assertEqual((note.title, note.content), ('Renamed', 'x' * 1000))
+
+    def test_batch_is_all_or_nothing(self):
+        url = reverse('note_app:api_batch')
+        response = self.send('post', url, {'operations': [
+            {'op': 'create', 'resource': 'tasks', 'data': {'title': 'Batched'}},
+            {'op': 'delete', 'resource': 'notes', 'id': self.foreign.pk},
+        ]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertFalse(Task.objects.filter(title='Batched').exists())
+
+        response = self.send('post', url, {'operations': [
+            {'op': 'create', 'resource': 'tasks', 'data': {'title': 'Batched', 'completed': True}},
+            {'op': 'create', 'resource': 'tasks', 'data': {'title': 'Also batched'}},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.total_tasks, stats.completed_tasks), (2, 1))
+
+
+@override_settings(TODO_SYNC_SETTLE=0)
+class SyncTests(TestCase):
+    """The sync API returns only what changed since the client's watermark."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sync-user', password='secret')
+        cls.other = User.objects.create_user('sync-other', password='secret')
+        UserStats.for_user(cls.user)
+        cls.tasks = [Task.objects.create(user=cls.user, title=f'Task {i}') for i in range(3)]
+        cls.notes = [Note.objects.create(user=cls.user, title=f'Note {i}') for i in range(2)]
+        Task.objects.create(user=cls.other, title='Foreign')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('note_app:api_sync'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_first_sync_returns_live_rows(self):
+        Task.objects.filter(pk=self.tasks[2].pk).soft_delete(self.user)
+        data = self.sync()
+        self.assertEqual([row['title'] for row in data['tasks']['changed']], ['Task 0', 'Task 1'])
+        self.assertEqual(data['tasks']['deleted'], [])
+        self.assertEqual(len(data['notes']['changed']), 2)
+        self.assertFalse(data['more'])
+
+    def test_only_changes_since_the_watermark(self):
+        watermark = self.sync()['watermark']
+        self.assertEqual(self.sync(watermark)['tasks'], {'changed': [], 'deleted': []})
+
+        task = self.tasks[0]
+        task.title = 'Edited'
+        task.save()
+        Task.objects.filter(pk=self.tasks[1].pk).toggle_completed(self.user)
+        Note.objects.filter(pk=self.notes[0].pk).soft_delete(self.user)
+        data = self.sync(watermark)
+        self.assertEqual(
+            [(row['id'], row['title'], row['completed']) for row in data['tasks']['changed']],
+            [(task.pk, 'Edited', False), (self.tasks[1].pk, 'Task 1', True)],
+        )
+        self.assertEqual(data['notes'], {'changed': [], 'deleted': [self.notes[0].pk]})
+
+        Note.all_objects.filter(pk=self.notes[0].pk).restore(self.user)
+        data = self.sync(data['watermark'])
+        self.assertEqual(data['tasks']['changed'], [])
+        self.assertEqual([row['id'] for row in data['notes']['changed']], [self.notes[0].pk])
+
+    def test_pages_until_caught_up(self):
+        seen, watermark, calls = [], None, 0
+        while True:
+            data = self.sync(watermark, limit=2)
+            seen.extend(row['id'] for row in data['tasks']['changed'])
+            watermark, calls = data['watermark'], calls + 1
+            if not data['more']:
+                break
+        self.assertEqual(calls, 2)
+        self.assertEqual(seen, [task.pk for task in self.tasks])
+
+    def test_changes_are_held_back_until_settled(self):
+        watermark = self.sync()['watermark']
+        with override_settings(TODO_SYNC_SETTLE=60):
+            Task.objects.create(user=self.user, title='Too recent')
+            self.assertEqual(self.sync(watermark)['tasks']['changed'], [])
+        self.assertEqual([row['title'] for row in self.sync(watermark)['tasks']['changed']], ['Too recent'])
+
+    def test_query_count_does_not_grow_with_the_account(self):
+        watermark = self.sync()['watermark']
+        with CaptureQueriesContext(connection) as small:
+            self.sync(watermark)
+        Task.objects.bulk_create(Task(user=self.user, title=f'Bulk {i}') for i in range(50))
+        watermark = self.sync(limit=1000)['watermark']
+        with CaptureQueriesContext(connection) as large:
+            self.sync(watermark)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_uses_sync_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan checks are written for SQLite.')
+        stamp = timezone.now()
+        for model, index in ((Task, 'task_user_sync_idx'), (Note, 'note_user_sync_idx')):
+            queryset = model.all_objects.filter(user=self.user, updated_at__lte=stamp, updated_at__gte=stamp)
+            plan = queryset.order_by('updated_at', 'id').explain()
+            self.assertIn(index, plan)
+            self.assertNotIn('USE TEMP B-TREE', plan)
+
+    def test_expired_or_invalid_watermark(self):
+        url = reverse('note_app:api_sync')
+        old = timezone.now() - trash.retention() - timedelta(days=1)
+        expired = sync.encode_watermark({'tasks': (old, 0), 'notes': (old, 0)})
+        self.assertEqual(self.client.get(url, {'since': expired}).status_code, 410)
+        self.assertEqual(self.client.get(url, {'since': 'garbage'}).status_code, 410)
+        self.assertEqual(self.client.get(url, {'limit': 'many'}).status_code, 400)
+
+
+# --- Request Metrics ---
+
+class RequestMetricsTests(TestCase):
+    """Checks the per-view metrics, the Server-Timing header and the staff-only endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('measured', password='secret')
+        cls.staff = User.objects.create_user('ops', password='secret', is_staff=True)
+        Task.objects.create(user=cls.user, title='Measured task')
+
+    def setUp(self):
+        metrics.reset()
+        get_fragment_cache().clear()
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('note_app:task_list'))
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+
+        task_list = metrics.snapshot()['note_app:task_list']
+        self.assertEqual(task_list['wall_ms']['count'], 1)
+        self.assertGreater(task_list['queries']['max'], 0)
+        self.assertGreater(task_list['template_ms']['max'], 0)
+        self.assertEqual(task_list['bytes']['max'], len(response.content))
+
+    def test_endpoint_is_staff_only(self):
+        url = reverse('note_app:metrics')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.client.get(reverse('note_app:index'))
+        self.assertIn('note_app:index', self.client.get(url).json()['views'])
+
+
+# --- Seed Data ---
+
+class SeedDataTests(TestCase):
+    """Checks the data generator is repeatable and keeps derived data in sync."""
+
+    def test_seed_users(self):
+        profile = seeding.SeedProfile(tasks=30, notes=10, count_spread=0)
+        users, tasks, notes = seeding.seed_users(3, prefix='gen', profile=profile, seed=7)
+        self.assertEqual((len(users), tasks, notes), (3, 90, 30))
+
+        stats = UserStats.objects.get(user=users[0])
+        self.assertEqual((stats.total_tasks, stats.total_notes), (30, 10))
+        self.assertEqual(stats.completed_tasks, Task.objects.filter(user=users[0], completed=True).count())
+        note = Note.objects.filter(user=users[0]).first()
+        self.assertEqual(note.word_count, len(note.content.split()))
+
+        # The same seed gives the same rows
+        _users, _tasks, _notes = seeding.seed_users(1, prefix='again', profile=profile, seed=7)
+        self.assertEqual(
+            list(Task.objects.filter(user=_users[0]).values_list('title', flat=True)),
+            list(Task.objects.filter(user=users[0]).values_list('title', flat=True)),
+        )
+
+
+# --- N+1 Detection ---
+
+class NPlusOneTests(TestCase):
+    """Checks that repeated query shapes are flagged with their call site."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('looper', password='secret')
+        Task.objects.bulk_create(Task(user=cls.user, title=f'Task {i}') for i in range(10))
+
+    def run_middleware(self, view):
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        return NPlusOneMiddleware(view)(request)
+
+    def test_fingerprint_ignores_parameters(self):
+        self.assertEqual(
+            nplusone.fingerprint('SELECT * FROM t WHERE id IN (%s, %s) AND n = 5 LIMIT 21'),
+            nplusone.fingerprint("SELECT * FROM t WHERE id IN (%s) AND n = 7 LIMIT 21"),
+        )
+
+    def test_lazy_loads_in_a_loop_raise(self):
+        def view(request):
+            # task.user is not selected, so each access runs its own query
+            return HttpResponse(', '.join(task.user.username for task in Task.objects.all()))
+
+        with self.assertRaisesRegex(nplusone.NPlusOneDetected, r'10x at todo_app/tests\.py:\d+ in <genexpr>'):
+            self.run_middleware(view)
+
+    def test_template_loops_report_the_template_line(self):
+        template = Template('{% for task in tasks %}{{ task.user }}{% endfor %}')
+
+        def view(request):
+            return HttpResponse(template.render(Context({'tasks': Task.objects.all()})))
+
+        with override_settings(TODO_NPLUSONE='log'), self.assertLogs('todo_app.nplusone', 'WARNING') as logs:
+            self.run_middleware(view)
+        self.assertIn('line 1', logs.output[0])
+
+    def test_select_related_passes(self):
+        def view(request):
+            return HttpResponse(', '.join(task.user.username for task in Task.objects.select_related('user')))
+
+        self.assertEqual(self.run_middleware(view).status_code, 200)
+
+
+# --- Every URL ---
+
+class UrlCoverageTests(TestCase):
+    """
+    Requests every URL in todo_app/urls.py as a user with many rows, so the
+    N+1 detector (raising under the test runner) checks every view and
+    template against realistic data. New URLs must be added here.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('heavy', password='secret', is_staff=True)
+        cls.other = User.objects.create_user('neighbour', password='secret')
+        for owner in (cls.user, cls.other):
+            UserStats.for_user(owner)
+            seeding.seed_user(owner, task_count=120, note_count=60, rng=random.Random(owner.pk))
+        cls.task = Task.objects.filter(user=cls.user).first()
+        cls.note = Note.objects.filter(user=cls.user).first()
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        self.client.force_login(self.user)
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def requests(self):
+        """(url name, args, method, data, expected status) for every route."""
+        task, note = self.task.pk, self.note.pk
+        spare_task = Task.objects.create(user=self.user, title='Spare').pk
+        spare_note = Note.objects.create(user=self.user, title='Spare').pk
+        task_ids = list(Task.objects.filter(user=self.user).values_list('pk', flat=True)[:30])
+        job = Job.objects.create(
+            kind='import_rows', user=self.user, payload={'kind': 'notes'}, status=Job.Status.SUCCEEDED,
+            result={'created': 1, 'failed': 1, 'errors': [[2, ['title: This field is required.']]]},
+        ).pk
+        return [
+            ('index', [], 'get', None, 200),
+            ('note_list', [], 'get', None, 200),
+            ('note_create', [], 'get', None, 200),
+            ('note_create', [], 'post', {'title': 'New', 'content': 'Text'}, 302),
+            ('note_detail', [note], 'get', None, 200),
+            ('note_update', [note], 'get', None, 200),
+            ('note_update', [note], 'post', {'title': 'Edited', 'content': 'Text'}, 302),
+            ('note_delete', [spare_note], 'get', None, 200),
+            ('note_delete', [spare_note], 'post', None, 302),
+            ('task_list', [], 'get', None, 200),
+            ('task_create', [], 'get', None, 200),
+            ('task_create', [], 'post', {'title': 'New'}, 302),
+            ('task_upcoming', [], 'get', None, 200),
+            ('task_update', [task], 'get', None, 200),
+            ('task_update', [task], 'post', {'title': 'Edited', 'completed': 'on'}, 302),
+            ('task_delete', [spare_task], 'get', None, 200),
+            ('task_delete', [spare_task], 'post', None, 302),
+            ('undo_delete', [], 'post', {'next': reverse('note_app:task_list')}, 302),
+            ('task_toggle_complete', [task], 'post', None, 302),
+            ('task_bulk_action', [], 'post', {'action': 'complete', 'task_ids': task_ids}, 302),
+            ('search', [], 'get', {'q': 'lecture'}, 200),
+            ('export', ['tasks', 'csv'], 'get', None, 200),
+            ('import', ['notes'], 'get', None, 200),
+            ('import', ['notes'], 'post', {
+                'format': 'ndjson', 'file': SimpleUploadedFile('notes.ndjson', b'{"title": "Imported"}\n'),
+            }, 302),
+            ('job_detail', [job], 'get', None, 200),
+            ('metrics', [], 'get', None, 200),
+            ('account_delete', [], 'get', None, 200),
+            ('api_task_list', [], 'get', None, 200),
+            ('api_task_list', [], 'post', {'title': 'From the API'}, 201),
+            ('api_task_detail', [task], 'get', None, 200),
+            ('api_task_detail', [spare_task + 1000], 'get', None, 404),
+            ('api_note_list', [], 'get', {'fields': 'title'}, 200),
+            ('api_note_detail', [note], 'get', None, 200),
+            ('api_batch', [], 'post', {'operations': [
+                {'op': 'create', 'resource': 'notes', 'data': {'title': f'Batch {i}'}} for i in range(10)
+            ]}, 200),
+            ('api_sync', [], 'get', None, 200),
+        ]
+
+    def test_every_url(self):
+        requested = set()
+        for name, args, method, data, status in self.requests():
+            url = reverse(f'note_app:{name}', args=args)
+            with self.subTest(name=name, method=method):
+                if name.startswith('api_') and method == 'post':
+                    response = self.client.post(url, json.dumps(data), content_type='application/json')
+                else:
+                    response = getattr(self.client, method)(url, data)
+                self.assertEqual(response.status_code, status)
+            requested.add(name)
+
+        self.assertEqual(requested, {pattern.name for pattern in urls.urlpatterns})
+
+    def test_cursor_pages_cover_every_row(self):
+        url, seen, cursor = reverse('note_app:api_task_list'), [], None
+        while True:
+            page = self.client.get(url, {'after': cursor} if cursor else {}).json()
+            seen.extend(row['id'] for row in page['results'])
+            cursor = page['next']
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(Task.objects.filter(user=self.user).values_list('pk', flat=True)))
+
+
+# --- Soft Delete ---
+
+class SoftDeleteTests(TestCase):
+    """Deletes go to the trash, can be undone, and are purged in batches later."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('trasher', password='secret')
+        UserStats.for_user(cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def stats(self):
+        return UserStats.objects.get(user=self.user)
+
+    def test_delete_view_trashes_and_undo_restores(self):
+        task = Task.objects.create(user=self.user, title='Photosynthesis', completed=True)
+        response = self.client.post(reverse('note_app:task_delete', args=[task.pk]), follow=True)
+        self.assertContains(response, reverse('note_app:undo_delete'))
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertIsNotNone(Task.all_objects.get(pk=task.pk).deleted_at)
+        self.assertEqual((self.stats().total_tasks, self.stats().completed_tasks), (0, 0))
+        self.assertEqual(search.search(self.user, 'photosynthesis'), [])
+
+        self.client.post(reverse('note_app:undo_delete'))
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+        self.assertEqual((self.stats().total_tasks, self.stats().completed_tasks), (1, 1))
+        self.assertEqual(len(search.search(self.user, 'photosynthesis')), 1)
+
+    def test_undo_restores_only_the_latest_delete(self):
+        first = Note.objects.create(user=self.user, title='First')
+        second = Note.objects.create(user=self.user, title='Second')
+        Note.objects.filter(pk=first.pk).soft_delete(self.user)
+        Note.objects.filter(pk=second.pk).soft_delete(self.user)
+
+        self.assertEqual(trash.undo_last_delete(self.user), 1)
+        self.assertEqual(list(Note.objects.filter(user=self.user).values_list('title', flat=True)), ['Second'])
+        self.assertEqual(self.stats().total_notes, 1)
+
+    @override_settings(TODO_UNDO_WINDOW=0)
+    def test_nothing_to_undo_after_the_window(self):
+        note = Note.objects.create(user=self.user, title='Gone')
+        Note.objects.filter(pk=note.pk).soft_delete(self.user)
+        self.assertEqual(trash.undo_last_delete(self.user), 0)
+
+    def test_trashed_rows_are_hidden_from_lists_and_the_api(self):
+        task = Task.objects.create(user=self.user, title='Hidden')
+        self.client.delete(reverse('note_app:api_task_detail', args=[task.pk]))
+        self.assertNotContains(self.client.get(reverse('note_app:task_list')), 'Hidden')
+        response = self.client.get(reverse('note_app:api_task_detail', args=[task.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_live_list_queries_use_the_partial_indexes(self):
+        for queryset, index in (
+            (Task.objects.filter(user=self.user).order_by('completed', '-created_at', '-id'), 'task_user_status_created_idx'),
+            (Note.objects.filter(user=self.user).order_by('-updated_at', '-id'), 'note_user_updated_idx'),
+        ):
+            self.assertIn(index, queryset.explain())
+
+    def test_purge_removes_expired_rows_in_batches(self):
+        tasks = [Task.objects.create(user=self.user, title=f'Old {number}') for number in range(5)]
+        keep = Task.objects.create(user=self.user, title='Recent')
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).soft_delete(self.user)
+        Task.all_objects.filter(pk__in=[task.pk for task in tasks]).update(
+            deleted_at=timezone.now() - timedelta(days=60),
+        )
+        Task.objects.filter(pk=keep.pk).soft_delete(self.user)
+
+        self.assertEqual(trash.purge_expired(batch_size=2), {'task': 5, 'note': 0})
+        self.assertEqual(list(Task.all_objects.values_list('title', flat=True)), ['Recent'])
+        # The purge leaves the counters alone; the rows left them when trashed
+        self.assertEqual(self.stats().total_tasks, 0)
+
+    def test_account_deletion_defers_the_rows_to_the_purge(self):
+        user = User.objects.create_user('leaving', password='secret')
+        seeding.seed_user(user, task_count=30, note_count=10, rng=random.Random(1))
+        self.client.force_login(user)
+
+        # A fixed number of statements, however many rows the account owns
+        with self.assertNumQueries(23):
+            response = self.client.post(reverse('note_app:account_delete'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertFalse(Task.objects.filter(user=user).exists())
+        self.assertEqual(Task.all_objects.filter(user=user).count(), 30)
+
+        # The queued job purges the rows, in batches
+        job = Job.objects.get(kind='purge_account')
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.Status.SUCCEEDED, {'deleted': True}))
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Task.all_objects.filter(user_id=user.pk).exists())
+        self.assertFalse(AccountDeletion.objects.exists())
+
+    def test_deleted_account_leaves_the_user_cache(self):
+        user = User.objects.create_user('cached-leaver', password='secret')
+        user_cache.set(user.pk, user)
+        trash.delete_account(user)
+        self.assertIsNone(user_cache.get(user.pk))
+
+
+# --- Due Dates ---
+
+class DueTaskTests(TestCase):
+    """The dashboard card and the upcoming page list open tasks by due date."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', password='secret')
+        today = timezone.localdate()
+        for offset, title in ((-3, 'Late essay'), (0, 'Lab today'), (5, 'Reading'), (40, 'Final exam')):
+            Task.objects.create(user=cls.user, title=title, due_date=today + timedelta(days=offset))
+        Task.objects.create(user=cls.user, title='Done', due_date=today - timedelta(days=1), completed=True)
+        Task.objects.create(user=cls.user, title='Someday')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_upcoming_page_splits_overdue_and_upcoming(self):
+        response = self.client.get(reverse('note_app:task_upcoming'))
+        self.assertEqual([task.title for task in response.context['overdue_tasks']], ['Late essay'])
+        self.assertEqual([task.title for task in response.context['upcoming_tasks']], ['Lab today', 'Reading'])
+        self.assertTrue(response.context['overdue_tasks'][0].is_overdue)
+
+    def test_dashboard_shows_the_soonest_due_tasks(self):
+        response = self.client.get(reverse('note_app:index'))
+        self.assertEqual(
+            [task.title for task in response.context['urgent_tasks']],
+            ['Late essay', 'Lab today', 'Reading', 'Final exam'],
+        )
+        self.assertContains(response, 'Overdue: ')
+
+    def test_priority_defaults_when_left_out(self):
+        self.client.post(reverse('note_app:task_create'), {'title': 'No priority', 'due_date': '2030-01-31'})
+        task = Task.objects.get(title='No priority')
+        self.assertEqual((task.priority, task.due_date), (Task.Priority.NORMAL, date(2030, 1, 31)))
+
+
+# --- Session and User Caches ---
+
+class AuthFastPathTests(TestCase):
+    """Logged-in requests skip the user query, without serving stale users or sessions."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='secret')
+        self.client.force_login(self.user)
+        self.url = reverse('note_app:task_list')
+
+    def auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            q['sql'] for q in queries.captured_queries
+            if '"django_session"' in q['sql'] or '"auth_user"' in q['sql']
+        ]
+
+    def test_warm_requests_only_read_the_session(self):
+        # The user is loaded once per process
+        self.assertEqual(len(self.auth_queries()), 2)
+        queries = self.auth_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"django_session"', queries[0])
+
+    def test_session_deleted_elsewhere_is_rejected(self):
+        self.auth_queries()
+        # As a logout handled by another worker process does
+        Session.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f'{reverse("login")}?next={self.url}', fetch_redirect_response=False)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_sessions(self):
+        # The single-process option: the session is cached at login
+        self.client.force_login(self.user)
+        self.auth_queries()
+        self.assertEqual(self.auth_queries(), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        self.client.force_login(self.user)
+        self.auth_queries()
+        self.assertEqual(self.auth_queries(), [])
+
+    @override_settings(TODO_USER_CACHE_TTL=0)
+    def test_cache_can_be_turned_off(self):
+        self.auth_queries()
+        self.assertEqual(len(self.auth_queries()), 2)
+
+    def test_password_change_ends_other_sessions(self):
+        self.auth_queries()
+        self.user.set_password('changed')
+        self.user.save()
+        # The cached copy is gone, so the stale session hash no longer verifies
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f'{reverse("login")}?next={self.url}', fetch_redirect_response=False)
+
+    def test_deactivation_applies_at_once(self):
+        self.auth_queries()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        # A queryset update() sends no signal: the cached user is used until the TTL runs out
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_requests_get_their_own_copy(self):
+        self.auth_queries()
+        first, second = user_cache.get(self.user.pk), user_cache.get(self.user.pk)
+        self.assertIsNot(first, second)
+        first.first_name = 'Changed'
+        self.assertEqual(user_cache.get(self.user.pk).first_name, '')
+
+
+# --- Static Assets ---
+
+class StaticAssetTests(TestCase):
+    """Hashed, precompressed static files served with far-future cache headers."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.css = b'.w-5{width:1.25rem}' * 100
+        with open(os.path.join(self.root, 'app.css'), 'wb') as file:
+            file.write(self.css)
+
+    def collect(self):
+        """Run the storage's collectstatic post-processing over app.css; returns its hashed name."""
+        storage = assets.CompressedManifestStaticFilesStorage(location=self.root, base_url='/static/')
+        processed = list(storage.post_process({'app.css': (storage, 'app.css')}))
+        return processed[0][1]
+
+    def test_collected_files_are_hashed_and_compressed(self):
+        hashed = self.collect()
+        self.assertRegex(hashed, r'^app\.[0-9a-f]{12}\.css$')
+        with open(os.path.join(self.root, hashed + '.gz'), 'rb') as file:
+            self.assertEqual(gzip.decompress(file.read()), self.css)
+
+    def test_middleware_serves_the_smallest_accepted_encoding(self):
+        hashed = self.collect()
+        with override_settings(STATIC_ROOT=self.root, STATIC_URL='/static/', TODO_SERVE_STATIC=True):
+            middleware = StaticAssetMiddleware(lambda request: HttpResponse('view'))
+
+        response = middleware(RequestFactory().get(f'/static/{hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate'))
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Cache-Control'], assets.IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content), self.css)
+
+        response = middleware(RequestFactory().get(f'/static/{hashed}'))
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.content, self.css)
+
+        # The unhashed name may change under the same URL, so it is only cached briefly
+        response = middleware(RequestFactory().get('/static/app.css'))
+        self.assertEqual(response.headers['Cache-Control'], assets.SHORT_CACHE_CONTROL)
+        self.assertEqual(middleware(RequestFactory().get('/static/missing.css')).content, b'view')
+
+    def test_tailwind_scans_the_form_widget_classes(self):
+        config = (assets.FRONTEND_DIR / 'tailwind.config.js').read_text()
+        globs = re.findall(r"'(\./todo_app/[^']+)'", config)
+        scanned = {
+            name for pattern in globs
+            for name in glob.glob(pattern, root_dir=assets.APP_DIR.parent, recursive=True)
+        }
+        self.assertIn('./todo_app/forms.py', scanned)
+        self.assertIn('./todo_app/templates/base.html', scanned)
+
+    def test_icon_sprite_has_a_symbol_per_icon(self):
+        source = (
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="currentColor">'
+            '<path d="M18 6 6 18" /></svg>'
+        )
+        sprite = assets.build_icon_sprite(['x', 'plus'], lambda name: source, os.path.join(self.root, 'icons.svg'))
+        content = sprite.read_text()
+        self.assertIn('<symbol id="x" viewBox="0 0 24 24" fill="none" stroke="currentColor">', content)
+        self.assertEqual(content.count('<path'), 2)
+
+    def test_templates_use_the_sprite_instead_of_runtime_scripts(self):
+        self.assertIn('list-todo', assets.used_icons())
+        html = Template('{% load todo_assets %}{% icon "x" "w-5 h-5" %}').render(Context())
+        self.assertInHTML(f'<svg class="w-5 h-5" aria-hidden="true"><use href="/static/{assets.ICON_SPRITE}#x"></use></svg>', html)
+        for path in assets.TEMPLATE_DIR.rglob('*.html'):
+            self.assertNotIn('data-lucide', path.read_text(encoding='utf-8'), path)
+
+    @override_settings(DEBUG=True)
+    def test_unbuilt_assets_fall_back_to_the_cdns_in_development(self):
+        page = Template('{% load todo_assets %}{% stylesheet %}{% icon "x" "w-5 h-5" %}{% icon_script %}')
+        with mock.patch('django.contrib.staticfiles.finders.find', return_value=None):
+            html = page.render(Context())
+        self.assertIn('https://cdn.tailwindcss.com', html)
+        self.assertInHTML('<i data-lucide="x" class="w-5 h-5"></i>', html)
+        self.assertIn('lucide.createIcons()', html)
+
+        with mock.patch('django.contrib.staticfiles.finders.find', return_value='/built'):
+            html = page.render(Context())
+        self.assertNotIn('https://', html)
+        self.assertIn(f'/static/{assets.ICON_SPRITE}#x', html)
+
+
+# --- Background Jobs ---
+
+class JobQueueTests(TestCase):
+    """Claiming, retries and stale-lock recovery of the database-backed job queue."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('worker', password='secret')
+        seeding.seed_user(cls.user, task_count=12, note_count=3, rng=random.Random(2))
+
+    def test_claims_are_exclusive_and_oldest_first(self):
+        first = jobs.enqueue('rebuild_user_stats', user_ids=[self.user.pk])
+        second = jobs.enqueue('rebuild_user_stats', user_ids=[self.user.pk])
+        later = jobs.enqueue('rebuild_user_stats', user_ids=[self.user.pk])
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(jobs.claim('a', 1), [first.pk])
+        self.assertEqual(jobs.claim('b', 5), [second.pk])
+        self.assertEqual(jobs.claim('c', 5), [])
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.locked_by, second.attempts), (Job.Status.RUNNING, 'b', 1))
+
+    def test_rebuild_reports_progress(self):
+        UserStats.objects.filter(user=self.user).update(total_tasks=0)
+        job = jobs.enqueue('rebuild_user_stats', user_ids=[self.user.pk])
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.Status.SUCCEEDED, {'rebuilt': 1}))
+        self.assertEqual((job.progress_done, job.progress_total, job.progress_percent), (1, 1, 100))
+        self.assertEqual(UserStats.objects.get(user=self.user).total_tasks, 12)
+
+    @override_settings(TODO_JOB_RETRY_DELAY=10)
+    def test_failures_are_retried_with_backoff(self):
+        calls = []
+
+        def flaky(job):
+            calls.append(job.attempts)
+            raise RuntimeError('database went away')
+        flaky.max_attempts = 2
+
+        with mock.patch.dict(jobs.HANDLERS, flaky=flaky):
+            job = jobs.enqueue('flaky')
+            with self.assertLogs('todo_app.jobs', 'WARNING'):
+                jobs.run_pending()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+            self.assertIn('database went away', job.error)
+            self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+
+            # Not due yet; once it is, the last attempt fails for good
+            self.assertEqual(jobs.run_pending(), 0)
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            with self.assertLogs('todo_app.jobs', 'ERROR'):
+                jobs.run_pending()
+            job.refresh_from_db()
+            self.assertEqual((job.status, calls), (Job.Status.FAILED, [1, 2]))
+            self.assertIsNotNone(job.finished_at)
+
+    def test_jobs_of_dead_workers_are_requeued(self):
+        job = jobs.enqueue('purge_account', user_id=self.user.pk)
+        last_try = jobs.enqueue('import_rows', kind='notes', fmt='csv', path='imports/missing.csv')
+        jobs.claim('dead', 2)
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        last_try.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.Status.QUEUED, ''))
+        # Imports only get one attempt
+        self.assertEqual(last_try.status, Job.Status.FAILED)
+
+    def test_unknown_kinds_are_rejected(self):
+        with self.assertRaises(LookupError):
+            jobs.enqueue('mine_bitcoin')
+
+
+class JobWorkerTests(TransactionTestCase):
+    """The run_jobs command runs queued jobs on its pool, each thread with its own connection."""
+
+    def test_thread_pool_drains_the_queue(self):
+        users = [User.objects.create_user(f'user-{i}', password='secret') for i in range(3)]
+        for user in users:
+            Task.objects.create(user=user, title='Task')
+            jobs.enqueue('rebuild_user_stats', user_ids=[user.pk])
+
+        out = StringIO()
+        # One worker thread: the shared-cache in-memory test database locks whole
+        # tables and has no busy timeout, so concurrent writers would just retry
+        call_command('run_jobs', '--once', '--workers', '1', '--poll-interval', '0.05', stdout=out)
+        self.assertIn('3 succeeded', out.getvalue())
+        self.assertFalse(Job.objects.exclude(status=Job.Status.SUCCEEDED).exists())
+        self.assertEqual(
+            sorted(UserStats.objects.values_list('total_tasks', flat=True)), [1, 1, 1],
+        )
+
+
+# --- Admin ---
+
+class AdminTests(TestCase):
+    """The Task and Note changelists stay cheap on big tables and act in batches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser('admin', password='secret')
+        cls.users = [User.objects.create_user(f'owner-{i}', password='secret') for i in range(2)]
+        for user in cls.users:
+            UserStats.for_user(user)
+            for i in range(3):
+                Task.objects.create(user=user, title=f'Chore {i}', completed=i == 0)
+            Note.objects.create(user=user, title='Quantum homework')
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def changelist(self, model, **params):
+        response = self.client.get(reverse(f'admin:todo_app_{model}_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.changelist('task')
+        with CaptureQueriesContext(connection) as small:
+            self.changelist('task')
+        Task.objects.bulk_create(Task(user=self.users[1], title=f'Bulk {i}') for i in range(30))
+        with CaptureQueriesContext(connection) as large:
+            cl = self.changelist('task')
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertEqual(cl.result_count, 36)
+
+    @mock.patch.object(EstimatedCountPaginator, 'count_limit', 3)
+    def test_counts_stop_at_the_limit(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Written for SQLite planner statistics.')
+        self.assertEqual(self.changelist('task').result_count, 3)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        # Unfiltered: the live-row index statistics; filtered: capped
+        self.assertEqual(self.changelist('task').result_count, 6)
+        self.assertEqual(self.changelist('task', completed__exact=0).result_count, 3)
+        self.assertEqual(database.estimated_count('task_user_status_created_idx'), 6)
+
+    def test_owner_filter(self):
+        owner = self.users[0]
+        cl = self.changelist('task', user=owner.pk)
+        self.assertEqual({task.user_id for task in cl.result_list}, {owner.pk})
+        self.assertEqual(self.changelist('task', user='nobody').result_count, 0)
+
+    def test_search_uses_full_text_index(self):
+        if not search.is_available():
+            self.skipTest('Full-text search needs SQLite FTS5.')
+        with CaptureQueriesContext(connection) as queries:
+            cl = self.changelist('note', q='quant')
+        self.assertEqual(cl.result_count, 2)
+        self.assertTrue(any('MATCH' in query['sql'] for query in queries.captured_queries))
+
+    def test_actions_keep_counters(self):
+        url = reverse('admin:todo_app_task_changelist')
+        choices = self.client.get(url).context['action_form'].fields['action'].choices
+        self.assertNotIn('delete_selected', [name for name, _label in choices])
+        # "Select all" across pages still posts the ticked rows of the current one
+        self.client.post(url, {
+            'action': 'mark_completed', 'select_across': '1', 'index': '0',
+            '_selected_action': [Task.objects.first().pk],
+        })
+        self.assertEqual(Task.objects.filter(completed=False).count(), 0)
+        self.assertEqual(list(UserStats.objects.values_list('completed_tasks', flat=True)), [3, 3])
+
+        trashed = admin.in_batches(Task.objects.all(), lambda rows, user: rows.soft_delete(user), batch_size=4)
+        self.assertEqual(trashed, 6)
+        self.assertEqual(list(UserStats.objects.values_list('total_tasks', 'completed_tasks')), [(0, 0), (0, 0)])
+
+    def test_delete_moves_to_trash(self):
+        task = Task.objects.filter(user=self.users[0]).first()
+        self.client.post(reverse('admin:todo_app_task_delete', args=[task.pk]), {'post': 'yes'})
+        self.assertTrue(Task.all_objects.filter(pk=task.pk, deleted_at__isnull=False).exists())
+
+
+# --- Startup ---
+
+class WarmupTests(TestCase):
+    """The warm-up does the first request's one-off work, and startup imports are attributed per app."""
+
+    def test_warm_up_fills_the_caches(self):
+        report = warmup.warm_up()
+        templates = len(list(warmup.TEMPLATE_DIR.rglob('*.html')))
+        self.assertEqual(report['templates'][0], templates)
+        self.assertGreater(report['urls'][0], len(urls.urlpatterns))
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertIn('base.html', loader.get_template_cache)
+        # Not fork-safe, so only on request
+        self.assertNotIn('connections', report)
+        self.assertEqual(warmup.warm_up(['connections'])['connections'][0], 1)
+
+    def test_failed_step_is_skipped(self):
+        failing = {
+            'connections': DatabaseError('down'),
+            'templates': TemplateDoesNotExist('missing.html'),
+        }
+        for name, error in failing.items():
+            with self.subTest(name), mock.patch.dict(warmup.STEPS, {name: mock.Mock(side_effect=error)}):
+                with self.assertLogs('todo_app.warmup', 'WARNING'):
+                    report = warmup.warm_up(warmup.STEPS)
+                self.assertNotIn(name, report)
+                self.assertIn('urls', report)
+
+    def test_only_the_server_entry_points_warm_up(self):
+        # Loading asgi.py also turns off CONN_MAX_AGE
+        with mock.patch('todo_app.warmup.warm_up') as warm_up, mock.patch.dict(settings.DATABASES['default']):
+            from student_todo_project import asgi, wsgi
+
+            apps.get_app_config('todo_app').ready()
+            for module in (wsgi, asgi):
+                importlib.reload(module)
+            warm_up.assert_not_called()
+            with override_settings(TODO_WARMUP=True):
+                for module in (wsgi, asgi):
+                    importlib.reload(module)
+            self.assertEqual(warm_up.call_count, 2)
+
+    def test_import_time_per_app(self):
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 |     todo_app.forms',
+            'import time:        50 |         50 |     json',
+            'import time:       200 |        350 |   todo_app.views',
+            'import time:        30 |         30 |   django.contrib.auth.models',
+            'import time:        20 |        400 | todo_app.models',
+            'import time:        70 |         70 | django.contrib.auth',
+        ])
+        modules = parse_importtime(output)
+        self.assertEqual(modules[2], ('todo_app.views', 1, 200, 350))
+        # auth.models was pulled in by todo_app.models, so it counts there only
+        self.assertEqual(
+            time_per_app(modules, ['django.contrib.auth', 'todo_app']),
+            {'django.contrib.auth': 70, 'todo_app': 400},
+        )
 
-# Create your tests here.
@@ -0,0 +1,148 @@
+"""
+Soft delete, undo and the batched purge.
+
+Deleting a note or task only stamps its `deleted_at` (see the soft_delete()
+queryset methods in models.py); the default managers hide stamped rows and
+the list indexes are partial on `deleted_at IS NULL`, so trashed rows cost
+live queries nothing. Every row removed by one action shares one timestamp,
+which is what undo_last_delete() restores.
+
+The `purge_deleted` management command hard-deletes rows that have been in
+the trash longer than settings.TODO_TRASH_RETENTION_DAYS, and empties
+accounts queued by delete_account(), a batch at a time so no single
+transaction holds the write lock for long. A deleted account is also purged
+by a background job (see jobs.py) as soon as a worker picks it up.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .auth import user_cache
+from .models import AccountDeletion, Note, Task
+
+DEFAULT_UNDO_WINDOW = 600
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_BATCH_SIZE = 1000
+
+TRASHABLE_MODELS = (Task, Note)
+
+
+def undo_window():
+    """How long (a timedelta) after a delete the user can still undo it."""
+    return timedelta(seconds=getattr(settings, 'TODO_UNDO_WINDOW', DEFAULT_UNDO_WINDOW))
+
+
+def retention():
+    """How long (a timedelta) trashed rows are kept before purge_deleted removes them."""
+    return timedelta(days=getattr(settings, 'TODO_TRASH_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+
+
+# --- Undo ---
+
+def last_delete(user):
+    """The `deleted_at` of the user's most recent delete that can still be undone, or None."""
+    cutoff = timezone.now() - undo_window()
+    stamps = [
+        model.all_objects.filter(user=user, deleted_at__gte=cutoff).aggregate(last=Max('deleted_at'))['last']
+        for model in TRASHABLE_MODELS
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def undo_last_delete(user):
+    """
+    Restore every task and note removed by the user's most recent delete.
+    Returns the number of rows restored (0 if there is nothing to undo).
+    """
+    stamp = last_delete(user)
+    if stamp is None:
+        return 0
+    with transaction.atomic():
+        return sum(
+            model.all_objects.filter(deleted_at=stamp).restore(user)
+            for model in TRASHABLE_MODELS
+        )
+
+
+# --- Accounts ---
+
+def delete_account(user):
+    """
+    Delete an account without cascading through its rows in the request:
+    trash everything it owns (one UPDATE per model), deactivate the user and
+    queue the account for purge_deleted.
+
+    Deactivating logs the user out of this process at once. Other worker
+    processes may still have the user in their user cache (see auth.py), so
+    the account's other sessions keep working there for up to
+    TODO_USER_CACHE_TTL seconds, until the cache entry expires and the
+    inactive user is reloaded.
+    """
+    when = timezone.now()
+    with transaction.atomic():
+        for model in TRASHABLE_MODELS:
+            model.objects.soft_delete(user, when)
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        AccountDeletion.objects.get_or_create(user=user)
+    # The post_save signal already did this, but before the commit: a request
+    # in between could have cached the still-active user again
+    user_cache.invalidate(user.pk)
+
+
+# --- Purge ---
+
+def _purge_batches(queryset, batch_size):
+    """
+    Hard-delete the rows of a queryset, `batch_size` primary keys per
+    transaction. The rows are already out of the counters and the search
+    index, so this is a raw DELETE with no signals. Returns the number deleted.
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += queryset.model.all_objects.filter(pk__in=pks)._raw_delete(queryset.db)
+
+
+def purge_expired(older_than=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Remove rows that have been in the trash longer than `older_than`
+    (default: the retention setting). Returns {model name: rows deleted}.
+    """
+    cutoff = timezone.now() - (older_than if older_than is not None else retention())
+    return {
+        model._meta.model_name: _purge_batches(model.all_objects.filter(deleted_at__lt=cutoff), batch_size)
+        for model in TRASHABLE_MODELS
+    }
+
+
+def purge_account(user_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Empty one account queued by delete_account() in batches, then delete
+    the user itself, whose cascade is small once its rows are gone.
+    Returns False if the account is not (or no longer) queued.
+    """
+    if not AccountDeletion.objects.filter(user_id=user_id).exists():
+        return False
+    for model in TRASHABLE_MODELS:
+        # Including rows the user created between the request and deactivation
+        _purge_batches(model.all_objects.filter(user_id=user_id), batch_size)
+    get_user_model().objects.filter(pk=user_id).delete()
+    return True
+
+
+def purge_accounts(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Purge every account queued by delete_account() (see purge_account()).
+    Returns the number of accounts deleted.
+    """
+    user_ids = AccountDeletion.objects.order_by('requested_at').values_list('user_id', flat=True)
+    return sum(purge_account(user_id, batch_size) for user_id in list(user_ids))
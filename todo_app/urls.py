@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 # Set the namespace for this application
 app_name = 'note_app'
@@ -18,9 +18,42 @@ urlpatterns = [
     # --- Task URLs (To-Do List) ---
     path('tasks/', views.TaskListView.as_view(), name='task_list'),
     path('tasks/create/', views.TaskCreateView.as_view(), name='task_create'),
+    path('tasks/upcoming/', views.task_upcoming, name='task_upcoming'),
     path('tasks/<int:pk>/update/', views.TaskUpdateView.as_view(), name='task_update'),
     path('tasks/<int:pk>/delete/', views.TaskDeleteView.as_view(), name='task_delete'),
     
     # Custom view for toggling task completion status
     path('tasks/<int:pk>/toggle/', views.task_toggle_complete, name='task_toggle_complete'),
+
+    # Complete, reopen or delete several tasks at once
+    path('tasks/bulk/', views.task_bulk_action, name='task_bulk_action'),
+
+    # --- Trash ---
+    # Restore whatever the user's most recent delete removed
+    path('undo/', views.undo_delete, name='undo_delete'),
+    path('account/delete/', views.account_delete, name='account_delete'),
+
+    # --- Search ---
+    path('search/', views.search_view, name='search'),
+
+    # --- Data Export (e.g. export/notes/csv/) ---
+    path('export/<str:kind>/<str:fmt>/', views.export_data, name='export'),
+
+    # --- Bulk Import (e.g. import/tasks/) ---
+    path('import/<str:kind>/', views.import_data, name='import'),
+
+    # --- Background Jobs (e.g. an import's progress and report) ---
+    path('jobs/<int:pk>/', views.job_detail, name='job_detail'),
+
+    # --- Request Metrics (staff only) ---
+    path('metrics/', views.metrics_view, name='metrics'),
+
+    # --- JSON API ---
+    path('api/tasks/', api.CollectionView.as_view(resource_name='tasks'), name='api_task_list'),
+    path('api/tasks/<int:pk>/', api.ItemView.as_view(resource_name='tasks'), name='api_task_detail'),
+    path('api/notes/', api.CollectionView.as_view(resource_name='notes'), name='api_note_list'),
+    path('api/notes/<int:pk>/', api.ItemView.as_view(resource_name='notes'), name='api_note_detail'),
+    path('api/batch/', api.BatchView.as_view(), name='api_batch'),
+    # Changes since a watermark, for clients that keep a local copy
+    path('api/sync/', api.SyncView.as_view(), name='api_sync'),
 ]
\ No newline at end of file
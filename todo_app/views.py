@@ -1,15 +1,38 @@
 
+import asyncio
+import os
+import uuid
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
-from django.http import HttpResponseRedirect
+from django.contrib import messages
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
 
-from .models import Note, Task
-from .forms import NoteForm, TaskForm
+from .models import Job, Note, Task
+from . import exports, imports, jobs, metrics, search, trash
+from .caching import (
+    CachedListMixin, ConditionalGetMixin, aget_user_stats, conditional_response, make_etag,
+)
+from .forms import ImportForm, NoteForm, TaskForm
+from .pagination import KeysetPaginationMixin
+
+
+# Tasks shown on the dashboard's urgent card
+URGENT_TASK_LIMIT = 5
+# The upcoming page lists tasks due within this many days, at most UPCOMING_TASK_LIMIT per section
+UPCOMING_DAYS = 14
+UPCOMING_TASK_LIMIT = 50
 
 
 # --- Access Mixins ---
@@ -18,58 +41,178 @@ class BaseAccessMixin(LoginRequiredMixin, UserPassesTestMixin):
     """
     Base mixin that ensures the user is logged in and is the owner
     of the object being accessed (for Detail, Update, and Delete views).
+
+    The object is looked up once with the owner in the WHERE clause and cached
+    on the view, so the ownership check and the view itself share one query.
+    Objects owned by someone else are reported as 404s.
     """
     # The default redirect URL if login is required
     login_url = '/accounts/login/' 
 
+    def get_queryset(self):
+        """Restrict lookups to objects owned by the logged-in user."""
+        return super().get_queryset().filter(user=self.request.user)
+
     def test_func(self):
         """Checks if the logged-in user is the owner of the object."""
         obj = self.get_object()
         # For new objects (CreateView), this check is not needed, 
         # but for existing objects, ensure the object belongs to the user.
-        return obj.user == self.request.user
+        # Compare ids so the related User row is never loaded.
+        return obj is True or obj.user_id == self.request.user.pk
 
     # Overriding to handle CreateView case where there is no object yet
     def get_object(self, queryset=None):
         if self.kwargs.get(self.pk_url_kwarg) is None and isinstance(self, CreateView):
             # Allow creation views to pass without failing on test_func
             return True 
-        return super().get_object(queryset)
+        if queryset is not None:
+            return super().get_object(queryset)
+        # Reuse the object fetched by test_func instead of querying again
+        if not hasattr(self, '_owned_object'):
+            self._owned_object = super().get_object()
+        return self._owned_object
+
+
+
+# Extra message tag that makes base.html show an Undo button next to the message
+UNDO_TAG = 'undo'
+
+
+class SoftDeleteMixin:
+    """
+    DeleteView mixin that moves the object to the trash (see trash.py) with
+    one UPDATE instead of deleting it, and offers an undo in the message.
+    """
+
+    def form_valid(self, form):
+        type(self.object).objects.filter(pk=self.object.pk).soft_delete(self.request.user)
+        messages.success(self.request, f'"{self.object.title}" deleted.', extra_tags=UNDO_TAG)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+# --- Async Helpers ---
+
+async def resolve_user(request):
+    """
+    Load the user through the async auth API and put it back on the request,
+    so later code (mixins, make_etag, the auth context processor) never runs
+    the lazy synchronous lookup from inside the event loop.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+async def fetch(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [obj async for obj in queryset]
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """
+    LoginRequiredMixin for views whose handlers are async. The stock mixin
+    reads request.user synchronously, which the async views must not do.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not (await resolve_user(request)).is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
 
-    
 # --- General View ---
 
-def index(request):
+@login_required
+async def index(request):
     """
     The main index page of the application.
+    Counters come from the precomputed UserStats row instead of COUNT(*) queries,
+    and the list versions on that row let unchanged dashboards answer with a 304.
     """
-    # Render the dashboard as the index page (dashboard template is at templates/dashboard.html)
-    return render(request, 'dashboard.html', {'title': 'Home'})
+    user = await resolve_user(request)
+    # The stats row is needed first: it decides whether the page is rendered at all
+    stats = await aget_user_stats(request)
+    today = timezone.localdate()
+
+    async def render_dashboard():
+        # The two cards are independent, so their queries are issued together
+        urgent_tasks, recent_notes = await asyncio.gather(
+            # Soonest due first (overdue ones lead): an index range scan that stops after the LIMIT
+            fetch(Task.objects.due(user).defer('description')[:URGENT_TASK_LIMIT]),
+            # The card only shows titles, so the note bodies are never read
+            fetch(Note.objects.filter(user=user).defer('content').order_by('-updated_at')[:5]),
+        )
+        context = {
+            'title': 'Home',
+            'total_tasks': stats.total_tasks,
+            'pending_tasks': stats.pending_tasks,
+            'completed_tasks': stats.completed_tasks,
+            'total_notes': stats.total_notes,
+            'urgent_tasks': urgent_tasks,
+            'recent_notes': recent_notes,
+        }
+        # Render the dashboard as the index page (dashboard template is at templates/dashboard.html).
+        # A TemplateResponse is rendered by Django after the view returns, off the event loop.
+        return TemplateResponse(request, 'dashboard.html', context)
+
+    # Overdue badges change at midnight even when no task does
+    etag = make_etag(request, 'dashboard', stats.task_list_version, stats.note_list_version, today.isoformat())
+    return await conditional_response(request, render_dashboard, etag=etag)
 
 
 # ----------------------------------
 #          NOTE VIEWS
 # ----------------------------------
 
-class NoteListView(LoginRequiredMixin, ListView):
+class NoteListView(AsyncLoginRequiredMixin, ConditionalGetMixin, CachedListMixin, KeysetPaginationMixin, ListView):
     """
-    Displays a list of all notes belonging to the current user.
+    Displays the notes belonging to the current user, one cursor page at a time.
+    The rendered rows are cached until the user's notes change, and until then
+    repeat requests are answered with a 304.
     """
     model = Note
     template_name = 'todo_app/note_list.html'
+    fragment_template_name = 'todo_app/note_list_rows.html'
+    version_field = 'note_list_version'
     context_object_name = 'notes'
+    paginate_by = 25
+    keyset_fields = ('-updated_at', '-id')
     
     def get_queryset(self):
-        # Filter notes to show only those created by the logged-in user
-        return Note.objects.filter(user=self.request.user).order_by('-updated_at')
+        # Filter notes to show only those created by the logged-in user.
+        # Rows show the stored excerpt, so the full content column is skipped.
+        return Note.objects.filter(user=self.request.user).defer('content').order_by(*self.keyset_fields)
 
-class NoteDetailView(BaseAccessMixin, DetailView):
+class NoteDetailView(AsyncLoginRequiredMixin, ConditionalGetMixin, DetailView):
     """
     Displays the details of a single note. Requires login and ownership.
+    The note is fetched once, content included: that row answers the 304
+    check and, when it fails, renders the page.
     """
     model = Note
     template_name = 'todo_app/note_detail.html'
     context_object_name = 'note'
+
+    def get_queryset(self):
+        # Owner in the WHERE clause: other users' notes are 404s
+        return Note.objects.filter(user=self.request.user)
+
+    async def aget_object(self):
+        """Fetch the note once with the async ORM and cache it on the view."""
+        if not hasattr(self, '_owned_object'):
+            try:
+                self._owned_object = await self.get_queryset().aget(pk=self.kwargs[self.pk_url_kwarg])
+            except Note.DoesNotExist:
+                raise Http404('No note found matching the query')
+        return self._owned_object
+
+    def get_object(self, queryset=None):
+        # DetailView.get() runs after get_validators(), which already fetched the note
+        return self._owned_object
+
+    async def get_validators(self):
+        note = await self.aget_object()
+        return make_etag(self.request, 'note', note.pk, note.updated_at.isoformat()), note.updated_at
     
 class NoteCreateView(LoginRequiredMixin, CreateView):
     """
@@ -100,7 +243,7 @@ class NoteUpdateView(BaseAccessMixin, UpdateView):
         # Redirect back to the detail page after updating
         return reverse_lazy('note_app:note_detail', kwargs={'pk': self.object.pk})
 
-class NoteDeleteView(BaseAccessMixin, DeleteView):
+class NoteDeleteView(BaseAccessMixin, SoftDeleteMixin, DeleteView):
     """
     Handles the deletion of a note. Requires login and ownership.
     """
@@ -114,17 +257,25 @@ class NoteDeleteView(BaseAccessMixin, DeleteView):
 #          TASK VIEWS
 # ----------------------------------
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(AsyncLoginRequiredMixin, ConditionalGetMixin, CachedListMixin, KeysetPaginationMixin, ListView):
     """
-    Displays a list of all tasks belonging to the current user.
+    Displays the tasks belonging to the current user, one cursor page at a time.
+    The rendered rows are cached until the user's tasks change, and until then
+    repeat requests are answered with a 304.
     """
     model = Task
     template_name = 'todo_app/task_list.html'
+    fragment_template_name = 'todo_app/task_list_rows.html'
+    version_field = 'task_list_version'
     context_object_name = 'tasks'
+    paginate_by = 50
+    keyset_fields = ('completed', '-created_at', '-id')
+    # The rows show overdue badges
+    date_sensitive = True
     
     def get_queryset(self):
         # Filter tasks to show only those created by the logged-in user
-        return Task.objects.filter(user=self.request.user).order_by('completed', '-created_at')
+        return Task.objects.filter(user=self.request.user).order_by(*self.keyset_fields)
 
 class TaskCreateView(LoginRequiredMixin, CreateView):
     """
@@ -149,7 +300,7 @@ class TaskUpdateView(BaseAccessMixin, UpdateView):
     template_name = 'todo_app/task_form.html'
     success_url = reverse_lazy('note_app:task_list') # Redirect to the task list after updating
 
-class TaskDeleteView(BaseAccessMixin, DeleteView):
+class TaskDeleteView(BaseAccessMixin, SoftDeleteMixin, DeleteView):
     """
     Handles the deletion of a task. Requires login and ownership.
     """
@@ -160,21 +311,206 @@ class TaskDeleteView(BaseAccessMixin, DeleteView):
 
 
 @login_required
+async def task_upcoming(request):
+    """
+    The user's overdue tasks and those due in the next UPCOMING_DAYS days.
+    Each section is one range scan of task_user_status_due_idx with a
+    LIMIT, so the page costs the same for a user with fifty tasks or fifty
+    thousand. Answered with a 304 until the tasks or the date change.
+    """
+    user = await resolve_user(request)
+    stats = await aget_user_stats(request)
+    today = timezone.localdate()
+
+    async def render_upcoming():
+        # One extra row per section tells us whether there are more than we show
+        overdue, upcoming = await asyncio.gather(
+            fetch(Task.objects.overdue(user, today).defer('description')[:UPCOMING_TASK_LIMIT + 1]),
+            fetch(Task.objects.upcoming(user, today, UPCOMING_DAYS).defer('description')[:UPCOMING_TASK_LIMIT + 1]),
+        )
+        context = {
+            'overdue_tasks': overdue[:UPCOMING_TASK_LIMIT],
+            'more_overdue': len(overdue) > UPCOMING_TASK_LIMIT,
+            'upcoming_tasks': upcoming[:UPCOMING_TASK_LIMIT],
+            'more_upcoming': len(upcoming) > UPCOMING_TASK_LIMIT,
+            'upcoming_days': UPCOMING_DAYS,
+            'limit': UPCOMING_TASK_LIMIT,
+        }
+        return TemplateResponse(request, 'todo_app/task_upcoming.html', context)
+
+    etag = make_etag(request, 'task_upcoming', stats.task_list_version, today.isoformat())
+    return await conditional_response(request, render_upcoming, etag=etag)
+
+
+@login_required
+@require_POST
 def task_toggle_complete(request, pk):
     """
     Function-based view to toggle the 'completed' status of a task.
+    The flip happens in the database as one conditional UPDATE, so there is
+    no read-modify-write race between concurrent toggles. POST only, so a
+    prefetch or a crawler following a link can't flip it.
     """
-    # Get the task or return a 404 error
-    task = get_object_or_404(Task, pk=pk, user=request.user)
-    
-    # Check ownership explicitly just in case the get_object_or_404 fails to filter
-    if task.user != request.user:
-        # Should be caught by get_object_or_404, but good practice
-        return redirect('note_app:task_list')
-
-    # Toggle the status
-    task.completed = not task.completed
-    task.save()
-    
+    # Only the owner's task matches; anything else is a 404
+    if not Task.objects.filter(pk=pk).toggle_completed(request.user):
+        raise Http404('No task found matching the query')
+
     # Redirect the user back to the task list view
-    return HttpResponseRedirect(reverse_lazy('note_app:task_list'))
\ No newline at end of file
+    return HttpResponseRedirect(reverse_lazy('note_app:task_list'))
+
+
+@login_required
+@require_POST
+def task_bulk_action(request):
+    """
+    Completes, reopens or deletes a set of the user's tasks in one request.
+    Expects an 'action' field and one or more 'task_ids' fields.
+    """
+    actions = {
+        'complete': lambda tasks: tasks.set_completed(request.user, True),
+        'reopen': lambda tasks: tasks.set_completed(request.user, False),
+        'delete': lambda tasks: tasks.soft_delete(request.user),
+    }
+    action = request.POST.get('action')
+    task_ids = [value for value in request.POST.getlist('task_ids') if value.isdigit()]
+
+    if action not in actions or not task_ids:
+        messages.error(request, 'Select at least one task and an action.')
+    else:
+        changed = actions[action](Task.objects.filter(pk__in=task_ids))
+        if action == 'delete':
+            messages.success(request, f'{changed} task(s) deleted.', extra_tags=UNDO_TAG)
+        else:
+            messages.success(request, f'{changed} task(s) updated.')
+
+    return HttpResponseRedirect(reverse_lazy('note_app:task_list'))
+
+
+
+@login_required
+@require_POST
+def undo_delete(request):
+    """
+    Restores everything removed by the user's most recent delete, if it is
+    still within the undo window, then goes back to the page the user was on.
+    """
+    if trash.undo_last_delete(request.user):
+        messages.success(request, 'Delete undone.')
+    else:
+        messages.error(request, 'There is nothing left to undo.')
+
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse_lazy('note_app:index')
+    return HttpResponseRedirect(next_url)
+
+
+@login_required
+def account_delete(request):
+    """
+    Deletes the user's account after confirmation. The work done here is a
+    couple of UPDATEs (see trash.delete_account); the rows themselves are
+    removed in batches by a background job (or, failing that, purge_deleted).
+    """
+    if request.method == 'POST':
+        trash.delete_account(request.user)
+        jobs.enqueue('purge_account', user_id=request.user.pk)
+        logout(request)
+        messages.success(request, 'Your account has been deleted.')
+        return redirect('login')
+    return render(request, 'todo_app/account_confirm_delete.html')
+
+
+
+# ----------------------------------
+#          SEARCH VIEW
+# ----------------------------------
+
+@login_required
+def search_view(request):
+    """
+    Full-text search over the user's notes and tasks (see todo_app/search.py).
+    """
+    query = request.GET.get('q', '').strip()
+    results = search.search(request.user, query) if query else []
+    return render(request, 'todo_app/search.html', {'query': query, 'results': results})
+
+
+
+# ----------------------------------
+#          EXPORT VIEW
+# ----------------------------------
+
+@login_required
+def export_data(request, kind, fmt):
+    """
+    Streams the user's notes or tasks as CSV or NDJSON (see todo_app/exports.py).
+    """
+    if kind not in exports.EXPORT_FIELDS or fmt not in exports.EXPORT_FORMATS:
+        raise Http404('Unknown export')
+
+    response = StreamingHttpResponse(
+        exports.stream_export(kind, fmt, user=request.user),
+        content_type=exports.EXPORT_FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
+
+
+
+# ----------------------------------
+#          IMPORT VIEW
+# ----------------------------------
+
+@login_required
+def import_data(request, kind):
+    """
+    Bulk-imports notes or tasks from an uploaded CSV/NDJSON file (see todo_app/imports.py).
+    The upload is saved and handed to a background job; the user is sent to the job's
+    page, which shows its progress and then the per-row error report.
+    """
+    if kind not in imports.IMPORT_FORMS:
+        raise Http404('Unknown import')
+
+    if request.method == 'POST':
+        form = ImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            fmt = form.cleaned_data['format']
+            path = default_storage.save(f'imports/{uuid.uuid4().hex}.{fmt}', form.cleaned_data['file'])
+            job = jobs.enqueue('import_rows', user=request.user, kind=kind, fmt=fmt, path=path)
+            return redirect('note_app:job_detail', pk=job.pk)
+    else:
+        form = ImportForm()
+
+    return render(request, 'todo_app/import_form.html', {'form': form, 'kind': kind})
+
+
+# ----------------------------------
+#          JOB STATUS VIEW
+# ----------------------------------
+
+@login_required
+def job_detail(request, pk):
+    """
+    Status, progress and outcome of one of the user's background jobs;
+    the page reloads itself until the job has finished.
+    """
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return render(request, 'todo_app/job_detail.html', {'job': job})
+
+
+# ----------------------------------
+#          METRICS VIEW
+# ----------------------------------
+
+@staff_member_required
+def metrics_view(request):
+    """
+    Staff-only JSON summary of this process's request metrics per view
+    (see todo_app/metrics.py). Times are in milliseconds, sizes in bytes.
+    """
+    return JsonResponse({
+        'pid': os.getpid(),
+        'detailed': metrics.detailed_metrics_enabled(),
+        'views': metrics.snapshot(),
+    })
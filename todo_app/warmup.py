@@ -0,0 +1,105 @@
+"""
+Process warm-up.
+
+A new worker process does a lot of one-off work on its first request: the
+URLconf (and with it every view module) is imported and each pattern's
+regex compiled, every template on the page is parsed and its tag libraries
+imported, and the database connection is opened and tuned (see
+database.py). Where workers are recycled often, that first request is what
+shows up in tail latency.
+
+warm_up() does that work while the server starts instead, before it
+accepts traffic. wsgi.py and asgi.py call it when TODO_WARMUP is on, so
+management commands (migrate, run_jobs, ...) never pay for it. Compiled
+templates stay in the cached template loader.
+
+By default it only compiles URLs and templates, which is safe before a
+pre-fork server (gunicorn --preload) forks: the workers share the result.
+Opening the database connection is left out, since a connection opened in
+the master would be inherited by every worker. To open it early too, run
+that step in each worker after the fork, from the thread that serves
+requests (sync workers), e.g. in a gunicorn config file:
+
+    def post_fork(server, worker):
+        from todo_app.warmup import warm_up
+        warm_up(['connections'])
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+# This app's templates: every page and fragment the site renders
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+
+def compile_templates(template_dir=TEMPLATE_DIR):
+    """
+    Parse every template under `template_dir` with each configured engine,
+    filling their cached loaders. Returns the number compiled.
+    """
+    names = [path.relative_to(template_dir).as_posix() for path in sorted(template_dir.rglob('*.html'))]
+    for engine in engines.all():
+        for name in names:
+            engine.get_template(name)
+    return len(names)
+
+
+def load_urls(resolver=None):
+    """
+    Import the URLconf, compile every pattern's regex and build the reverse()
+    lookup tables. Returns the number of patterns.
+    """
+    resolver = resolver or get_resolver()
+    # Built on first reverse(), one table per resolver
+    resolver.reverse_dict
+    count = 0
+    for entry in resolver.url_patterns:
+        # Compiled on first access, then cached on the pattern
+        entry.pattern.regex
+        count += load_urls(entry) if isinstance(entry, URLResolver) else 1
+    return count
+
+
+def connect():
+    """Open (and tune) each configured database connection. Returns the number opened."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+STEPS = {
+    'templates': compile_templates,
+    'urls': load_urls,
+    'connections': connect,
+}
+
+# Steps that leave nothing a forked worker mustn't inherit (see above)
+FORK_SAFE_STEPS = ('templates', 'urls')
+
+
+def warm_up(steps=FORK_SAFE_STEPS):
+    """
+    Run the named warm-up steps and return {step: (count, seconds)}. A
+    failing step is logged and skipped: a worker that can't warm up still
+    serves, just more slowly at first.
+    """
+    report = {}
+    for name in steps:
+        started = time.perf_counter()
+        try:
+            count = STEPS[name]()
+        except (DatabaseError, TemplateSyntaxError, TemplateDoesNotExist, ImportError) as error:
+            logger.warning('Warm-up step %r failed: %r', name, error)
+            continue
+        report[name] = (count, time.perf_counter() - started)
+    logger.info(
+        'Warmed up: %s',
+        ', '.join(f'{count} {name} in {seconds * 1000:.1f} ms' for name, (count, seconds) in report.items()),
+    )
+    return report